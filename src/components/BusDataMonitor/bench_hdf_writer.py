@@ -0,0 +1,54 @@
+"""
+功能描述：HDFWriter 写入吞吐量基准
+
+对比逐帧写入（变长 raw）与分块写入模式（定长 uint8 二维 raw）的帧/秒与 MB/s
+
+运行：python -m src.components.BusDataMonitor.bench_hdf_writer
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+from src.components.BusDataMonitor.hdf_writer import HDFWriter
+
+
+def _run(writer, channels, frames_per_channel, frame_len):
+    rng = np.random.default_rng(0)
+    # 旧路径以 vlen 字符串存 raw，不支持内嵌 0x00，故负载取 1~255
+    payload = [rng.integers(1, 256, frame_len, dtype=np.uint8).tobytes() for _ in range(256)]
+
+    def worker(ch):
+        for i in range(frames_per_channel):
+            writer.write_frame(f"ch{ch}", time.time(), payload[i & 0xFF])
+
+    threads = [threading.Thread(target=worker, args=(ch,)) for ch in range(channels)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close()
+    return time.perf_counter() - start
+
+
+def bench(channels=4, frames_per_channel=2500, frame_len=128, chunk_rows=4096):
+    total = channels * frames_per_channel
+    mb = total * frame_len / 1e6
+    print(f"{channels} 通道 × {frames_per_channel} 帧，帧长 {frame_len} 字节")
+    print(f"{'模式':<16}{'耗时(s)':>10}{'帧/秒':>14}{'MB/s':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, kwargs in (("逐帧写入", {}), (f"分块({chunk_rows})", {"chunk_rows": chunk_rows})):
+            path = os.path.join(tmp, f"bench_{len(kwargs)}.h5")
+            writer = HDFWriter(path, flush_interval=None, **kwargs)
+            elapsed = _run(writer, channels, frames_per_channel, frame_len)
+            print(f"{label:<16}{elapsed:>10.3f}{total / elapsed:>14,.0f}{mb / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,102 @@
+"""
+功能描述：记录会话帧检索基准
+
+生成 N 帧 recv422 会话文件（帧计数注入若干跳变，系统工作模式反馈 只在一小段内取 5），
+对比逐帧 parse() 全量扫描（按抽样外推）与 SessionQuery 冷查询 / 索引命中后的热查询耗时
+
+运行：python -m src.components.BusDataMonitor.bench_query
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+from src.components.BusDataMonitor.hdf_writer import HDFWriter
+from src.components.BusDataMonitor.hdf_query import SessionQuery, Field, INDEX_SUFFIX
+from src.components.BusDataMonitor.monitor.busdata_parser import BusDataParser
+from src.components.BusDataMonitor.protocol import ProtocolLoader
+
+CHANNEL = "1/Rx"
+PROTOCOL = "recv422"
+
+
+def make_session(path, n, block=262144, gaps=50, mode_window=(0.7, 100)):
+    """写入 n 帧测试数据，返回注入的帧计数跳变行号与工作模式窗口"""
+    frame_len = ProtocolLoader().get(PROTOCOL)["protocol_length"]
+    rng = np.random.default_rng(0)
+    template = rng.integers(0, 256, size=(block, frame_len), dtype=np.uint8)
+    template[:, 6] = 1
+    gap_rows = np.sort(rng.choice(np.arange(1, n), size=gaps, replace=False))
+    counter = np.arange(n, dtype=np.int64)
+    for row in gap_rows:
+        counter[row:] += 3  # 跳变：丢 3 帧
+    mode_start = int(n * mode_window[0])
+    mode_rows = (mode_start, mode_start + mode_window[1])
+
+    writer = HDFWriter(path, flush_interval=None, chunk_rows=65536)
+    for s in range(0, n, block):
+        e = min(s + block, n)
+        frames = template[:e - s].copy()
+        frames[:, 2] = counter[s:e] & 0xFF
+        lo, hi = max(s, mode_rows[0]), min(e, mode_rows[1])
+        if lo < hi:
+            frames[lo - s:hi - s, 6] = 5
+        writer.write_frames(CHANNEL, np.arange(s, e) * 1e-3, frames)
+    writer.close()
+    return gap_rows, mode_rows
+
+
+def legacy_scan_rate(path, sample=20000):
+    """旧方式：读出原始帧后逐帧 parse()，返回帧/秒"""
+    import h5py
+    parser = BusDataParser(ProtocolLoader().get(PROTOCOL))
+    start = time.perf_counter()
+    with h5py.File(path, "r") as f:
+        raw = f["data"][CHANNEL]["raw"][:sample]
+    prev = None
+    for row in raw:
+        value = parser.parse(row.tobytes())["帧计数"]
+        if prev is not None and (value - prev) & 0xFF != 1:
+            pass
+        prev = value
+    return sample / (time.perf_counter() - start)
+
+
+def bench(n=10_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_session.h5")
+        t0 = time.perf_counter()
+        gap_rows, mode_rows = make_session(path, n)
+        print(f"生成 {n:,} 帧会话文件：{time.perf_counter() - t0:.1f} s，{os.path.getsize(path) / 1e9:.2f} GB")
+
+        rate = legacy_scan_rate(path)
+        print(f"逐帧 parse() 全量扫描（抽样外推）：{n / rate:,.0f} s")
+
+        protocols = {CHANNEL: PROTOCOL}
+        print(f"{'查询':<28}{'耗时(s)':>10}{'命中':>10}{'扫描块':>8}{'跳过块':>8}")
+        queries = [
+            ("帧计数跳变（冷）", Field("帧计数").jumped()),
+            ("工作模式 == 5（冷，建索引）", Field("系统工作模式反馈") == 5),
+            ("工作模式 == 5（热）", Field("系统工作模式反馈") == 5),
+        ]
+        with SessionQuery(path, protocols=protocols) as q:
+            for label, where in queries:
+                hits = q.select(CHANNEL, where=where)
+                st = q.last_stats
+                print(f"{label:<28}{st['elapsed']:>10.2f}{st['matched']:>10,}{st['scanned']:>8}{st['skipped']:>8}")
+            assert np.array_equal(q.select(CHANNEL, Field("帧计数").jumped())["index"], gap_rows)
+            assert len(hits["index"]) == mode_rows[1] - mode_rows[0]
+
+        # 重新打开时从 .qidx.npz 加载索引
+        with SessionQuery(path, protocols=protocols) as q:
+            q.select(CHANNEL, where=Field("系统工作模式反馈") == 5)
+            st = q.last_stats
+            print(f"{'重新打开后（加载索引）':<28}{st['elapsed']:>10.2f}{st['matched']:>10,}{st['scanned']:>8}{st['skipped']:>8}")
+        assert os.path.exists(path + INDEX_SUFFIX)
+
+
+if __name__ == "__main__":
+    bench()
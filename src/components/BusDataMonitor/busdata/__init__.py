@@ -2,5 +2,6 @@
 功能描述：存储总线数据为HDF5格式
 """
 
+from pathlib import Path
 
-
+BUSDATA_PATH = Path(__file__).parent
@@ -1,49 +1,182 @@
+import os
+import sys
 import json
+import math
 import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import pandas as pd
 from openpyxl import load_workbook
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))))
+from src.components.BusDataMonitor.monitor.busdata_parser import BusDataParser, COMPILED_SUFFIX
+
 EXCEL_FILE =  Path(__file__).parent / 'protocol_template.xlsx'
 HASH_FILE =  Path(__file__).parent /"protocol_hashes.json"
 JSON_DIR =   Path(__file__).parent.parent /"protocol"
 CONF_FILE= Path(__file__).parent.parent /"config/protocol_config.json"
 
+CONFIG_SHEET = "config"
+EXCLUDE_SHEETS = ("使用说明",)
+REQUIRED_COLS = ("Name", "ByteOffset", "BitOffset", "BitLength", "Type")
+# 可选列：字节序（big/little）、数组元素个数、数组元素间隔(bit)，留空时不写入 JSON
+OPTIONAL_COLS = {"ByteOrder": ("byte_order", str), "Count": ("count", int), "Stride": ("stride", int)}
+
+
+# ---------------- sheet 转换（模块级函数，可在子进程中执行） ----------------
+
+def _cell_str(value):
+    """与 pandas 读取后 str() 的结果保持一致：空单元格为 'nan'（字段类型为 'nan' 时按 uint 解析）"""
+    return "nan" if value is None else str(value)
+
+
+def _cell_text(value):
+    """说明等自由文本：空单元格（None/NaN）或缺少该列时为空字符串"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+def _parse_enum_map(enum_str):
+    """解析 '0:Idle,1:Active' → dict"""
+    if enum_str is None:
+        return {}
+    mapping = {}
+    for item in str(enum_str).split(","):
+        kv = item.split(":")
+        if len(kv) == 2:
+            mapping[kv[0].strip()] = kv[1].strip()
+    return mapping
+
+
+def sheet_to_protocol(sheet_name, rows, protocol_info):
+    """
+    将一个 sheet 的行数据转换为协议字典
+    :param rows: 行元组列表，第一行为表头
+    :param protocol_info: config sheet 中该协议的 {channel, length, version, desc}
+    """
+    if not rows:
+        raise ValueError(f"{sheet_name} 为空")
+    header = [None if h is None else str(h).strip() for h in rows[0]]
+    col = {name: i for i, name in reversed(list(enumerate(header))) if name}
+    for name in REQUIRED_COLS:
+        if name not in col:
+            raise ValueError(f"{sheet_name} 缺少必须的列: {name}")
+
+    def cell(row, name, default=None):
+        i = col.get(name)
+        return row[i] if i is not None and i < len(row) else default
+
+    required = [col[name] for name in REQUIRED_COLS]
+    fields = []
+    for row in rows[1:]:
+        if all(i >= len(row) or row[i] is None for i in required):
+            continue  # 空行
+        field = {
+            "name": cell(row, "Name"),
+            "byte_offset": int(cell(row, "ByteOffset")),
+            "bit_offset": int(cell(row, "BitOffset")),
+            "bit_length": int(cell(row, "BitLength")),
+            "type": _cell_str(cell(row, "Type")).lower(),
+            "description": _cell_text(cell(row, "Description")),
+        }
+
+        if field["type"] == "enum":
+            field["map"] = _parse_enum_map(cell(row, "EnumMap/Value"))
+        elif field["type"] == "fixed":
+            scale_val = cell(row, "Scale")
+            offset_val = cell(row, "Offset")
+            field["scale"] = float(scale_val) if scale_val is not None else 1.0
+            field["offset"] = float(offset_val) if offset_val is not None else 0.0
+
+        for name, (key, conv) in OPTIONAL_COLS.items():
+            value = cell(row, name)
+            if value is not None and str(value).strip():
+                field[key] = conv(value).strip().lower() if conv is str else conv(value)
+
+        fields.append(field)
+
+    return {
+        "protocol_name": sheet_name,
+        "channel": protocol_info.get("channel"),
+        "protocol_length": protocol_info["length"],
+        "version": protocol_info["version"],
+        "description": protocol_info["desc"],
+        "fields": fields
+    }
+
+
+def convert_sheet(sheet_name, rows, protocol_info, json_dir):
+    """
+    转换一个 sheet 并写出协议 JSON 与预编译文件
+    :return: {"convert": s, "write": s, "fields": n}
+    """
+    t0 = time.perf_counter()
+    protocol = sheet_to_protocol(sheet_name, rows, protocol_info)
+    content = json.dumps(protocol, indent=4, ensure_ascii=False).encode("utf-8")
+    fields = BusDataParser.compile(protocol)
+    t1 = time.perf_counter()
+
+    json_dir = Path(json_dir)
+    (json_dir / f"{sheet_name}.json").write_bytes(content)
+    # 预编译文件记录 JSON 内容哈希，ProtocolRegistry 据此判断是否可直接使用
+    BusDataParser.save_compiled(
+        fields, json_dir / f"{sheet_name}{COMPILED_SUFFIX}", hashlib.sha1(content).hexdigest()
+    )
+    t2 = time.perf_counter()
+    return {"convert": t1 - t0, "write": t2 - t1, "fields": len(fields)}
+
 
 class ProtocolManager:
-    def __init__(self, excel_file, json_dir, hash_file):
-        self.excel_file = EXCEL_FILE
-        self.json_dir = JSON_DIR
-        self.hash_file = HASH_FILE
+    """
+    Excel 协议表 → JSON 协议
+
+    工作簿以只读模式流式读取一次：逐 sheet 计算 MD5 的同时保留行数据，
+    只转换哈希变化或输出文件缺失的 sheet，可选用进程池并行转换。
+    """
+    def __init__(self, excel_file=EXCEL_FILE, json_dir=JSON_DIR, hash_file=HASH_FILE, workers=0):
+        """
+        :param workers: 转换 sheet 的进程数，0/1 时在当前进程中依次转换
+        """
+        self.excel_file = Path(excel_file)
+        self.json_dir = Path(json_dir)
+        self.hash_file = Path(hash_file)
+        self.workers = workers
         self.json_dir.mkdir(exist_ok=True)
+        self.timings = {}  # sheet -> {"rows", "read", "changed", ["convert", "write", "fields"]}
 
     # ---------------- 内部工具函数 ----------------
-                                                                                                                                                                                                                                                                                                                                                                                                       
-    def _get_sheet_hashes(self, exclude_sheets=None):
-        """计算 Excel 中各 sheet 的 MD5 哈希"""
+
+    def _read_workbook(self, exclude_sheets=EXCLUDE_SHEETS):
+        """
+        单次读取工作簿
+        :return: ({sheet: md5}, {sheet: 行元组列表})
+        """
         if not self.excel_file.exists():
             raise FileNotFoundError(f"{self.excel_file} 不存在")
 
-        if exclude_sheets is None:
-            exclude_sheets = ["使用说明"]
-
-        wb = load_workbook(self.excel_file, data_only=True)
+        wb = load_workbook(self.excel_file, read_only=True, data_only=True)
         hashes = {}
-
-        for sheet_name in wb.sheetnames:
-            if sheet_name in exclude_sheets:
-                continue
-
-            ws = wb[sheet_name]
-            content = []
-            for row in ws.iter_rows(values_only=True):
-                content.append(",".join("" if v is None else str(v) for v in row))
-            data_str = "\n".join(content)
-
-            md5 = hashlib.md5(data_str.encode("utf-8"))
-            hashes[sheet_name] = md5.hexdigest()
-
-        return hashes
+        sheets = {}
+        try:
+            for ws in wb.worksheets:
+                if ws.title in exclude_sheets:
+                    continue
+                t0 = time.perf_counter()
+                # 哈希内容与逐行 ",".join 后以换行连接的文本一致，兼容已有的哈希文件
+                md5 = hashlib.md5()
+                rows = []
+                for row in ws.iter_rows(values_only=True):
+                    if rows:
+                        md5.update(b"\n")
+                    md5.update(",".join("" if v is None else str(v) for v in row).encode("utf-8"))
+                    rows.append(row)
+                hashes[ws.title] = md5.hexdigest()
+                sheets[ws.title] = rows
+                self.timings[ws.title] = {"rows": len(rows), "read": time.perf_counter() - t0, "changed": False}
+        finally:
+            wb.close()
+        return hashes, sheets
 
     def _load_previous_hashes(self):
         if self.hash_file.exists():
@@ -57,123 +190,111 @@ class ProtocolManager:
         with open(self.hash_file, "w", encoding="utf-8") as f:
             json.dump(all_hashes, f, indent=4, ensure_ascii=False)
 
-    def _check_sheets_modified(self):
-        """返回发生变化的 sheet 列表"""
-        previous_all = self._load_previous_hashes()
-        previous_hashes = previous_all.get(str(self.excel_file), {})
-        current_hashes = self._get_sheet_hashes()
+    def _outputs_exist(self, sheet_name):
+        # 预编译文件格式升级后旧文件读不出，按缺失处理
+        return ((self.json_dir / f"{sheet_name}.json").exists()
+                and BusDataParser.load_compiled(self.json_dir / f"{sheet_name}{COMPILED_SUFFIX}") is not None)
 
-        changed_sheets = [
+    def _changed_sheets(self, current_hashes):
+        """返回发生变化（或输出文件缺失）的 sheet 列表"""
+        previous_hashes = self._load_previous_hashes().get(str(self.excel_file), {})
+        return [
             name for name in current_hashes
-            if name not in previous_hashes or previous_hashes[name] != current_hashes[name]
+            if previous_hashes.get(name) != current_hashes[name]
+            or (name != CONFIG_SHEET and not self._outputs_exist(name))
         ]
 
-        self._save_current_hashes(current_hashes)
-        return changed_sheets
-
-    def _load_config_info(self):
-        """读取 config sheet，返回 {sheet: {ch,length,version,desc}}"""
-        df = pd.read_excel(self.excel_file, sheet_name="config")
+    def _load_config_info(self, rows):
+        """解析 config sheet，返回 {sheet: {channel,length,version,desc}}"""
+        if not rows:
+            raise ValueError(f"工作簿缺少 {CONFIG_SHEET} sheet")
+        col = {str(h).strip(): i for i, h in enumerate(rows[0]) if h is not None}
         cfg = {}
-        for _, row in df.iterrows():
-            sheet = str(row["sheet"])
-            cfg[sheet] = {
-                "length": int(row["length"]),
-                "version": str(row["version"]),
-                "desc": str(row["desc"]),
+        for row in rows[1:]:
+            if row[col["sheet"]] is None:
+                continue
+            sheet = str(row[col["sheet"]])
+            info = {
+                "length": int(row[col["length"]]),
+                "version": str(row[col["version"]]),
+                "desc": str(row[col["desc"]]),
             }
+            if "ch" in col and row[col["ch"]] is not None:
+                info["ch"] = int(row[col["ch"]])
+            cfg[sheet] = info
         return cfg
-    
+
+    def _channel(self, sheet_name, info):
+        """config 中未配置 ch 时沿用已有 JSON 中的 channel"""
+        if "ch" in info:
+            return info["ch"]
+        try:
+            old = json.loads((self.json_dir / f"{sheet_name}.json").read_text(encoding="utf-8"))
+            return old.get("channel")
+        except (OSError, ValueError):
+            return None
+
     def _export_config_json(self, cfg_dict):
         """将 config 信息导出为 json 文件"""
         out_file = CONF_FILE
-        out_file.write_text(json.dumps(cfg_dict, indent=4, ensure_ascii=False), encoding="utf-8")
+        exported = {name: {k: v for k, v in info.items() if k != "ch"} for name, info in cfg_dict.items()}
+        out_file.write_text(json.dumps(exported, indent=4, ensure_ascii=False), encoding="utf-8")
         print(f"协议 config JSON 已生成：{out_file}")
 
-    def _parse_enum_map(self, enum_str):
-        """解析 '0:Idle,1:Active' → dict"""
-        if pd.isna(enum_str):
-            return {}
-        mapping = {}
-        for item in str(enum_str).split(","):
-            kv = item.split(":")
-            if len(kv) == 2:
-                mapping[kv[0].strip()] = kv[1].strip()
-        return mapping
-
-    def _sheet_to_json(self, sheet_name, protocol_info):
-        """将单个 sheet 转换为 JSON 文件"""
-        df = pd.read_excel(self.excel_file, sheet_name=sheet_name)
-        required_cols = ["Name", "ByteOffset", "BitOffset", "BitLength", "Type"]
-        for col in required_cols:
-            if col not in df.columns:
-                raise ValueError(f"{sheet_name} 缺少必须的列: {col}")
-
-        fields = []
-        for _, row in df.iterrows():
-            field = {
-                "name": row["Name"],
-                "byte_offset": int(row["ByteOffset"]),
-                "bit_offset": int(row["BitOffset"]),
-                "bit_length": int(row["BitLength"]),
-                "type": str(row["Type"]).lower(),
-                "description": str(row.get("Description", "")),
-            }
-
-            if field["type"] == "enum":
-                enum_str = row.get("EnumMap/Value", "")
-                field["map"] = self._parse_enum_map(enum_str)
-            elif field["type"] == "fixed":
-                scale_val = row.get("Scale", 1.0)
-                offset_val = row.get("Offset", 0.0)
-                field["scale"] = float(scale_val) if pd.notna(scale_val) else 1.0
-                field["offset"] = float(offset_val) if pd.notna(offset_val) else 0.0
-
-            fields.append(field)
-
-        protocol_json = {
-            "protocol_name": sheet_name,
-            "channel": protocol_info["channel"],
-            "protocol_length": protocol_info["length"],
-            "version": protocol_info["version"],
-            "description": protocol_info["desc"],
-            "fields": fields
-        }
-
-        out_file = self.json_dir / f"{sheet_name}.json"
-        out_file.write_text(json.dumps(protocol_json, indent=4, ensure_ascii=False), encoding="utf-8")
-        print(f"协议 JSON 已生成：{out_file}")
-
-    def _excel_to_json(self, changed_sheets):
-        cfg = self._load_config_info()
-        self._export_config_json(cfg)  # 每次都更新 config.json
-
+    def _excel_to_json(self, changed_sheets, sheets, cfg):
+        jobs = []
         for sheet_name in changed_sheets:
+            if sheet_name == CONFIG_SHEET:
+                continue
             if sheet_name not in cfg:
                 print(f"警告：config 中未找到 {sheet_name} 的配置信息，跳过")
                 continue
-            self._sheet_to_json(sheet_name, cfg[sheet_name])
+            info = dict(cfg[sheet_name], channel=self._channel(sheet_name, cfg[sheet_name]))
+            jobs.append((sheet_name, sheets[sheet_name], info, str(self.json_dir)))
+
+        if self.workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+                futures = [(job[0], pool.submit(convert_sheet, *job)) for job in jobs]
+                results = [(name, fut.result()) for name, fut in futures]
+        else:
+            results = [(job[0], convert_sheet(*job)) for job in jobs]
+
+        for sheet_name, timing in results:
+            self.timings[sheet_name].update(timing, changed=True)
+            print(f"协议 JSON 已生成：{self.json_dir / f'{sheet_name}.json'}")
+
+    def _print_timings(self, total):
+        print(f"{'sheet':<16}{'行数':>8}{'读取(ms)':>12}{'转换(ms)':>12}{'写出(ms)':>12}")
+        for name, t in self.timings.items():
+            if t["changed"] and "convert" in t:
+                convert, write = f"{t['convert'] * 1e3:.1f}", f"{t['write'] * 1e3:.1f}"
+            else:
+                convert = write = "-"
+            print(f"{name:<16}{t['rows']:>8}{t['read'] * 1e3:>12.1f}{convert:>12}{write:>12}")
+        print(f"总耗时 {total * 1e3:.1f} ms")
 
     # ---------------- 对外接口 ----------------
 
     def run(self):
-        """主入口：检测变化并更新 JSON"""
-        changed_sheets = self._check_sheets_modified()
+        """主入口：检测变化并更新 JSON，返回发生变化的 sheet 列表"""
+        start = time.perf_counter()
+        self.timings = {}
+        hashes, sheets = self._read_workbook()
+        changed_sheets = self._changed_sheets(hashes)
+        cfg = self._load_config_info(sheets.get(CONFIG_SHEET))
+        self._export_config_json(cfg)  # 每次都更新 config.json
+
         if changed_sheets:
             print("检测到以下 sheet 发生变化：", changed_sheets)
-            self._excel_to_json(changed_sheets)
+            self._excel_to_json(changed_sheets, sheets, cfg)
         else:
-            # 即使没有变化，也确保 config.json 是最新的
-            cfg = self._load_config_info()
-            self._export_config_json(cfg)
             print("没有协议变化，仅更新 config.json")
+        self._save_current_hashes(hashes)
+        self._print_timings(time.perf_counter() - start)
+        return changed_sheets
 
 
 # ---------------- 使用示例 ----------------
 if __name__ == "__main__":
-    mgr = ProtocolManager(
-        excel_file="protocol_template.xlsx",
-        json_dir="BusDataMonitor/protocol",
-        hash_file="sheet_hashes.json"
-    )
+    mgr = ProtocolManager(workers=os.cpu_count() or 1)
     mgr.run()
@@ -0,0 +1,555 @@
+"""
+功能描述：记录会话的按协议帧检索
+
+按块读取 /data/{通道}/raw，用 BusDataParser 的字段定义向量化解码所需字段并求值谓词；
+每个字段首次参与查询时顺带建立按块的列索引（最小/最大值、枚举取值位图），
+之后的查询先用索引排除不可能命中的块，只读取和解码剩余的块。
+
+用法：
+    q = SessionQuery("session_xxx.h5")
+    hits = q.select("1/Rx", where=(Field("帧计数").jumped()) | (Field("系统工作模式反馈") == 3))
+"""
+import hashlib
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import h5py
+import numpy as np
+
+from src.components.BusDataMonitor.monitor.busdata_parser import BusDataParser, KIND_ENUM, KIND_FLOAT, KIND_UINT
+from src.components.BusDataMonitor.protocol import protocol_registry
+
+_BITMAP_MAX_BITS = 16     # 枚举字段建立取值位图的最大位宽（无符号整数字段为 8）
+_EXACT_MAX_BITS = 53      # float64 能精确表示的整数位宽，超出的字段不建立最小/最大值索引
+INDEX_SUFFIX = ".qidx.npz"
+
+
+# ---------------- 谓词 ----------------
+
+class Predicate(ABC):
+    """字段谓词，可用 & | ~ 组合"""
+    needs_context = False  # 是否需要块前一行（跨块比较相邻帧）
+
+    def fields(self):
+        return set()
+
+    def bind(self, fields):
+        """按协议字段解析取值（如枚举标签转为编码），返回绑定后的谓词"""
+        return self
+
+    @abstractmethod
+    def evaluate(self, cols):
+        """对块中各行求值，cols: 字段名 -> 数值列；返回布尔数组"""
+        pass
+
+    def may_match(self, stats):
+        """根据块索引判断该块是否可能命中；stats: 字段名 -> (min, max, bitmap) 或 None"""
+        return True
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class Field:
+    """字段引用，用于构造谓词：Field("帧计数") > 10"""
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, value):
+        return Compare(self.name, "==", value)
+
+    def __ne__(self, value):
+        return Compare(self.name, "!=", value)
+
+    def __lt__(self, value):
+        return Compare(self.name, "<", value)
+
+    def __le__(self, value):
+        return Compare(self.name, "<=", value)
+
+    def __gt__(self, value):
+        return Compare(self.name, ">", value)
+
+    def __ge__(self, value):
+        return Compare(self.name, ">=", value)
+
+    __hash__ = None
+
+    def isin(self, values):
+        return IsIn(self.name, values)
+
+    def between(self, low, high):
+        return (self >= low) & (self <= high)
+
+    def jumped(self, step=1):
+        """相邻两帧的差值（按字段位宽取模）不等于 step，用于检测帧计数跳变"""
+        return Jumped(self.name, step)
+
+
+def _enum_codes(f, value):
+    """将枚举标签或数值转换为编码列表"""
+    if isinstance(value, str):
+        return [k for k, v in f.enum_map.items() if v == value]
+    return [int(value)]
+
+
+class Compare(Predicate):
+    _OPS = {
+        "==": np.equal, "!=": np.not_equal, "<": np.less,
+        "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    }
+
+    def __init__(self, name, op, value):
+        self.name = name
+        self.op = op
+        self.value = value
+
+    def fields(self):
+        return {self.name}
+
+    def bind(self, fields):
+        f = fields[self.name]
+        if f.kind == KIND_ENUM and isinstance(self.value, str) and self.op in ("==", "!="):
+            pred = IsIn(self.name, _enum_codes(f, self.value)).bind(fields)
+            return pred if self.op == "==" else Not(pred)
+        if isinstance(self.value, str):
+            raise ValueError(f"字段 {self.name} 不支持与字符串比较")
+        return self
+
+    def evaluate(self, cols):
+        return self._OPS[self.op](cols[self.name], self.value)
+
+    def may_match(self, stats):
+        s = stats.get(self.name)
+        if s is None:
+            return True
+        lo, hi, bitmap = s
+        v, op = self.value, self.op
+        if op == "==":
+            if not lo <= v <= hi:
+                return False
+            return bitmap is None or _bit_set(bitmap, v)
+        if op == "!=":
+            return not (lo == hi == v)
+        if op == "<":
+            return lo < v
+        if op == "<=":
+            return lo <= v
+        if op == ">":
+            return hi > v
+        return hi >= v
+
+
+def _bit_set(bitmap, code):
+    code = int(code)
+    if code < 0 or code >= len(bitmap) * 8:
+        return False
+    return bool(bitmap[code >> 3] & (0x80 >> (code & 7)))
+
+
+class IsIn(Predicate):
+    def __init__(self, name, values):
+        self.name = name
+        self.values = list(values)
+
+    def fields(self):
+        return {self.name}
+
+    def bind(self, fields):
+        f = fields[self.name]
+        if f.kind == KIND_ENUM:
+            codes = []
+            for v in self.values:
+                codes.extend(_enum_codes(f, v))
+            return IsIn(self.name, codes) if codes != self.values else self
+        return self
+
+    def evaluate(self, cols):
+        return np.isin(cols[self.name], np.asarray(self.values))
+
+    def may_match(self, stats):
+        s = stats.get(self.name)
+        if s is None:
+            return True
+        lo, hi, bitmap = s
+        for v in self.values:
+            if lo <= v <= hi and (bitmap is None or _bit_set(bitmap, v)):
+                return True
+        return False
+
+
+class Jumped(Predicate):
+    needs_context = True
+
+    def __init__(self, name, step=1, modulus=None):
+        self.name = name
+        self.step = step
+        self.modulus = modulus
+
+    def fields(self):
+        return {self.name}
+
+    def bind(self, fields):
+        f = fields[self.name]
+        modulus = (f.mask + 1) if f.kind in (KIND_UINT, KIND_ENUM) else None
+        return Jumped(self.name, self.step, modulus)
+
+    def evaluate(self, cols):
+        v = cols[self.name]
+        result = np.zeros(len(v), dtype=bool)
+        if len(v) > 1:
+            if self.modulus is not None:
+                diff = (v[1:] - v[:-1]) & np.uint64(self.modulus - 1)
+            else:
+                diff = v[1:] - v[:-1]
+            result[1:] = diff != self.step
+        return result
+
+
+class And(Predicate):
+    def __init__(self, *parts):
+        self.parts = parts
+        self.needs_context = any(p.needs_context for p in parts)
+
+    def fields(self):
+        return set().union(*(p.fields() for p in self.parts))
+
+    def bind(self, fields):
+        return type(self)(*(p.bind(fields) for p in self.parts))
+
+    def evaluate(self, cols):
+        result = self.parts[0].evaluate(cols)
+        for p in self.parts[1:]:
+            result = result & p.evaluate(cols)
+        return result
+
+    def may_match(self, stats):
+        return all(p.may_match(stats) for p in self.parts)
+
+
+class Or(And):
+    def evaluate(self, cols):
+        result = self.parts[0].evaluate(cols)
+        for p in self.parts[1:]:
+            result = result | p.evaluate(cols)
+        return result
+
+    def may_match(self, stats):
+        return any(p.may_match(stats) for p in self.parts)
+
+
+class Not(Predicate):
+    def __init__(self, part):
+        self.part = part
+        self.needs_context = part.needs_context
+
+    def fields(self):
+        return self.part.fields()
+
+    def bind(self, fields):
+        return Not(self.part.bind(fields))
+
+    def evaluate(self, cols):
+        return ~self.part.evaluate(cols)
+
+
+# ---------------- 列索引 ----------------
+
+class _FieldIndex:
+    """单个字段按块的最小/最大值与取值位图"""
+    def __init__(self, n_chunks, bitmap_bits, layout=""):
+        self.layout = layout  # 建立索引时字段定义的摘要（见 _field_layout）
+        self.done = np.zeros(n_chunks, dtype=bool)
+        self.mins = np.zeros(n_chunks, dtype=np.float64)
+        self.maxs = np.zeros(n_chunks, dtype=np.float64)
+        self.bitmaps = None if bitmap_bits is None else np.zeros((n_chunks, ((1 << bitmap_bits) + 7) // 8), dtype=np.uint8)
+
+    def update(self, chunk, values):
+        if len(values) == 0:
+            return
+        self.mins[chunk] = values.min()
+        self.maxs[chunk] = values.max()
+        if self.bitmaps is not None:
+            present = np.bincount(values.astype(np.intp), minlength=self.bitmaps.shape[1] * 8) > 0
+            self.bitmaps[chunk] = np.packbits(present)
+        self.done[chunk] = True
+
+    def stats(self, chunk):
+        if not self.done[chunk]:
+            return None
+        bitmap = None if self.bitmaps is None else self.bitmaps[chunk]
+        return float(self.mins[chunk]), float(self.maxs[chunk]), bitmap
+
+
+def _field_layout(f):
+    """
+    影响字段解码值的定义（位置、位宽、字节序、类型、缩放等）的摘要
+
+    协议修改后摘要改变，按旧定义建立的索引不再使用；枚举标签只在绑定谓词时使用，不影响索引
+    """
+    key = (f.kind, f.start_bit, f.bit_length, f.little, f.count, f.stride, float(f.scale), float(f.offset))
+    return hashlib.sha1(repr(key).encode()).hexdigest()
+
+
+def _index_bits(f):
+    """
+    字段的位图位宽；只建立最小/最大值索引时返回 None，不建立索引时返回 False
+
+    位图按解码值逐个置位，只适用于解码值即原始编码（0 ~ 2^位宽-1）的无符号整数与枚举字段；
+    有符号字段可能为负，定点字段经过缩放和偏移，均只建立最小/最大值索引。
+    """
+    if f.bit_length > _EXACT_MAX_BITS or f.count > 1 or f.kind == KIND_FLOAT:
+        return False
+    if f.kind == KIND_UINT and f.bit_length <= 8 or f.kind == KIND_ENUM and f.bit_length <= _BITMAP_MAX_BITS:
+        return f.bit_length
+    return None
+
+
+class SessionQuery:
+    """记录会话文件的帧检索引擎"""
+    def __init__(self, filename, config: Optional[dict] = None, protocols: Optional[dict] = None,
+                 chunk_rows=262144, persist_index=True):
+        """
+        :param filename: 会话 HDF5 文件
+        :param config: 通道配置（channel_config），按 protocol[Tx|Rx] 确定各通道协议；默认读取 config 模块
+        :param protocols: 显式指定 {"通道/方向": 协议名或协议字典}，优先于 config
+        :param chunk_rows: 每次读取与建立索引的行数
+        :param persist_index: 是否把列索引保存到会话文件旁的 .qidx.npz 以便下次复用
+        """
+        if config is None:
+            from src.components.BusDataMonitor.config import channel_config as config
+        self.filename = str(filename)
+        self.config = config
+        self.protocols = dict(protocols or {})
+        self.chunk_rows = int(chunk_rows)
+        self.persist_index = persist_index
+        self.file = h5py.File(self.filename, "r")
+        self._parsers = {}
+        self._indexes = {}   # (channel, field) -> _FieldIndex
+        self._dirty = False
+        self.last_stats = {}
+        if persist_index:
+            self._load_index()
+
+    # ---------------- 通道与协议 ----------------
+
+    def channels(self):
+        """列出文件中的通道路径（如 "0/Tx"）"""
+        result = []
+        if "data" not in self.file:
+            return result
+
+        def visit(name, obj):
+            if isinstance(obj, h5py.Group) and "raw" in obj:
+                result.append(name)
+        self.file["data"].visititems(visit)
+        return result
+
+    def length(self, channel):
+        return self.file["data"][channel]["timestamp"].shape[0]
+
+    def parser(self, channel) -> BusDataParser:
+        parser = self._parsers.get(channel)
+        if parser is not None:
+            return parser
+        protocol = self.protocols.get(channel)
+        if protocol is None:
+            ch_id, _, tor = channel.partition("/")
+            protocol = self.config.get(ch_id, {}).get("protocol", {}).get(tor)
+        if protocol is None:
+            raise ValueError(f"通道 {channel} 未配置协议")
+        if isinstance(protocol, str):
+            parser = protocol_registry.parser(protocol)
+        else:
+            parser = BusDataParser(protocol)
+        self._parsers[channel] = parser
+        return parser
+
+    # ---------------- 读取 ----------------
+
+    def _read_raw(self, dset, start, stop, lo, hi):
+        if dset.ndim == 2:
+            return dset[start:stop, lo:hi]
+        # HDFWriter 逐帧模式下 raw 为变长数据
+        rows = dset[start:stop]
+        return np.stack([np.frombuffer(bytes(r), dtype=np.uint8)[lo:hi] for r in rows])
+
+    def _field_index(self, channel, f, n_chunks):
+        key = (channel, f.name)
+        idx = self._indexes.get(key)
+        bits = _index_bits(f)
+        if bits is False:
+            return None
+        layout = _field_layout(f)
+        # 索引文件中的索引按旧的字段定义建立时（协议已修改）重新建立
+        if idx is None or len(idx.done) != n_chunks or idx.layout != layout:
+            idx = self._indexes[key] = _FieldIndex(n_chunks, bits, layout)
+        return idx
+
+    def _scan(self, channel, where, fields=(), limit=None, with_raw=False):
+        start_time = time.perf_counter()
+        parser = self.parser(channel)
+        field_map = {f.name: f for f in parser.fields}
+        pred = where.bind(field_map) if where is not None else None
+        names = (pred.fields() if pred is not None else set()) | set(fields)
+        unknown = names - field_map.keys()
+        if unknown:
+            raise KeyError(f"协议中不存在字段: {', '.join(sorted(unknown))}")
+        used = [field_map[n] for n in names]
+        arrays = sorted(n for n in (pred.fields() if pred is not None else ()) if field_map[n].count > 1)
+        if arrays:
+            raise ValueError(f"数组字段不能作为检索条件: {', '.join(arrays)}")
+
+        grp = self.file["data"][channel]
+        raw_dset, ts_dset = grp["raw"], grp["timestamp"]
+        total = ts_dset.shape[0]
+        chunk_rows = self.chunk_rows
+        n_chunks = (total + chunk_rows - 1) // chunk_rows
+        lo = min((f.start for f in used), default=0)
+        hi = max((f.stop for f in used), default=0)
+        if with_raw:
+            lo, hi = 0, raw_dset.shape[1] if raw_dset.ndim == 2 else parser.min_length
+        indexes = {f.name: self._field_index(channel, f, n_chunks) for f in used}
+        pred_names = pred.fields() if pred is not None else set()
+
+        hits, skipped, scanned = [], 0, 0
+        found = 0
+        for c in range(n_chunks):
+            s, e = c * chunk_rows, min((c + 1) * chunk_rows, total)
+            if pred is not None:
+                stats = {n: (indexes[n].stats(c) if indexes[n] is not None else None) for n in pred_names}
+                if not pred.may_match(stats):
+                    skipped += 1
+                    continue
+            scanned += 1
+            ctx = 1 if (pred is not None and pred.needs_context and s > 0) else 0
+            arr = self._read_raw(raw_dset, s - ctx, e, lo, hi)
+
+            windows = {}
+            cols = {f.name: parser.numeric_column(arr, f, base=lo, windows=windows) for f in used}
+            for name, idx in indexes.items():
+                if idx is not None and not idx.done[c]:
+                    idx.update(c, cols[name][ctx:])
+                    self._dirty = True
+
+            if pred is None:
+                rows = np.arange(e - s)
+            else:
+                rows = np.flatnonzero(pred.evaluate(cols)[ctx:])
+            if limit is not None and found + len(rows) > limit:
+                rows = rows[:limit - found]
+            if len(rows):
+                hit = {"index": rows + s, "timestamp": ts_dset[s:e][rows]}
+                for name in fields:
+                    hit[name] = cols[name][ctx:][rows]
+                if with_raw:
+                    hit["raw"] = arr[ctx:][rows]
+                hits.append(hit)
+                found += len(rows)
+            if limit is not None and found >= limit:
+                break
+
+        self.last_stats = {
+            "frames": total, "chunks": n_chunks, "scanned": scanned, "skipped": skipped,
+            "matched": found, "elapsed": time.perf_counter() - start_time,
+        }
+        return hits, field_map
+
+    def select(self, channel, where: Optional[Predicate] = None, fields=(), limit=None, with_raw=False):
+        """
+        检索满足谓词的帧
+        :param channel: 通道路径，如 "1/Rx"
+        :param where: 谓词，None 表示全部
+        :param fields: 需要一并返回的字段名；枚举字段返回标签
+        :param with_raw: 是否返回原始帧 (N, L) uint8
+        :return: {"index": 行号, "timestamp": 时间戳, 字段名: 值, ["raw": 原始帧]}
+        """
+        fields = list(fields)
+        hits, field_map = self._scan(channel, where, fields, limit, with_raw)
+        result = {
+            "index": np.concatenate([h["index"] for h in hits]) if hits else np.empty(0, dtype=np.int64),
+            "timestamp": np.concatenate([h["timestamp"] for h in hits]) if hits else np.empty(0),
+        }
+        for name in fields:
+            values = np.concatenate([h[name] for h in hits]) if hits else np.empty(0)
+            f = field_map[name]
+            if f.kind == KIND_ENUM:
+                values = np.array([f.enum_label(int(v)) for v in values], dtype=object)
+            result[name] = values
+        if with_raw:
+            result["raw"] = np.concatenate([h["raw"] for h in hits]) if hits else np.empty((0, 0), np.uint8)
+        self._save_index()
+        return result
+
+    def count(self, channel, where: Optional[Predicate] = None):
+        """统计满足谓词的帧数"""
+        hits, _ = self._scan(channel, where)
+        self._save_index()
+        return sum(len(h["index"]) for h in hits)
+
+    # ---------------- 索引持久化 ----------------
+
+    def _index_path(self):
+        return self.filename + INDEX_SUFFIX
+
+    def _file_signature(self):
+        st = os.stat(self.filename)
+        return np.array([st.st_size, st.st_mtime_ns, self.chunk_rows], dtype=np.int64)
+
+    def _load_index(self):
+        path = self._index_path()
+        if not os.path.exists(path):
+            return
+        try:
+            data = np.load(path, allow_pickle=False)
+            if not np.array_equal(data["signature"], self._file_signature()):
+                return
+            for i, key in enumerate(data["keys"]):
+                channel, name = str(key).split("\x1f")
+                n_chunks = len(data[f"done{i}"])
+                bitmaps = data[f"bitmaps{i}"] if f"bitmaps{i}" in data else None
+                idx = _FieldIndex(n_chunks, None, str(data[f"layout{i}"]))
+                idx.done, idx.mins, idx.maxs, idx.bitmaps = data[f"done{i}"], data[f"mins{i}"], data[f"maxs{i}"], bitmaps
+                self._indexes[(channel, name)] = idx
+        except (OSError, KeyError, ValueError) as e:
+            print(f"索引文件无效，将重新建立: {e}")
+            self._indexes.clear()
+
+    def _save_index(self):
+        if not (self.persist_index and self._dirty):
+            return
+        arrays = {"signature": self._file_signature()}
+        keys = []
+        for i, ((channel, name), idx) in enumerate(self._indexes.items()):
+            keys.append(f"{channel}\x1f{name}")
+            arrays[f"layout{i}"] = np.array(idx.layout)
+            arrays[f"done{i}"] = idx.done
+            arrays[f"mins{i}"] = idx.mins
+            arrays[f"maxs{i}"] = idx.maxs
+            if idx.bitmaps is not None:
+                arrays[f"bitmaps{i}"] = idx.bitmaps
+        arrays["keys"] = np.array(keys)
+        try:
+            with open(self._index_path(), "wb") as fp:
+                np.savez(fp, **arrays)
+            self._dirty = False
+        except OSError as e:
+            print(f"保存索引失败: {e}")
+
+    def close(self):
+        self._save_index()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
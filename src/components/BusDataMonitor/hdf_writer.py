@@ -3,17 +3,139 @@ import threading
 import time
 import random
 import os
-from collections import defaultdict
+from collections import defaultdict, deque
+
+import numpy as np
+
+
+class _ChannelStage:
+    """
+    单通道暂存缓冲区（分块写入模式）
+
+    帧先写入预分配的内存数组，攒满 chunk_rows 条后一次切片赋值写入数据集；
+    数据集按几何倍数扩容，关闭时再裁剪到真实长度。
+    """
+    def __init__(self, grp, frame_size, chunk_rows):
+        self.frame_size = frame_size
+        self.chunk_rows = chunk_rows
+        self.lock = threading.RLock()
+
+        self.ts = np.empty(chunk_rows, dtype='f8')
+        self.raw = np.empty((chunk_rows, frame_size), dtype=np.uint8)
+        self.parsed = [None] * chunk_rows
+        self.has_parsed = False
+        self.count = 0      # 暂存区中的条数
+        self.length = 0     # 已写入文件的条数
+        self.capacity = 0   # 数据集当前已分配的条数
+
+        self.grp = grp
+        self.ts_dset = grp.create_dataset(
+            "timestamp", shape=(0,), maxshape=(None,), dtype='f8', chunks=(chunk_rows,)
+        )
+        self.raw_dset = grp.create_dataset(
+            "raw", shape=(0, frame_size), maxshape=(None, frame_size), dtype='u1',
+            chunks=(chunk_rows, frame_size)
+        )
+        self.parsed_dset = None
+
+    def append(self, timestamp, raw_data, parsed_data):
+        """暂存一帧，返回暂存区是否已满"""
+        raw = np.frombuffer(raw_data, dtype=np.uint8)
+        if raw.shape[0] != self.frame_size:
+            raise ValueError(f"帧长度不一致：期望 {self.frame_size}，实际 {raw.shape[0]}")
+        i = self.count
+        self.ts[i] = timestamp
+        self.raw[i] = raw
+        self.parsed[i] = parsed_data
+        if parsed_data is not None:
+            self.has_parsed = True
+        self.count = i + 1
+        return self.count >= self.chunk_rows
+
+    def extend(self, timestamps, raw_frames, parsed=None):
+        """
+        暂存一批帧（生成器），每当暂存区写满时产出一次，由调用方负责提交
+        """
+        n = len(timestamps)
+        pos = 0
+        while pos < n:
+            take = min(self.chunk_rows - self.count, n - pos)
+            i = self.count
+            self.ts[i:i + take] = timestamps[pos:pos + take]
+            self.raw[i:i + take] = raw_frames[pos:pos + take]
+            if parsed is not None:
+                chunk = parsed[pos:pos + take]
+                self.parsed[i:i + take] = chunk
+                if any(p is not None for p in chunk):
+                    self.has_parsed = True
+            else:
+                self.parsed[i:i + take] = [None] * take
+            self.count = i + take
+            pos += take
+            if self.count >= self.chunk_rows:
+                yield
+
+    def _datasets(self):
+        dsets = [self.ts_dset, self.raw_dset]
+        if self.parsed_dset is not None:
+            dsets.append(self.parsed_dset)
+        return dsets
+
+    def commit(self):
+        """将暂存区整体写入数据集（调用方需持有文件锁）"""
+        n = self.count
+        if n == 0:
+            return
+        start, end = self.length, self.length + n
+
+        if self.has_parsed and self.parsed_dset is None:
+            self.parsed_dset = self.grp.create_dataset(
+                "parsed", shape=(self.capacity,), maxshape=(None,),
+                dtype=h5py.string_dtype('utf-8'), chunks=(self.chunk_rows,)
+            )
+
+        if end > self.capacity:
+            # 几何扩容，避免每帧一次 resize 元数据操作
+            self.capacity = max(end, self.capacity * 2, self.chunk_rows)
+            for dset in self._datasets():
+                dset.resize(self.capacity, axis=0)
+
+        self.ts_dset[start:end] = self.ts[:n]
+        self.raw_dset[start:end] = self.raw[:n]
+        if self.parsed_dset is not None:
+            self.parsed_dset[start:end] = ["" if p is None else p for p in self.parsed[:n]]
+
+        self.length = end
+        self.count = 0
+
+    def trim(self):
+        """将数据集裁剪到真实长度"""
+        for dset in self._datasets():
+            dset.resize(self.length, axis=0)
+        self.capacity = self.length
+
 
 class HDFWriter:
-    def __init__(self, filename, flush_interval=5, flush_every_n=None):
+    def __init__(self, filename, flush_interval=5, flush_every_n=None, chunk_rows=None):
+        """
+        :param filename: HDF5 文件路径
+        :param flush_interval: 定时 flush 周期(s)，为 0/None 时不启动 flush 线程
+        :param flush_every_n: 每写入 N 帧 flush 一次
+        :param chunk_rows: 分块写入模式的块大小(条)。为 None 时逐帧写入变长 raw；
+                           否则按通道暂存，raw 以定长 uint8 二维数据集存储
+        """
         self.file = h5py.File(filename, 'w')
-        self.lock = threading.Lock()
+        # 可重入：write_frame 持锁时可能触发 flush
+        self.lock = threading.RLock()
 
         self.flush_interval = flush_interval
         self.flush_every_n = flush_every_n
         self.write_count_since_flush = 0
 
+        self.chunk_rows = chunk_rows
+        self._stages = {}  # channel -> _ChannelStage
+        self._stats_lock = threading.Lock()
+
         self.total_write_count = 0
         self.channel_write_counts = defaultdict(int)
 
@@ -22,7 +144,41 @@ class HDFWriter:
             self.flush_thread = threading.Thread(target=self._flush_worker, daemon=True)
             self.flush_thread.start()
 
+    def _get_stage(self, channel, frame_size):
+        stage = self._stages.get(channel)
+        if stage is None:
+            with self.lock:
+                stage = self._stages.get(channel)
+                if stage is None:
+                    grp = self.file.require_group(f"/data/{channel}")
+                    stage = _ChannelStage(grp, frame_size, self.chunk_rows)
+                    self._stages[channel] = stage
+        return stage
+
+    def _commit_stage(self, stage):
+        with self.lock:
+            stage.commit()
+
+    def _count_writes(self, channel, n):
+        with self._stats_lock:
+            self.total_write_count += n
+            self.channel_write_counts[channel] += n
+            self.write_count_since_flush += n
+            need_flush = bool(self.flush_every_n and self.write_count_since_flush >= self.flush_every_n)
+            if need_flush:
+                self.write_count_since_flush = 0
+        if need_flush:
+            self.flush()
+
     def write_frame(self, channel, timestamp, raw_data, parsed_data=None):
+        if self.chunk_rows:
+            stage = self._get_stage(channel, len(raw_data))
+            with stage.lock:
+                if stage.append(timestamp, raw_data, parsed_data):
+                    self._commit_stage(stage)
+            self._count_writes(channel, 1)
+            return
+
         with self.lock:
             grp = self.file.require_group(f"/data/{channel}")
 
@@ -49,17 +205,60 @@ class HDFWriter:
                 parsed_dset.resize((idx + 1,))
                 parsed_dset[idx] = parsed_data
 
-            # 更新写入计数
-            self.total_write_count += 1
-            self.channel_write_counts[channel] += 1
-            self.write_count_since_flush += 1
+        # 更新写入计数，条数阈值触发 flush
+        self._count_writes(channel, 1)
 
-            # 条数阈值触发 flush
-            if self.flush_every_n and self.write_count_since_flush >= self.flush_every_n:
-                self.flush()
-                self.write_count_since_flush = 0
+    def write_frames(self, channel, timestamps, raw_frames, parsed=None):
+        """
+        批量写入同一通道的多帧数据（仅分块写入模式）
+        :param timestamps: 时间戳序列
+        :param raw_frames: (N, L) uint8 数组或等长 bytes 序列
+        :param parsed: 可选的解析结果字符串序列
+        :raises ValueError: 帧长度不一致或与该通道已有的帧长度不同，此时整批均不写入
+        """
+        if not self.chunk_rows:
+            for i, ts in enumerate(timestamps):
+                self.write_frame(channel, ts, raw_frames[i], None if parsed is None else parsed[i])
+            return
+
+        n = len(timestamps)
+        if n == 0:
+            return
+        if not isinstance(raw_frames, np.ndarray):
+            sizes = set(map(len, raw_frames))
+            if len(sizes) != 1:
+                raise ValueError(f"批量写入的帧长度不一致: {sorted(sizes)}")
+            raw_frames = np.frombuffer(b"".join(raw_frames), dtype=np.uint8).reshape(n, sizes.pop())
+        stage = self._get_stage(channel, raw_frames.shape[1])
+        if raw_frames.shape[1] != stage.frame_size:
+            raise ValueError(f"帧长度不一致：期望 {stage.frame_size}，实际 {raw_frames.shape[1]}")
+        with stage.lock:
+            for _ in stage.extend(np.asarray(timestamps, dtype='f8'), raw_frames, parsed):
+                self._commit_stage(stage)
+        self._count_writes(channel, n)
+
+    def write_record(self, path, record: dict):
+        """
+        向 path 处的表追加一行数值记录（统计、健康度等低频数据）
+        表为一维结构化数据集，列由首次写入的 record 键确定，均为 f8
+        """
+        with self.lock:
+            dset = self.file.get(path)
+            if dset is None:
+                dtype = np.dtype([(k, 'f8') for k in record])
+                dset = self.file.create_dataset(path, shape=(0,), maxshape=(None,), dtype=dtype, chunks=(256,))
+            row = np.zeros((), dtype=dset.dtype)
+            for k in dset.dtype.names:
+                row[k] = record.get(k, np.nan)
+            n = dset.shape[0]
+            dset.resize((n + 1,))
+            dset[n] = row
 
     def flush(self):
+        # 锁顺序固定为 通道暂存锁 -> 文件锁
+        for stage in list(self._stages.values()):
+            with stage.lock:
+                self._commit_stage(stage)
         with self.lock:
             self.file.flush()
             print(f"[{time.strftime('%H:%M:%S')}] Flushed to disk. Total writes: {self.total_write_count}")
@@ -69,7 +268,7 @@ class HDFWriter:
             self.flush()
 
     def get_stats(self):
-        with self.lock:
+        with self._stats_lock:
             # 返回一个深拷贝，避免外部修改内部状态
             return {
                 "total": self.total_write_count,
@@ -81,9 +280,231 @@ class HDFWriter:
         if self.flush_interval:
             self.flush_thread.join()
         self.flush()
-        self.file.close()
+        with self.lock:
+            for stage in self._stages.values():
+                stage.trim()
+            self.file.close()
         print("HDF5 文件已关闭。")
 
+BACKPRESSURE_BLOCK = "block"
+BACKPRESSURE_DROP_OLDEST = "drop_oldest"
+BACKPRESSURE_DROP_NEWEST = "drop_newest"
+
+
+class AsyncHDFWriter:
+    """
+    异步 HDF5 写入器
+
+    生产者线程只把 (channel, ts, raw, parsed) 追加到有界队列后立即返回；
+    由唯一的 I/O 线程持有 h5py 句柄，批量取出数据写盘并定时 flush，
+    磁盘变慢时不会阻塞采集线程（block 策略除外）。
+    关闭后或 I/O 线程异常退出后到达的帧不再入队，计入 dropped_closed。
+    """
+    def __init__(self, filename, max_queue=100000, backpressure=BACKPRESSURE_DROP_OLDEST,
+                 batch_size=4096, drain_interval=0.05, flush_interval=5, chunk_rows=4096):
+        """
+        :param max_queue: 队列容量（帧）
+        :param backpressure: 队列满时的策略：block / drop_oldest / drop_newest
+        :param batch_size: I/O 线程单次最多取出的帧数
+        :param drain_interval: 队列为空时 I/O 线程的轮询周期(s)
+        :param flush_interval: 定时 flush 周期(s)，由 I/O 线程执行
+        :param chunk_rows: 传递给 HDFWriter 的分块大小
+        """
+        if backpressure not in (BACKPRESSURE_BLOCK, BACKPRESSURE_DROP_OLDEST, BACKPRESSURE_DROP_NEWEST):
+            raise ValueError(f"未知的背压策略: {backpressure}")
+
+        self.filename = filename
+        self.max_queue = max_queue
+        self.backpressure = backpressure
+        self.batch_size = batch_size
+        self.drain_interval = drain_interval
+        self.flush_interval = flush_interval
+        self.chunk_rows = chunk_rows
+
+        # deque 的 append/popleft 在 CPython 中是原子操作，生产者无需加锁
+        self._queue = deque()
+        self._records = deque()  # write_record 的低频记录，不受背压策略影响
+        self._not_full = threading.Condition(threading.Lock())
+        self._drop_lock = threading.Lock()
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.blocked_count = 0
+        self.dropped_closed = 0  # 写入器已关闭或 I/O 线程已退出时到达的帧
+        self.max_queue_depth = 0
+        self.write_errors = 0
+        self.flush_errors = 0
+
+        self._writer = None
+        self._error = None
+        self._ready = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._io_worker, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def write_frame(self, channel, timestamp, raw_data, parsed_data=None):
+        """入队一帧，立即返回"""
+        if self._stop_event.is_set() or not self._thread.is_alive():
+            self._drop_closed()
+            return
+        item = (channel, timestamp, raw_data, parsed_data)
+        q = self._queue
+        if len(q) >= self.max_queue:
+            if self.backpressure == BACKPRESSURE_DROP_NEWEST:
+                with self._drop_lock:
+                    self.dropped_newest += 1
+                return
+            if self.backpressure == BACKPRESSURE_DROP_OLDEST:
+                try:
+                    q.popleft()
+                    with self._drop_lock:
+                        self.dropped_oldest += 1
+                except IndexError:
+                    pass
+            else:
+                with self._not_full:
+                    self.blocked_count += 1
+                    while len(q) >= self.max_queue and not self._stop_event.is_set() and self._thread.is_alive():
+                        self._not_full.wait(self.drain_interval)
+                if self._stop_event.is_set() or not self._thread.is_alive():
+                    self._drop_closed()
+                    return
+        q.append(item)
+
+    def _drop_closed(self):
+        with self._drop_lock:
+            self.dropped_closed += 1
+
+    def write_record(self, path, record: dict):
+        """入队一行数值记录，由 I/O 线程写入 path 处的表"""
+        self._records.append((path, dict(record)))
+
+    def _drain_records(self):
+        while self._records:
+            path, record = self._records.popleft()
+            try:
+                self._writer.write_record(path, record)
+            except Exception as e:
+                self.write_errors += 1
+                print(f"[AsyncHDFWriter] 记录 {path} 写入失败: {e}")
+
+    def _drain(self):
+        """取出至多 batch_size 帧，按通道分组批量写入"""
+        q = self._queue
+        depth = len(q)
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+        n = min(depth, self.batch_size)
+        if n == 0:
+            return 0
+
+        groups = defaultdict(lambda: ([], [], []))
+        popleft = q.popleft
+        for _ in range(n):
+            channel, ts, raw, parsed = popleft()
+            ts_list, raw_list, parsed_list = groups[channel]
+            ts_list.append(ts)
+            raw_list.append(raw)
+            parsed_list.append(parsed)
+
+        if self.backpressure == BACKPRESSURE_BLOCK:
+            with self._not_full:
+                self._not_full.notify_all()
+
+        for channel, (ts_list, raw_list, parsed_list) in groups.items():
+            if all(p is None for p in parsed_list):
+                parsed_list = None
+            try:
+                self._writer.write_frames(channel, ts_list, raw_list, parsed_list)
+            except ValueError as e:
+                # 批内混有长度不符的帧：逐帧写入，只丢弃长度不符的帧
+                failed = self._write_each(channel, ts_list, raw_list, parsed_list)
+                print(f"[AsyncHDFWriter] 通道 {channel} {failed}/{len(ts_list)} 帧写入失败: {e}")
+            except Exception as e:
+                self.write_errors += len(ts_list)
+                print(f"[AsyncHDFWriter] 通道 {channel} 写入失败: {e}")
+        return n
+
+    def _write_each(self, channel, ts_list, raw_list, parsed_list):
+        """逐帧写入，返回失败的帧数"""
+        failed = 0
+        for i, ts in enumerate(ts_list):
+            try:
+                self._writer.write_frame(channel, ts, raw_list[i], None if parsed_list is None else parsed_list[i])
+            except ValueError:
+                failed += 1
+        self.write_errors += failed
+        return failed
+
+    def _io_worker(self):
+        try:
+            self._writer = HDFWriter(self.filename, flush_interval=None, chunk_rows=self.chunk_rows)
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        last_flush = time.monotonic()
+        while True:
+            stopping = self._stop_event.is_set()
+            drained = self._drain()
+            self._drain_records()
+            if self.flush_interval and time.monotonic() - last_flush >= self.flush_interval:
+                try:
+                    self._writer.flush()
+                except Exception as e:
+                    self.flush_errors += 1
+                    print(f"[AsyncHDFWriter] flush 失败: {e}")
+                last_flush = time.monotonic()
+            if drained:
+                continue
+            if stopping:
+                break
+            self._stop_event.wait(self.drain_interval)
+
+        try:
+            self._writer.close()
+        except Exception as e:
+            self.flush_errors += 1
+            print(f"[AsyncHDFWriter] 关闭文件失败: {e}")
+
+    def flush(self):
+        """
+        等待队列清空；实际写盘与 flush 由 I/O 线程完成
+        :raises RuntimeError: I/O 线程已退出而队列中仍有未写入的帧
+        """
+        while self._queue and self._thread.is_alive():
+            time.sleep(self.drain_interval)
+        if self._queue:
+            raise RuntimeError(f"I/O 线程已退出，{len(self._queue)} 帧未写入")
+
+    def get_stats(self):
+        stats = self._writer.get_stats() if self._writer else {"total": 0, "per_channel": {}}
+        with self._drop_lock:
+            stats.update({
+                "queued": len(self._queue),
+                "max_queue_depth": self.max_queue_depth,
+                "dropped_oldest": self.dropped_oldest,
+                "dropped_newest": self.dropped_newest,
+                "dropped_closed": self.dropped_closed,
+                "dropped": self.dropped_oldest + self.dropped_newest + self.dropped_closed,
+                "blocked": self.blocked_count,
+                "write_errors": self.write_errors,
+                "flush_errors": self.flush_errors,
+            })
+        return stats
+
+    def close(self):
+        """停止接收并在 I/O 线程中写完剩余数据后关闭文件"""
+        self._stop_event.set()
+        with self._not_full:
+            self._not_full.notify_all()
+        self._thread.join()
+
+
 # =====================
 # 示例：写入模拟数据 + 打印监控信息
 # =====================
@@ -0,0 +1,67 @@
+"""
+功能描述：RS422Manager 采集后端吞吐量基准
+
+16 通道 × 1 kHz 模拟采集，消费者每 50 ms 取空一次各通道显示队列，
+对比线程后端（queue.Queue）与进程后端（共享内存环形缓冲区）的持续帧/秒与丢帧数
+
+运行：python -m src.components.BusDataMonitor.monitor.bench_backend
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))))
+from src.components.BusDataMonitor.monitor.busdata_producer import RS422Manager, drain_queue
+
+
+def _config(channels, freq):
+    return {
+        str(ch): {"TorR": "Tx", "freq": freq, "store": False, "Tx": "send422", "Rx": "recv422"}
+        for ch in range(channels)
+    }
+
+
+def _run(backend, channels, freq, duration, warmup=1.0, startup_timeout=30.0):
+    mgr = RS422Manager(_config(channels, freq), use_sim=True, backend=backend)
+    mgr.start_all(record=False)
+    try:
+        # 等待所有通道都开始出帧（进程后端需要先完成子进程启动），再预热 warmup 秒
+        started = set()
+        deadline = time.perf_counter() + startup_timeout
+        while len(started) < channels and time.perf_counter() < deadline:
+            for ch_id, q in mgr.queues.items():
+                if drain_queue(q):
+                    started.add(ch_id)
+            time.sleep(0.05)
+        deadline = time.perf_counter() + warmup
+        while time.perf_counter() < deadline:
+            for q in mgr.queues.values():
+                drain_queue(q)
+            time.sleep(0.05)
+
+        received = 0
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            for q in mgr.queues.values():
+                received += len(drain_queue(q))
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+    finally:
+        mgr.stop_all()
+    lost = sum(getattr(q, "lost", 0) for q in mgr.queues.values())
+    return received / elapsed, lost, cpu / elapsed
+
+
+def bench(channels=16, freq=1000, duration=5.0):
+    target = channels * freq
+    print(f"{channels} 通道 × {freq} Hz（目标 {target:,} 帧/秒），持续 {duration:.0f} s")
+    print(f"{'后端':<10}{'帧/秒':>14}{'达成率':>10}{'丢帧':>10}{'GUI进程CPU':>14}")
+    for backend in ("thread", "process"):
+        rate, lost, cpu = _run(backend, channels, freq, duration)
+        print(f"{backend:<10}{rate:>14,.0f}{rate / target:>10.1%}{lost:>10}{cpu:>14.1%}")
+
+
+if __name__ == "__main__":
+    bench()
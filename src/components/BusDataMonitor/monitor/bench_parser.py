@@ -0,0 +1,90 @@
+"""
+功能描述：BusDataParser 解析性能基准
+
+对比原实现（每个字段把整帧转为大整数后移位）、逐帧 parse() 与批量 parse_batch()
+在 1 帧 / 10000 帧批次下的吞吐量（帧/秒）；另用一个合成协议覆盖
+任意位偏移、小端、有/无符号、float32/float64 与打包数组字段
+
+运行：python -m src.components.BusDataMonitor.monitor.bench_parser
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))))
+from src.components.BusDataMonitor.monitor.busdata_parser import BusDataParser
+from src.components.BusDataMonitor.protocol import ProtocolLoader
+
+
+def _timeit(func, budget=0.5):
+    """重复执行直到耗时超过 budget 秒，返回单次平均耗时"""
+    count = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget:
+            return elapsed / count
+
+
+def legacy_parse(protocol, data_bytes):
+    """原实现：每个字段都对整帧调用 _extract_bits（已按 bit_offset 修正起始位，仅支持大端整数）"""
+    result = {}
+    for field in protocol["fields"]:
+        start_bit = field["byte_offset"] * 8 + field.get("bit_offset", 0)
+        result[field["name"]] = BusDataParser._extract_bits(data_bytes, start_bit, field["bit_length"])
+    return result
+
+
+def mixed_protocol(frame_len=256):
+    """合成协议：各类字段轮流排列，位偏移不对齐"""
+    kinds = [
+        {"type": "uint", "bit_length": 13},
+        {"type": "int", "bit_length": 21, "byte_order": "little"},
+        {"type": "fixed", "bit_length": 16, "scale": 0.01, "offset": -5.0},
+        {"type": "float32", "bit_length": 32},
+        {"type": "float64", "bit_length": 64, "byte_order": "little"},
+        {"type": "uint", "bit_length": 12, "count": 8},
+        {"type": "int", "bit_length": 16, "count": 4, "byte_order": "little"},
+    ]
+    fields = []
+    bit = 3
+    while True:
+        spec = dict(kinds[len(fields) % len(kinds)])
+        size = spec["bit_length"] * spec.get("count", 1)
+        if bit + size > frame_len * 8:
+            break
+        spec.update(name=f"f{len(fields)}", byte_offset=bit // 8, bit_offset=bit % 8)
+        fields.append(spec)
+        bit += size + 1
+    return {"protocol_name": "mixed", "protocol_length": frame_len, "fields": fields}
+
+
+def bench_protocol(name, batch_sizes=(1, 10000)):
+    protocol = mixed_protocol() if name == "mixed" else ProtocolLoader().get(name)
+    parser = BusDataParser(protocol)
+    frame_len = protocol.get("protocol_length", parser.min_length)
+    rng = np.random.default_rng(0)
+
+    print(f"\n协议 {name}（{len(parser.fields)} 个字段，帧长 {frame_len} 字节）")
+    print(f"{'模式':<14}{'批大小':>8}{'帧/秒':>16}")
+    for n in batch_sizes:
+        frames = rng.integers(0, 256, size=(n, frame_len), dtype=np.uint8)
+        frame_bytes = [row.tobytes() for row in frames]
+
+        t_loop = _timeit(lambda: [parser.parse(b) for b in frame_bytes])
+        t_batch = _timeit(lambda: parser.parse_batch(frames))
+
+        if name != "mixed":
+            t_legacy = _timeit(lambda: [legacy_parse(protocol, b) for b in frame_bytes[:1000]])
+            print(f"{'原实现':<14}{n:>8}{min(n, 1000) / t_legacy:>16,.0f}")
+        print(f"{'parse':<14}{n:>8}{n / t_loop:>16,.0f}")
+        print(f"{'parse_batch':<14}{n:>8}{n / t_batch:>16,.0f}")
+
+
+if __name__ == "__main__":
+    for proto_name in ("send422", "recv422", "mixed"):
+        bench_protocol(proto_name)
@@ -0,0 +1,53 @@
+"""
+功能描述：RS422 模拟生产者单帧 CPU 开销基准
+
+对比旧负载（逐字节 randint + 十六进制拼接 + strftime 时间戳）
+与新负载（(monotonic_ns, 方向, bytes) 二进制记录）在 64/128 字节帧下的每帧 CPU 耗时
+
+运行：python -m src.components.BusDataMonitor.monitor.bench_producer
+"""
+import os
+import sys
+import time
+import queue
+import random
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))))
+from src.components.BusDataMonitor.monitor.busdata_producer import RS422SimProducer
+
+
+def legacy_frame(tor, length):
+    """旧实现：生产者线程上完成时间与十六进制格式化"""
+    ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+    frame = bytes(random.randint(0, 255) for _ in range(length))
+    hex_str = " ".join(f"{b:02X}" for b in frame)
+    return (ts, tor, hex_str)
+
+
+def binary_frame(producer, tor, length):
+    """新实现：只生成原始帧与 monotonic 时间戳"""
+    return (time.monotonic_ns(), tor, producer._rand_frame(length))
+
+
+def bench(n=20000):
+    producer = RS422SimProducer("0", queue.Queue(), "Tx", 20)
+    print(f"{'帧长':>6}{'旧负载(us/帧)':>16}{'新负载(us/帧)':>16}{'加速比':>10}")
+    for length in (64, 128):
+        q = queue.Queue()
+        start = time.process_time()
+        for _ in range(n):
+            q.put_nowait(legacy_frame("Tx", length))
+        t_legacy = (time.process_time() - start) / n
+
+        q = queue.Queue()
+        start = time.process_time()
+        for _ in range(n):
+            q.put_nowait(binary_frame(producer, "Tx", length))
+        t_binary = (time.process_time() - start) / n
+
+        print(f"{length:>6}{t_legacy * 1e6:>16.2f}{t_binary * 1e6:>16.2f}{t_legacy / t_binary:>10.1f}")
+
+
+if __name__ == "__main__":
+    bench()
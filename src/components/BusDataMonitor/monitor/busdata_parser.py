@@ -1,10 +1,161 @@
 import json
-from typing import Dict, Any, Union
+import struct
+from typing import Dict, Any, Union, List, Sequence
+
+import numpy as np
+
+# 字段类型编码（编译后使用整型分派，避免逐帧比较字符串）
+KIND_UINT = 0
+KIND_INT = 1
+KIND_FIXED = 2
+KIND_ENUM = 3
+KIND_FLOAT = 4
+
+# excel2json 对空白 Type 单元格会写出 "nan"，按无符号原始值处理
+_TYPE_KINDS = {
+    "uint": KIND_UINT,
+    "nan": KIND_UINT,
+    "": KIND_UINT,
+    "int": KIND_INT,
+    "fixed": KIND_FIXED,
+    "enum": KIND_ENUM,
+    "float": KIND_FLOAT,
+    "float32": KIND_FLOAT,
+    "float64": KIND_FLOAT,
+    "double": KIND_FLOAT,
+}
+# 指明位宽的浮点类型名
+_FLOAT_BITS = {"float32": 32, "float64": 64, "double": 64}
+_FLOAT_FORMATS = {32: ">f", 64: ">d"}
+BYTE_ORDERS = ("big", "little")
+
+# 枚举查找表的最大位宽，超过则退化为字典查找
+_ENUM_TABLE_MAX_BITS = 16
+# 字段（数组为单个元素）最大位宽
+_MAX_BITS = 64
+
+# 预编译协议文件（excel2json 生成在协议 JSON 旁），格式变化时递增 COMPILED_FORMAT
+COMPILED_SUFFIX = ".pcf"
+COMPILED_FORMAT = 2
+_COMPILED_MAGIC = b"PCF\0"
+_COMPILED_HEADER = struct.Struct("<4sIIII40s")  # magic, 格式版本, 字段数, 枚举项数, 字符串区字节数, 源 sha1
+_COMPILED_DTYPE = np.dtype([
+    ("kind", "u1"), ("start_bit", "<u4"), ("bit_length", "u1"), ("little", "u1"),
+    ("count", "<u4"), ("stride", "<u4"), ("scale", "<f8"), ("offset", "<f8"), ("int_params", "u1"),
+])
+_COMPILED_ENUM_DTYPE = np.dtype([("field", "<u4"), ("key", "<u8")])
+
+
+def _bit_window(start_bit, bit_length):
+    """覆盖 [start_bit, start_bit + bit_length) 的字节范围及拼接后需要右移的位数"""
+    start = start_bit // 8
+    stop = (start_bit + bit_length + 7) // 8
+    return start, stop, stop * 8 - (start_bit + bit_length)
+
+
+class CompiledField:
+    """
+    预编译后的字段描述
+
+    解析单个字段只需：取 data[start:stop] 按 byteorder 转为整数，右移 shift 位再与 mask 相与。
+    小端字段先把覆盖的字节按小端拼成整数，再按高位优先的位偏移取位（整字节字段即常规小端数）。
+    数组字段（count > 1）由 count 个等宽元素组成，相邻元素起始位相差 stride 位，
+    start/stop 为整个数组覆盖的字节范围，elements 为各元素的 (start, stop, shift)。
+    """
+    __slots__ = ("name", "kind", "start_bit", "start", "stop", "shift", "mask", "bit_length",
+                 "sign_bit", "scale", "offset", "enum_map", "enum_table",
+                 "little", "byteorder", "count", "stride", "elements", "index", "shifts", "float_format")
+
+    def __init__(self, name, kind, start_bit, bit_length, little=False, count=1, stride=None,
+                 scale=1, offset=0, enum_map=None):
+        if not 0 < bit_length <= _MAX_BITS:
+            raise ValueError(f"字段 {name} 位宽不受支持: {bit_length}")
+        if kind == KIND_FLOAT and bit_length not in _FLOAT_FORMATS:
+            raise ValueError(f"浮点字段 {name} 位宽必须为 32 或 64: {bit_length}")
+        if count < 1:
+            raise ValueError(f"字段 {name} 元素个数必须大于 0: {count}")
+        self.name = name
+        self.kind = kind
+        self.start_bit = start_bit
+        self.bit_length = bit_length
+        self.mask = (1 << bit_length) - 1
+        self.sign_bit = 1 << (bit_length - 1)
+        self.little = bool(little)
+        self.byteorder = "little" if little else "big"
+        self.count = count
+        self.stride = bit_length if stride is None else stride
+        self.scale = scale
+        self.offset = offset
+        self.float_format = struct.Struct(_FLOAT_FORMATS[bit_length]) if kind == KIND_FLOAT else None
+
+        self.elements = [_bit_window(start_bit + i * self.stride, bit_length) for i in range(count)]
+        self.start = min(e[0] for e in self.elements)
+        self.stop = max(e[1] for e in self.elements)
+        self.shift = self.elements[0][2]
+        self._compile_index()
+
+        self.enum_map = enum_map or {}
+        self.enum_table = None
+        if kind == KIND_ENUM and bit_length <= _ENUM_TABLE_MAX_BITS:
+            table = np.array([f"UNKNOWN({i})" for i in range(1 << bit_length)], dtype=object)
+            for k, v in self.enum_map.items():
+                if 0 <= k < len(table):
+                    table[k] = v
+            self.enum_table = table
+
+    def _compile_index(self):
+        """
+        批量解析用的字节索引：index 为 (count, n) 的帧内字节序号，按从高到低的有效位排列；
+        shifts 为各元素拼接后的右移位数。大端且不超过 8 字节的标量字段走按列拼接的快速路径，不需要索引。
+        """
+        self.index = None
+        self.shifts = None
+        n = max(stop - start for start, stop, _ in self.elements)
+        if self.count == 1 and not self.little and n <= 8:
+            return
+        if n > 8 and self.count > 1:
+            raise ValueError(f"数组字段 {self.name} 的元素跨越 {n} 个字节，最多支持 8 个")
+        # 数组元素统一补齐为 n 字节：大端在低位补字节（右移位数随之增加），小端在高位补字节（被掩码去掉）
+        index = np.empty((self.count, n), dtype=np.intp)
+        shifts = np.empty(self.count, dtype=np.uint64)
+        for i, (start, stop, shift) in enumerate(self.elements):
+            cols = np.arange(start, start + n)
+            if self.little:
+                index[i] = cols[::-1]
+                shifts[i] = shift
+            else:
+                index[i] = cols
+                shifts[i] = shift + 8 * (start + n - stop)
+        self.index = index
+        self.shifts = shifts
+
+    def enum_label(self, raw_value: int):
+        if self.enum_table is not None:
+            return self.enum_table[raw_value]
+        return self.enum_map.get(raw_value, f"UNKNOWN({raw_value})")
+
+    def value(self, raw_value: int):
+        """原始位值换算为字段值（单个值）"""
+        kind = self.kind
+        if kind == KIND_UINT:
+            return raw_value
+        if kind == KIND_INT:
+            if raw_value & self.sign_bit:
+                raw_value -= (1 << self.bit_length)
+            return raw_value * self.scale + self.offset
+        if kind == KIND_ENUM:
+            return self.enum_label(raw_value)
+        if kind == KIND_FLOAT:
+            value = self.float_format.unpack(raw_value.to_bytes(self.bit_length // 8, "big"))[0]
+            return value * self.scale + self.offset
+        return raw_value * self.scale + self.offset
+
 
 class BusDataParser:
-    def __init__(self, protocol: Union[str, Dict[str, Any]]):
+    def __init__(self, protocol: Union[str, Dict[str, Any]], fields: List[CompiledField] = None):
         """
         :param protocol: 协议文件路径 或 协议字典
+        :param fields: 已编译的字段列表（如 load_compiled() 的结果），为 None 时按协议编译
         """
         if isinstance(protocol, str):
             with open(protocol, 'r', encoding='utf-8') as f:
@@ -15,6 +166,10 @@ class BusDataParser:
         if "fields" not in self.protocol:
             raise ValueError("协议格式错误：必须包含 'fields' 字段")
 
+        # 协议编译：字段切片、移位、掩码、换算参数及枚举表只计算一次
+        self.fields = self.compile(self.protocol) if fields is None else fields
+        self.min_length = max((f.stop for f in self.fields), default=0)
+
     @staticmethod
     def _extract_bits(data_bytes: bytes, start_bit: int, length: int) -> int:
         """
@@ -31,48 +186,298 @@ class BusDataParser:
         mask = (1 << length) - 1
         return (value >> shift) & mask
 
+    @staticmethod
+    def _parse_enum_key(key, bit_length: int):
+        """
+        解析枚举表的键，兼容 '0x1A'、'0b01'、与位宽等长的二进制串 '01' 以及十进制 '3'
+        """
+        key = str(key).strip()
+        lower = key.lower()
+        if lower.startswith("0x"):
+            return int(lower, 16)
+        if lower.startswith("0b"):
+            return int(lower, 2)
+        if bit_length > 1 and len(key) == bit_length and set(key) <= {"0", "1"}:
+            return int(key, 2)
+        return int(key)
+
+    @classmethod
+    def compile(cls, protocol: Dict[str, Any]) -> List[CompiledField]:
+        """
+        将协议 JSON 编译为字段列表
+
+        字段起始位 = byte_offset * 8 + bit_offset（高位优先），只截取字段实际覆盖的字节。
+        可选字段属性：
+        - byte_order: "big"（默认，可在协议顶层统一指定）或 "little"
+        - count / stride: 数组元素个数与相邻元素的起始位间隔（默认为 bit_length，即紧密排列）
+        - type 为 float/float32/float64/double 时按 IEEE 754 解释，bit_length 须为 32 或 64
+        """
+        default_order = str(protocol.get("byte_order", "big")).lower()
+        compiled = []
+        for field in protocol["fields"]:
+            ftype = str(field.get("type", "")).lower()
+            if ftype not in _TYPE_KINDS:
+                raise ValueError(f"未知字段类型: {ftype}")
+            kind = _TYPE_KINDS[ftype]
+
+            bit_length = int(field["bit_length"])
+            if ftype in _FLOAT_BITS and bit_length != _FLOAT_BITS[ftype]:
+                raise ValueError(f"字段 {field['name']} 类型 {ftype} 与位宽 {bit_length} 不符")
+            start_bit = int(field["byte_offset"]) * 8 + int(field.get("bit_offset", 0))
+
+            byte_order = str(field.get("byte_order", default_order)).lower()
+            if byte_order not in BYTE_ORDERS:
+                raise ValueError(f"字段 {field['name']} 字节序不受支持: {byte_order}")
+            stride = field.get("stride")
+
+            enum_map = None
+            if kind == KIND_ENUM:
+                enum_map = {}
+                for k, v in (field.get("values") or field.get("map") or {}).items():
+                    try:
+                        enum_map[cls._parse_enum_key(k, bit_length)] = v
+                    except ValueError:
+                        continue
+
+            compiled.append(CompiledField(
+                name=field["name"],
+                kind=kind,
+                start_bit=start_bit,
+                bit_length=bit_length,
+                little=byte_order == "little",
+                count=int(field.get("count", 1)),
+                stride=None if stride is None else int(stride),
+                scale=field.get("scale", 1),
+                offset=field.get("offset", 0),
+                enum_map=enum_map,
+            ))
+        return compiled
+
+    @staticmethod
+    def save_compiled(fields: List[CompiledField], path, source_digest: str = ""):
+        """
+        将编译结果保存为二进制文件
+
+        文件结构：文件头 | 字段表 | 枚举表(字段序号, 键) | 字段名与枚举标签（UTF-8，以 \\0 分隔），
+        不含 pickle，加载时整块读取后按偏移切片。
+        :param source_digest: 源协议 JSON 的 sha1，加载时用于判断是否过期
+        """
+        table = np.zeros(len(fields), dtype=_COMPILED_DTYPE)
+        enums = []
+        strings = []
+        for i, f in enumerate(fields):
+            int_params = isinstance(f.scale, int) and isinstance(f.offset, int)
+            table[i] = (f.kind, f.start_bit, f.bit_length, f.little, f.count, f.stride,
+                        f.scale, f.offset, int_params)
+            strings.append(str(f.name))
+        for i, f in enumerate(fields):
+            for k, v in f.enum_map.items():
+                enums.append((i, k))
+                strings.append(str(v))
+        enum_table = np.array(enums, dtype=_COMPILED_ENUM_DTYPE)
+        blob = "\0".join(strings).encode("utf-8")
+        header = _COMPILED_HEADER.pack(
+            _COMPILED_MAGIC, COMPILED_FORMAT, len(fields), len(enums), len(blob), source_digest.encode("ascii")
+        )
+        with open(path, "wb") as fp:
+            fp.write(header + table.tobytes() + enum_table.tobytes() + blob)
+
+    @staticmethod
+    def load_compiled(path, source_digest: str = None) -> Union[List[CompiledField], None]:
+        """
+        读取 save_compiled() 生成的文件
+        :param source_digest: 期望的源协议 sha1，不一致时视为过期
+        :return: 字段列表；文件不存在、格式不符或已过期时返回 None
+        """
+        try:
+            with open(path, "rb") as fp:
+                content = fp.read()
+            magic, version, n_fields, n_enums, n_blob, digest = _COMPILED_HEADER.unpack_from(content)
+        except (OSError, struct.error):
+            return None
+        if magic != _COMPILED_MAGIC or version != COMPILED_FORMAT:
+            return None
+        if source_digest is not None and digest.rstrip(b"\0").decode("ascii") != source_digest:
+            return None
+        pos = _COMPILED_HEADER.size
+        enum_pos = pos + n_fields * _COMPILED_DTYPE.itemsize
+        blob_pos = enum_pos + n_enums * _COMPILED_ENUM_DTYPE.itemsize
+        if len(content) != blob_pos + n_blob:
+            return None
+        table = np.frombuffer(content, _COMPILED_DTYPE, n_fields, pos)
+        enum_table = np.frombuffer(content, _COMPILED_ENUM_DTYPE, n_enums, enum_pos)
+        strings = content[blob_pos:].decode("utf-8").split("\0")
+
+        enum_maps = {}
+        for (i, k), label in zip(enum_table.tolist(), strings[n_fields:]):
+            enum_maps.setdefault(i, {})[k] = label
+        fields = []
+        for i, row in enumerate(table.tolist()):
+            kind, start_bit, bit_length, little, count, stride, scale, offset, int_params = row
+            if int_params:
+                scale, offset = int(scale), int(offset)
+            fields.append(CompiledField(
+                strings[i], kind, start_bit, bit_length, little=little, count=count, stride=stride,
+                scale=scale, offset=offset,
+                enum_map=enum_maps.get(i, {}) if kind == KIND_ENUM else None,
+            ))
+        return fields
+
     def parse(self, data: Union[bytes, str]) -> Dict[str, Any]:
         """
         解析一帧总线数据
         :param data: bytes 或 16进制字符串（如 '0A1B2C3D'）
-        :return: dict 解析结果
+        :return: dict 解析结果，数组字段的值为列表
         """
         if isinstance(data, str):
             data_bytes = bytes.fromhex(data)
-        elif isinstance(data, bytes):
-            data_bytes = data
+        elif isinstance(data, (bytes, bytearray, memoryview)):
+            data_bytes = bytes(data)
         else:
             raise TypeError("data 必须是 bytes 或十六进制字符串")
 
+        if len(data_bytes) < self.min_length:
+            raise ValueError("提取的位范围超出数据长度")
+
+        from_bytes = int.from_bytes
         result = {}
-        for field in self.protocol["fields"]:
-            raw_value = self._extract_bits(
-                data_bytes,
-                field["byte_offset"],
-                field["bit_length"]
-            )
-
-            ftype = field["type"]
-            if ftype == "uint":
+        for f in self.fields:
+            if f.count > 1:
+                order, mask = f.byteorder, f.mask
+                result[f.name] = [
+                    f.value((from_bytes(data_bytes[start:stop], order) >> shift) & mask)
+                    for start, stop, shift in f.elements
+                ]
+                continue
+
+            raw_value = (from_bytes(data_bytes[f.start:f.stop], f.byteorder) >> f.shift) & f.mask
+
+            kind = f.kind
+            if kind == KIND_UINT:
                 value = raw_value
-            elif ftype == "int":
+            elif kind == KIND_INT:
                 # 将值扩展为有符号数
-                sign_bit = 1 << (field["length"] - 1)
-                if raw_value & sign_bit:
-                    # 负数补码转换
-                    raw_value -= (1 << field["length"])
-                scale = field.get("scale", 1)
-                offset = field.get("offset", 0)
-                value = raw_value * scale + offset
-            elif ftype == "enum":
-                value = field["values"].get(str(raw_value), f"UNKNOWN({raw_value})")
-            elif ftype == "fixed":
-                scale = field.get("scale", 1)
-                offset = field.get("offset", 0)
-                value = raw_value * scale + offset
+                if raw_value & f.sign_bit:
+                    raw_value -= (1 << f.bit_length)
+                value = raw_value * f.scale + f.offset
+            elif kind == KIND_ENUM:
+                value = f.enum_label(raw_value)
+            elif kind == KIND_FLOAT:
+                value = f.value(raw_value)
             else:
-                raise ValueError(f"未知字段类型: {ftype}")
+                value = raw_value * f.scale + f.offset
 
-            result[field["name"]] = value
+            result[f.name] = value
 
         return result
+
+    @staticmethod
+    def _as_frame_array(frames) -> np.ndarray:
+        """将帧序列统一为 (N, L) 的 uint8 数组"""
+        if isinstance(frames, np.ndarray):
+            arr = frames
+            if arr.dtype != np.uint8:
+                arr = arr.astype(np.uint8)
+            if arr.ndim == 1:
+                arr = arr.reshape(1, -1)
+            return arr
+        frames = [bytes.fromhex(f) if isinstance(f, str) else bytes(f) for f in frames]
+        if not frames:
+            return np.empty((0, 0), dtype=np.uint8)
+        length = len(frames[0])
+        if any(len(f) != length for f in frames):
+            raise ValueError("批量解析要求所有帧长度一致")
+        return np.frombuffer(b"".join(frames), dtype=np.uint8).reshape(len(frames), length)
+
+    def parse_batch(self, frames: Union[np.ndarray, Sequence[bytes]]) -> Dict[str, np.ndarray]:
+        """
+        批量解析多帧数据，按列返回结果
+        :param frames: (N, L) 的 uint8 数组，或等长 bytes 序列
+        :return: dict 字段名 -> 长度为 N 的 numpy 数组（数组字段为 (N, count)）
+                 uint 为 uint64，int/fixed 为 float64 或 int64，float 为 float64，enum 为标签 object 数组
+        """
+        arr = self._as_frame_array(frames)
+        if arr.shape[0] == 0:
+            arr = np.empty((0, self.min_length), dtype=np.uint8)
+        elif arr.shape[1] < self.min_length:
+            raise ValueError("提取的位范围超出数据长度")
+
+        # 同一字节窗口的多个位字段共享一次拼接结果
+        windows = {}
+        result = {}
+        for f in self.fields:
+            value = self.numeric_column(arr, f, windows=windows)
+            if f.kind == KIND_ENUM:
+                if f.enum_table is not None:
+                    value = f.enum_table[value.astype(np.intp)]
+                else:
+                    uniq, inverse = np.unique(value.ravel(), return_inverse=True)
+                    labels = np.array([f.enum_label(int(u)) for u in uniq], dtype=object)
+                    value = labels[inverse].reshape(value.shape)
+            result[f.name] = value
+
+        return result
+
+    @staticmethod
+    def raw_column(arr: np.ndarray, f: CompiledField, base=0, windows=None) -> np.ndarray:
+        """
+        从 (N, L) 帧数组中批量提取一个字段的原始位值
+        :param base: arr 第 0 列对应的帧内字节偏移（只读取了部分字节列时使用）
+        :param windows: 字节窗口拼接结果缓存 {(start, stop): uint64 数组}，多个字段共享
+        :return: uint64 数组，标量字段为 (N,)，数组字段为 (N, count)
+        """
+        if f.index is None:
+            key = (f.start, f.stop)
+            acc = None if windows is None else windows.get(key)
+            if acc is None:
+                start, stop = f.start - base, f.stop - base
+                acc = arr[:, start].astype(np.uint64)
+                for col in range(start + 1, stop):
+                    acc = (acc << np.uint64(8)) | arr[:, col]
+                if windows is not None:
+                    windows[key] = acc
+            return (acc >> np.uint64(f.shift)) & np.uint64(f.mask)
+
+        # 小端、数组或跨 9 字节的字段：一次取出 (N, count, n) 字节后按高位在前拼接；
+        # 数组末尾元素补齐的字节可能超出帧长，其位会被移出或掩码去掉，按最后一列取值即可
+        index = np.minimum(f.index - base, arr.shape[1] - 1)
+        g = arr[:, index]
+        n = index.shape[1]
+        acc = g[..., 0].astype(np.uint64)
+        for j in range(1, min(n, 8)):
+            acc = (acc << np.uint64(8)) | g[..., j]
+        if n > 8:
+            # 仅标量字段：shift < 8，拼接 9 字节时高位溢出的位都在字段之前
+            shift = np.uint64(f.shift)
+            acc = (acc << (np.uint64(8) - shift)) | (g[..., 8] >> shift)
+        else:
+            acc = acc >> f.shifts
+        raw = acc & np.uint64(f.mask)
+        return raw[:, 0] if f.count == 1 else raw
+
+    @staticmethod
+    def numeric_column(arr: np.ndarray, f: CompiledField, base=0, windows=None) -> np.ndarray:
+        """
+        从 (N, L) 帧数组中批量提取一个字段的数值列，参数同 raw_column()
+        :return: uint 与 enum 为 uint64 原始值，int/fixed 为换算后的数值，float 为 float64
+        """
+        raw = BusDataParser.raw_column(arr, f, base, windows)
+
+        kind = f.kind
+        if kind == KIND_UINT or kind == KIND_ENUM:
+            return raw
+        if kind == KIND_INT:
+            signed = raw.astype(np.int64)
+            if f.bit_length < 64:
+                signed = np.where(raw & np.uint64(f.sign_bit), signed | np.int64(~f.mask), signed)
+            return signed * f.scale + f.offset
+        if kind == KIND_FLOAT:
+            if f.bit_length == 32:
+                with np.errstate(invalid="ignore"):  # 位模式为 signaling NaN 时
+                    value = raw.astype(np.uint32).view(np.float32).astype(np.float64)
+            else:
+                value = np.ascontiguousarray(raw).view(np.float64)
+            if f.scale != 1 or f.offset != 0:
+                value = value * f.scale + f.offset
+            return value
+        return raw * f.scale + f.offset
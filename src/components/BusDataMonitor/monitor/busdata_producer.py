@@ -1,120 +1,451 @@
 import threading, time, random, queue, json
+import multiprocessing as mp
 from datetime import datetime
 from abc import ABC, abstractmethod
+from src.components.BusDataMonitor.monitor.busdata_recorder import BusDataRecorder
+from src.components.BusDataMonitor.monitor.shm_ring import ShmFrameRing, ShmRingReader, ShmChannelQueue, slots_to_frames
+from src.components.BusDataMonitor.monitor.scheduler import PeriodicScheduler
+from src.components.BusDataMonitor.monitor.frame_sync import FrameSynchronizer, DEFAULT_HEADER
+from src.components.BusDataMonitor.monitor.frame_health import FrameHealth
+from src.components.BusDataMonitor.monitor.frame_tap import FrameTap, ShmTap
+from src.components.BusDataMonitor.monitor.transport import DEFAULT_CHUNK_SIZE, open_transport
+from src.components.BusDataMonitor.protocol import protocol_registry
+
+# 队列中的帧记录为 (monotonic_ns, 传输方向, bytes)，时间与十六进制只在显示时格式化
+# monotonic_ns 与墙上时间的偏移，用于把帧时间戳换算为本地时间
+_MONO_TO_WALL_NS = time.time_ns() - time.monotonic_ns()
+
+
+def format_frame_time(ts_ns: int) -> str:
+    """将帧的 monotonic_ns 时间戳格式化为 HH:MM:SS.mmm"""
+    return datetime.fromtimestamp((ts_ns + _MONO_TO_WALL_NS) / 1e9).strftime("%H:%M:%S.%f")[:-3]
+
+
+def format_frame_hex(data: bytes) -> str:
+    """将原始帧格式化为以空格分隔的大写十六进制字符串"""
+    return bytes(data).hex(" ").upper()
+
+def drain_queue(q: queue.Queue):
+    """
+    一次加锁取出队列中的全部元素
+
+    直接交换 Queue 内部的 deque，避免逐条 get_nowait 反复获取互斥锁；
+    对提供 drain() 的适配器（如 ShmChannelQueue）直接调用其 drain()
+    :return: 按入队顺序排列的 deque
+    """
+    drain = getattr(q, "drain", None)
+    if drain is not None:
+        return drain()
+    with q.mutex:
+        items = q.queue
+        if not items:
+            return items
+        q.queue = type(items)()
+        q.not_full.notify_all()
+    return items
+
 
 class RS422ProducerBase(ABC):
-    """RS422 数据生产者抽象基类（一个方向：Tx 或 Rx）"""
-    def __init__(self, ch_id: str, q: queue.Queue, tor: str, freq: float):
+    """
+    RS422 数据生产者抽象基类（一个方向：Tx 或 Rx）
+
+    每个周期由 PeriodicScheduler 按绝对截止时间调用一次 _tick()；
+    传入共享的 scheduler 时多个通道共用一个调度线程，否则自建一个调度器
+    """
+    def __init__(self, ch_id: str, q: queue.Queue, tor: str, freq: float, recorder=None, scheduler=None,
+                 health=None):
         self.ch_id = ch_id
         self.queue = q
         self.tor = tor  # "Tx" 或 "Rx"
+        self.freq = freq
         self.period = 1.0 / freq
+        self.recorder = recorder  # BusDataRecorder，与显示队列并行接收原始帧
+        self.scheduler = scheduler
+        self._own_scheduler = None
+        self.health = health  # FrameHealth，逐帧统计帧计数连续性、帧率与队列溢出
+        self.taps = ()  # 订阅的 FrameTap，整体替换以免与生产线程的遍历冲突
+
+    @property
+    def key(self):
+        """在调度器中的任务名"""
+        return f"{self.ch_id}/{self.tor}"
+
+    @abstractmethod
+    def _tick(self):
+        """产生一个周期的数据"""
+        pass
+
+    def _emit(self, frame: bytes, ts=None):
+        if ts is None:
+            ts = time.monotonic_ns()
+        if self.health is not None:
+            self.health.update(ts, frame)
+        if self.recorder is not None:
+            # 记录帧自身的采集时刻，与进程后端相同按固定偏移换算为墙上时间
+            self.recorder.record(self.ch_id, self.tor, frame, (ts + _MONO_TO_WALL_NS) / 1e9)
+        for tap in self.taps:
+            tap.put(ts, frame)
+        try:
+            self.queue.put_nowait((ts, self.tor, frame))
+        except queue.Full:
+            if self.health is not None:
+                self.health.overflow_inc()
+
+    def start(self):
+        scheduler = self.scheduler
+        if scheduler is None:
+            scheduler = self._own_scheduler = PeriodicScheduler(name=f"RS422-{self.key}")
+        scheduler.add(self.key, self._tick, self.freq)
+        if self._own_scheduler is not None:
+            self._own_scheduler.start()
+
+    def stop(self):
+        if self._own_scheduler is not None:
+            self._own_scheduler.stop()
+            self._own_scheduler = None
+        elif self.scheduler is not None:
+            self.scheduler.remove(self.key)
+
+    def get_stats(self):
+        """本方向的计时统计（实际频率、抖动分位数、超时次数）"""
+        scheduler = self._own_scheduler or self.scheduler
+        return scheduler.get_stats(self.key) if scheduler is not None else None
+
+
+class RS422SimProducer(RS422ProducerBase):
+    """模拟 RS422 通信通道：帧头为 包头1/包头2 + 帧计数 + 包长度，其余为随机数据"""
+    def __init__(self, ch_id, q, tor, freq, recorder=None, scheduler=None, health=None):
+        super().__init__(ch_id, q, tor, freq, recorder, scheduler, health)
+        self.frame_len = 64 if tor.lower() == "tx" else 128
+        self._seq = 0
+
+    def _rand_frame(self, length):
+        return random.getrandbits(length * 8).to_bytes(length, "big")
+
+    def _tick(self):
+        header = bytes((DEFAULT_HEADER[0], DEFAULT_HEADER[1], self._seq & 0xFF, self.frame_len))
+        self._seq += 1
+        self._emit(header + self._rand_frame(self.frame_len - len(header)))
+
+
+class RS422RealProducer(RS422ProducerBase):
+    """
+    真实板卡 RS422 通信通道
+
+    读线程以大块非阻塞方式从字节流传输（串口 / pty / socketpair）读取数据，
+    由 FrameSynchronizer 按 包头1/包头2 与 包长度 切分成帧；实际帧率由设备决定，不经过调度器
+    """
+    def __init__(self, ch_id, q, tor, freq, settings, recorder=None, scheduler=None, health=None,
+                 protocol=None, transport=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        :param settings: 通道 settings（transport/port/baudrate/.../header1/header2/length_adjust）
+        :param protocol: 该方向的协议名或协议字典，用于帧同步
+        :param transport: 已打开的 ByteTransport；为 None 时在 start() 中按 settings 打开
+        """
+        super().__init__(ch_id, q, tor, freq, recorder, scheduler, health)
+        self.settings = settings or {}
+        if protocol is None:
+            raise ValueError(f"通道 {ch_id} {tor} 未配置协议，无法进行帧同步")
+        if isinstance(protocol, str):
+            protocol = protocol_registry.get(protocol)
+        self.sync = FrameSynchronizer.from_settings(protocol, self.settings)
+        self.transport = transport
+        self._own_transport = transport is None
+        self.chunk_size = chunk_size
         self._stop_event = threading.Event()
         self.thread = None
 
-    @abstractmethod
-    def _loop(self):
+    def _tick(self):
         pass
 
     def start(self):
+        if self.transport is None:
+            self.transport = open_transport(self.settings)
         self._stop_event.clear()
-        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread = threading.Thread(target=self._loop, name=f"RS422-{self.key}", daemon=True)
         self.thread.start()
 
     def stop(self):
         self._stop_event.set()
         if self.thread:
             self.thread.join(timeout=1.0)
+            self.thread = None
+        if self._own_transport and self.transport is not None:
+            self.transport.close()
+            self.transport = None
 
+    def _loop(self):
+        transport = self.transport
+        sync = self.sync
+        while not self._stop_event.is_set():
+            chunk = transport.read(self.chunk_size, timeout=0.05)
+            if not chunk:
+                continue
+            ts = time.monotonic_ns()
+            for frame in sync.feed(chunk):
+                self._emit(frame, ts)
 
-class RS422SimProducer(RS422ProducerBase):
-    """模拟 RS422 通信通道"""
-    def _now_str(self):
-        return datetime.now().strftime("%H:%M:%S.%f")[:-3]
-
-    def _rand_frame(self, length):
-        return bytes(random.randint(0, 255) for _ in range(length))
+    def get_stats(self):
+        """帧同步统计：frames/bytes/discarded/resyncs/buffered"""
+        return self.sync.get_stats()
 
-    def _format_hex(self, data: bytes):
-        return " ".join(f"{b:02X}" for b in data)
 
-    def _loop(self):
-        frame_len = 64 if self.tor.lower() == "tx" else 128
-        while not self._stop_event.is_set():
-            ts = self._now_str()
-            frame = self._rand_frame(frame_len)
-            hex_str = self._format_hex(frame)
-            try:
-                self.queue.put_nowait((ts, self.tor, hex_str))
-            except queue.Full:
-                pass
-            time.sleep(self.period)
+def _process_main(ch_id, tors, freq, ring_names, use_sim, settings, protocols, stop_event):
+    """工作进程入口：在本进程内运行该通道各方向的 Producer，帧写入共享内存环形缓冲区"""
+    rings = [ShmFrameRing.attach(name) for name in ring_names]
+    scheduler = PeriodicScheduler(name=f"RS422-{ch_id}")
+    producers = []
+    for tor, ring in zip(tors, rings):
+        if use_sim:
+            p = RS422SimProducer(ch_id, ring, tor, freq, scheduler=scheduler)
+        else:
+            p = RS422RealProducer(ch_id, ring, tor, freq, settings, scheduler=scheduler,
+                                  protocol=protocols.get(tor))
+        p.start()
+        producers.append(p)
+    scheduler.start()
+    stop_event.wait()
+    for p in producers:
+        p.stop()
+    scheduler.stop()
+    for ring in rings:
+        ring.close()
 
 
-class RS422RealProducer(RS422ProducerBase):
-    """真实板卡 RS422 通信通道（占位示例）"""
-    def __init__(self, ch_id, q, tor, freq, settings):
-        super().__init__(ch_id, q, tor, freq)
+class RS422ProcessProducer:
+    """在独立进程中运行一个通道（一个或两个方向）的 Producer，对外提供与线程版相同的 start/stop"""
+    def __init__(self, ch_id, tors, freq, rings, use_sim=True, settings=None, protocols=None):
+        self.ch_id = ch_id
+        self.tors = list(tors)
+        self.freq = freq
+        self.rings = rings
+        self.use_sim = use_sim
         self.settings = settings
-        # self.dev = open_device(settings) # 实际硬件初始化
+        self.protocols = protocols or {}
+        self.process = None
+        self._stop_event = None
+
+    def start(self):
+        ctx = mp.get_context("spawn")
+        self._stop_event = ctx.Event()
+        self.process = ctx.Process(
+            target=_process_main,
+            args=(self.ch_id, self.tors, self.freq, [r.name for r in self.rings],
+                  self.use_sim, self.settings, self.protocols, self._stop_event),
+            daemon=True,
+        )
+        self.process.start()
+
+    def stop(self):
+        if self.process is None:
+            return
+        self._stop_event.set()
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.process = None
 
-    def _loop(self):
-        data = bytes([0xAA]*8) if self.tor.lower()=="tx" else bytes([0x55]*8)
-        while not self._stop_event.is_set():
-            ts = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-            hex_str = " ".join(f"{b:02X}" for b in data)
-            try:
-                self.queue.put_nowait((ts, self.tor, hex_str))
-            except queue.Full:
-                pass
-            time.sleep(self.period)
+
+BACKEND_THREAD = "thread"
+BACKEND_PROCESS = "process"
+SHM_RING_CAPACITY = 16384  # 每个方向的共享内存环形缓冲区槽位数
+SHM_FRAME_SIZE = 256       # 槽位可容纳的最大帧长(字节)
+HEALTH_TASK = "health"     # 健康度定时发布任务名
+HEALTH_PUBLISH_HZ = 1.0
 
 
 class RS422Manager:
     """管理所有 RS422 通道：自动读取配置文件并启动对应 Producer"""
-    def __init__(self, config: str, use_sim=True):
-        
+    def __init__(self, config: str, use_sim=True, recorder=None, backend=BACKEND_THREAD):
+        """
+        :param backend: thread - 各方向一个线程，帧经 queue.Queue 送往界面；
+                        process - 每个通道一个工作进程，帧写入共享内存环形缓冲区，
+                        界面通过 ShmChannelQueue 适配器零拷贝映射读取
+        """
+        if backend not in (BACKEND_THREAD, BACKEND_PROCESS):
+            raise ValueError(f"Invalid backend: {backend}")
+
         self.config = config
 
         self.use_sim = use_sim
+        self.backend = backend
         self.producers = {}  # ch_id -> list of producers
-        self.queues = {}     # ch_id -> queue.Queue
+        self.queues = {}     # ch_id -> queue.Queue 或 ShmChannelQueue
+        self.rings = {}      # ch_id -> {tor: ShmFrameRing}（仅 process 后端）
+        # 记录器：store=true 的通道原始帧写入会话 HDF5 文件
+        self.recorder = recorder if recorder is not None else BusDataRecorder(config)
+        self._record = False
+        self._pump_stop = threading.Event()
+        self._pump_thread = None
+        # thread 后端所有通道共用一个调度线程
+        self.scheduler = PeriodicScheduler(name="RS422Manager")
+        self.health = {}     # ch_id -> {tor: FrameHealth}
 
         ProducerClass = RS422SimProducer if self.use_sim else RS422RealProducer
 
         for ch_id, cfg in self.config.items():
-            q = queue.Queue(maxsize=10000)
-            self.queues[ch_id] = q
-            self.producers[ch_id] = []
-
             tor_cfg = cfg["TorR"]
             freq = cfg["freq"]
 
-            # 如果是单方向
             if tor_cfg in ("Tx", "Rx"):
-                if self.use_sim:
-                    p = ProducerClass(ch_id, q, tor_cfg, freq)
-                else:
-                    p = ProducerClass(ch_id, q, tor_cfg, freq, cfg["settings"])
-                self.producers[ch_id].append(p)
-
-            # 如果是双向（Tx/Rx）
+                # 单方向
+                tors = (tor_cfg,)
             elif tor_cfg == "Tx/Rx":
-                for tor in ("Tx", "Rx"):
-                    if self.use_sim:
-                        p = ProducerClass(ch_id, q, tor, freq)
-                    else:
-                        p = ProducerClass(ch_id, q, tor, freq, cfg["settings"])
-                    self.producers[ch_id].append(p)
+                # 双向
+                tors = ("Tx", "Rx")
             else:
                 raise ValueError(f"Invalid TorR: {tor_cfg}")
 
-    def start_all(self):
+            # 每个方向一个健康度统计，按协议 帧计数 字段检查连续性
+            self.health[ch_id] = {}
+            for tor in tors:
+                protocol_name = cfg.get("protocol", {}).get(tor)
+                try:
+                    protocol = protocol_registry.get(protocol_name) if protocol_name else None
+                except (FileNotFoundError, ValueError) as e:
+                    print(f"通道 {ch_id} {tor} 协议加载失败，不检查帧计数: {e}")
+                    protocol = None
+                self.health[ch_id][tor] = FrameHealth.from_protocol(protocol)
+
+            if backend == BACKEND_PROCESS:
+                rings = [ShmFrameRing(capacity=SHM_RING_CAPACITY, frame_size=SHM_FRAME_SIZE) for _ in tors]
+                self.rings[ch_id] = dict(zip(tors, rings))
+                self.queues[ch_id] = ShmChannelQueue(rings)
+                self.producers[ch_id] = [
+                    RS422ProcessProducer(ch_id, tors, freq, rings, self.use_sim,
+                                         cfg.get("settings"), cfg.get("protocol"))
+                ]
+                continue
+
+            q = queue.Queue(maxsize=10000)
+            self.queues[ch_id] = q
+            self.producers[ch_id] = []
+            for tor in tors:
+                health = self.health[ch_id][tor]
+                if self.use_sim:
+                    p = ProducerClass(ch_id, q, tor, freq, recorder=self.recorder, scheduler=self.scheduler,
+                                      health=health)
+                else:
+                    p = ProducerClass(ch_id, q, tor, freq, cfg["settings"],
+                                      recorder=self.recorder, scheduler=self.scheduler, health=health,
+                                      protocol=cfg.get("protocol", {}).get(tor))
+                self.producers[ch_id].append(p)
+
+    def start_all(self, record=True):
+        """启动所有通道；record 为 True 且存在 store 通道时自动开始记录"""
+        self._record = record
+        if record and self.recorder.has_enabled():
+            self.recorder.start()
+        if self.backend == BACKEND_PROCESS:
+            self._pump_stop.clear()
+            self._pump_thread = threading.Thread(target=self._record_pump, daemon=True)
+            self._pump_thread.start()
+        else:
+            self.scheduler.add(HEALTH_TASK, self.publish_health, HEALTH_PUBLISH_HZ)
         for plist in self.producers.values():
             for p in plist:
                 p.start()
+        if self.backend == BACKEND_THREAD:
+            self.scheduler.start()
 
     def stop_all(self):
         for plist in self.producers.values():
             for p in plist:
                 p.stop()
+        self.scheduler.remove(HEALTH_TASK)
+        self.scheduler.stop()
+        if self._pump_thread is not None:
+            self._pump_stop.set()
+            self._pump_thread.join()
+            self._pump_thread = None
+        # 会话结束前写入最终健康度
+        self.publish_health()
+        self._record = False
+        self.recorder.stop()
+
+    def _record_pump(self, interval=0.05):
+        """
+        process 后端：以独立读者从共享内存读取帧，更新健康度并交给记录器，与界面读取互不影响
+        """
+        readers = [
+            (ch_id, tor, ShmRingReader(ring), self.health[ch_id][tor], self.queues[ch_id].readers[i])
+            for ch_id, tor_rings in self.rings.items()
+            for i, (tor, ring) in enumerate(tor_rings.items())
+        ]
+        next_publish = time.monotonic() + 1.0 / HEALTH_PUBLISH_HZ
+        while True:
+            stopping = self._pump_stop.wait(interval)
+            for ch_id, tor, reader, health, display_reader in readers:
+                slots = reader.read()
+                health.update_batch(slots["ts"], slots["data"])
+                # 界面读者落后一圈被覆盖的帧即显示队列溢出
+                health.overflow = display_reader.lost
+                if self.recorder.is_recording() and self.recorder.is_enabled(ch_id):
+                    for ts, _, frame in slots_to_frames(slots):
+                        self.recorder.record(ch_id, tor, frame, (ts + _MONO_TO_WALL_NS) / 1e9)
+            if time.monotonic() >= next_publish:
+                self.publish_health()
+                next_publish += 1.0 / HEALTH_PUBLISH_HZ
+            if stopping:
+                break
+
+    def subscribe(self, ch_id, tor, frame_size, capacity=SHM_RING_CAPACITY):
+        """
+        订阅一个通道方向的帧旁路，与显示队列、记录器互不影响
+        :param frame_size: 帧长，长度不符的帧被忽略
+        :return: FrameTap 或 ShmTap，read() 返回 (时间戳数组, 帧数组)
+        """
+        if self.backend == BACKEND_PROCESS:
+            ring = self.rings.get(ch_id, {}).get(tor)
+            if ring is None:
+                raise KeyError(f"通道 {ch_id} 没有 {tor} 方向")
+            return ShmTap(ring, frame_size)
+        producer = self._producer(ch_id, tor)
+        tap = FrameTap(frame_size, capacity)
+        producer.taps = producer.taps + (tap,)
+        return tap
+
+    def unsubscribe(self, ch_id, tor, tap):
+        if self.backend == BACKEND_PROCESS:
+            return
+        producer = self._producer(ch_id, tor)
+        producer.taps = tuple(t for t in producer.taps if t is not tap)
+
+    def _producer(self, ch_id, tor):
+        for p in self.producers.get(ch_id, ()):
+            if p.tor == tor:
+                return p
+        raise KeyError(f"通道 {ch_id} 没有 {tor} 方向")
+
+    def get_health(self):
+        """
+        各通道方向的健康度快照
+        :return: {ch_id: {tor: {frames, rate, gaps, lost, duplicates, reordered, overflow, loss_ratio}}}
+        """
+        return {ch_id: {tor: h.snapshot() for tor, h in tor_health.items()}
+                for ch_id, tor_health in self.health.items()}
+
+    def publish_health(self):
+        """将健康度快照写入会话文件的 /health/{通道号}/{Tx|Rx}"""
+        if not self.recorder.is_recording():
+            return
+        now = time.time()
+        for ch_id, tor_health in self.get_health().items():
+            for tor, snapshot in tor_health.items():
+                self.recorder.record_health(ch_id, tor, snapshot, now)
+
+    def get_timing_stats(self):
+        """
+        thread 后端各通道方向的计时统计
+        :return: {"ch_id/tor": {freq, rate, count, missed, overruns, jitter_p50/p95/p99/max_us}}
+        """
+        stats = self.scheduler.get_stats()
+        stats.pop(HEALTH_TASK, None)
+        return stats
+
+    def refresh_store(self):
+        """通道 store 配置变化后同步到记录器"""
+        self.recorder.refresh()
+        if self._record and self.recorder.has_enabled() and not self.recorder.is_recording():
+            self.recorder.start()
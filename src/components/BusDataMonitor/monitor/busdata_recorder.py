@@ -0,0 +1,83 @@
+import time
+from pathlib import Path
+from datetime import datetime
+
+from src.components.BusDataMonitor.hdf_writer import AsyncHDFWriter
+from src.components.BusDataMonitor.busdata import BUSDATA_PATH
+
+
+class BusDataRecorder:
+    """
+    总线数据记录器
+
+    与界面显示队列并行接收各 Producer 的原始帧，只记录 store=true 的通道，
+    写入会话 HDF5 文件的 /data/{通道号}/{Tx|Rx}。记录不依赖监控窗口的刷新定时器，
+    关闭监控窗口也不影响记录。
+    """
+    def __init__(self, config: dict, directory=BUSDATA_PATH, **writer_kwargs):
+        """
+        :param config: 通道配置（channel_config）
+        :param directory: 会话文件目录
+        :param writer_kwargs: 透传给 AsyncHDFWriter 的参数（队列容量、背压策略等）
+        """
+        self.config = config
+        self.directory = Path(directory)
+        self.writer_kwargs = writer_kwargs
+        self.writer = None
+        self.filename = None
+        self._enabled = set()
+        self.refresh()
+
+    def refresh(self):
+        """重新读取各通道的 store 标志（通道配置修改后调用）"""
+        self._enabled = {str(ch_id) for ch_id, cfg in self.config.items() if cfg.get("store", False)}
+
+    def is_enabled(self, ch_id):
+        return str(ch_id) in self._enabled
+
+    def has_enabled(self):
+        return bool(self._enabled)
+
+    def is_recording(self):
+        return self.writer is not None
+
+    def start(self, filename=None):
+        """开始一个记录会话，返回会话文件路径"""
+        if self.writer is not None:
+            return self.filename
+        if filename is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            filename = self.directory / f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.h5"
+        self.filename = Path(filename)
+        self.writer = AsyncHDFWriter(str(self.filename), **self.writer_kwargs)
+        return self.filename
+
+    def record(self, ch_id, tor, frame: bytes, timestamp=None):
+        """
+        记录一帧原始数据；未开始记录或通道未使能存储时直接返回
+        :param timestamp: 帧的采集时刻（Unix 秒），默认为写入时的当前时间
+        """
+        writer = self.writer
+        if writer is None or ch_id not in self._enabled:
+            return
+        writer.write_frame(f"{ch_id}/{tor}", time.time() if timestamp is None else timestamp, frame)
+
+    def record_health(self, ch_id, tor, health: dict, timestamp=None):
+        """记录一条通道健康度快照到 /health/{通道号}/{Tx|Rx}"""
+        writer = self.writer
+        if writer is None or ch_id not in self._enabled:
+            return
+        record = {"timestamp": time.time() if timestamp is None else timestamp}
+        record.update(health)
+        writer.write_record(f"/health/{ch_id}/{tor}", record)
+
+    def get_stats(self):
+        if self.writer is None:
+            return {}
+        return self.writer.get_stats()
+
+    def stop(self):
+        """结束记录会话，写完剩余数据并关闭文件"""
+        writer, self.writer = self.writer, None
+        if writer is not None:
+            writer.close()
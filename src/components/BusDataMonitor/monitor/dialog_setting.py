@@ -6,7 +6,7 @@ from PyQt5.QtGui import *
 from PyQt5.QtCore import *
 from src.components.BusDataMonitor.monitor.gui.Ui_dialog_setting import *
 from src.components.BusDataMonitor.config import channel_config, protocol_config, save_channel_config
-from src.components.BusDataMonitor.protocol import ProtocolLoader
+from src.components.BusDataMonitor.protocol import protocol_registry
 
 class ChannelConfigDialog(QDialog,Ui_dialog_setting):
     """
@@ -27,8 +27,7 @@ class ChannelConfigDialog(QDialog,Ui_dialog_setting):
         
         self.TorR=self.channel_conf.get("TorR", "")
         self.selected_protocol = {"Tx": "", "Rx": ""}
-        protocol_loader=ProtocolLoader()
-        self.protocol_list=protocol_loader.list_protocols()
+        self.protocol_list=protocol_registry.list_protocols()
         self.fill_channel_info()
         self.init_protocol_selectors()
         self.btn_set.clicked.connect(self.on_accept)
@@ -63,7 +62,7 @@ class ChannelConfigDialog(QDialog,Ui_dialog_setting):
 
     def on_protocol_changed(self, protocol_name, direction=None):
         self.selected_protocol[direction] = protocol_name
-        proto = protocol_config.get(protocol_name, {})
+        proto = protocol_config.get(protocol_name) or self._protocol_meta(protocol_name)
         if direction == "Tx":
             self.label_tx_length.setText(str(proto.get("length", "-")))
             self.label_tx_version.setText(proto.get("version", "-"))
@@ -73,6 +72,19 @@ class ChannelConfigDialog(QDialog,Ui_dialog_setting):
             self.label_rx_version.setText(proto.get("version", "-"))
             self.label_rx_desc.setText(proto.get("desc", "-"))
        
+    @staticmethod
+    def _protocol_meta(protocol_name):
+        """protocol_config 中没有的协议，从注册表中的协议文件读取长度/版本/描述"""
+        try:
+            proto = protocol_registry.get(protocol_name)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return {
+            "length": proto.get("protocol_length", "-"),
+            "version": proto.get("version", "-"),
+            "desc": proto.get("description", "-"),
+        }
+
     def on_accept(self):
         if self.channel_id not in channel_config:
             return
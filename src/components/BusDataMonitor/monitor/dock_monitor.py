@@ -5,25 +5,31 @@ from PyQt5.QtCore import *
 from src.components.BusDataMonitor.monitor.gui.Ui_dock_monitor import Ui_dockmonitor
 from src.components.BusDataMonitor.monitor.dialog_setting import ChannelConfigDialog
 from src.components.BusDataMonitor.config import channel_config
+from src.components.BusDataMonitor.monitor.frame_table_model import FrameTableModel
+from src.components.BusDataMonitor.monitor.busdata_producer import drain_queue
 from assets import ICON_PLAY, ICON_PAUSE, ICON_STOP
 
 DEFAULT_MAX_ROWS = 500
 MAX_ALLOWED_ROWS = 200000  # 设置最大行数限制
 DEFAULT_REFRESH_MS = 300   # 默认刷新周期(ms)，与采集无关
-
-
+DEFAULT_FRAME_BUDGET = 2000  # 每次刷新最多显示的帧数，超出部分只计数不显示
 
 # ===================== 监控窗口 =====================
 class DataMonitor(QWidget, Ui_dockmonitor):
-    row_double_clicked = pyqtSignal(str, str, int, str)
-    def __init__(self, title="数据监控窗口", data_queue=None, channel_id=0,parent=None):
+    row_double_clicked = pyqtSignal(object, str, int, str)
+    config_changed = pyqtSignal(str)  # 通道配置已保存，参数为通道号
+    def __init__(self, title="数据监控窗口", data_queue=None, channel_id=0, health=None, parent=None):
         super().__init__(parent)
         self.setupUi(self)
         self.setWindowTitle(title)
         self.data_queue = data_queue or queue.Queue(maxsize=10000)
         self.channel_id = channel_id
+        self.health = health or {}  # {tor: FrameHealth}，由 RS422Manager 提供
         self._max_rows = DEFAULT_MAX_ROWS
-        self.frame_count = 0
+        self.frame_count = 0      # 接收帧数
+        self.displayed_count = 0  # 显示帧数
+        self.dropped_count = 0    # 超出刷新预算而未显示的帧数
+        self._frame_budget = DEFAULT_FRAME_BUDGET
         self.protocol_config = channel_config[str(channel_id)]["protocol"]
         self.TorR=channel_config[str(channel_id)]["TorR"]
         self.stop_tag=False
@@ -33,21 +39,33 @@ class DataMonitor(QWidget, Ui_dockmonitor):
         self.spin_max_rows.setValue(DEFAULT_MAX_ROWS)
         self.spin_refresh.setRange(50, 2000)
         self.spin_refresh.setValue(DEFAULT_REFRESH_MS)
+        self.label_budget = QLabel("刷新上限(帧):", self)
+        self.spin_budget = QSpinBox(self)
+        self.spin_budget.setRange(10, MAX_ALLOWED_ROWS)
+        self.spin_budget.setValue(DEFAULT_FRAME_BUDGET)
+        budget_pos = self.ctrl_area.indexOf(self.spin_refresh) + 1
+        self.ctrl_area.insertWidget(budget_pos, self.label_budget)
+        self.ctrl_area.insertWidget(budget_pos + 1, self.spin_budget)
         self.ctrl_area.addSpacing(20)
         self.ctrl_area.addStretch(1)
         self.btn_start.setIcon(QIcon(ICON_PLAY))
         self.btn_stop.setIcon(QIcon(ICON_STOP))
 
         # 状态栏
+        self.label_stats = QLabel(self)
+        self.horizontalLayout_2.insertWidget(self.horizontalLayout_2.indexOf(self.label_count) + 1, self.label_stats)
+        self.label_health = QLabel(self)
+        self.horizontalLayout_2.insertWidget(self.horizontalLayout_2.indexOf(self.label_stats) + 1, self.label_health)
+        self.update_count_labels()
         self.label_protocol.setText(f"协议文件:{self.protocol_config}")
         self.label_ch.setText(f"通道号:{self.channel_id}")
         self.label_TR.setText(f"传输方向:{self.TorR}")
         
         
-        # 表格
-        self.model = QStandardItemModel(0, 2, self)
-        self.model.setHorizontalHeaderLabels(["时间戳", "传输方向","数据内容"])
+        # 表格：环形缓冲区模型，只为可见行生成显示字符串
+        self.model = FrameTableModel(capacity=DEFAULT_MAX_ROWS, parent=self)
         self.tableView.setModel(self.model)
+        self.tableView.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.tableView.horizontalHeader().setStretchLastSection(True)
         self.tableView.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.tableView.setSelectionMode(QAbstractItemView.SingleSelection)
@@ -64,6 +82,7 @@ class DataMonitor(QWidget, Ui_dockmonitor):
         self.btn_stop.clicked.connect(self.on_stop)
         self.spin_max_rows.valueChanged.connect(self.on_max_rows_changed)
         self.spin_refresh.valueChanged.connect(self.on_refresh_changed)
+        self.spin_budget.valueChanged.connect(self.on_budget_changed)
         self.btn_conf.clicked.connect(self.show_settings)
 
     def start_ctrl(self):
@@ -74,9 +93,11 @@ class DataMonitor(QWidget, Ui_dockmonitor):
 
     def on_start(self): 
         if self.stop_tag==True:
-            self.model.removeRows(0, self.model.rowCount())
+            self.model.clear()
             self.frame_count = 0
-            self.label_count.setText("数据量: 0") 
+            self.displayed_count = 0
+            self.dropped_count = 0
+            self.update_count_labels()
             self.stop_tag=False
         if not self.timer.isActive():  
             self.timer.start(self.spin_refresh.value())  
@@ -92,8 +113,7 @@ class DataMonitor(QWidget, Ui_dockmonitor):
 
     def on_stop(self):
         self.timer.stop()
-        with self.data_queue.mutex:
-            self.data_queue.queue.clear()  # 清空队列
+        drain_queue(self.data_queue)  # 清空队列
         self.btn_start.setText("开始")
         self.btn_start.setIcon(QIcon(ICON_PLAY))
         self.stop_tag=True
@@ -101,45 +121,60 @@ class DataMonitor(QWidget, Ui_dockmonitor):
 
     def on_max_rows_changed(self, v):
         self._max_rows = v
-        while self.model.rowCount() > self._max_rows:
-            self.model.removeRow(0)
+        self.model.set_capacity(v)
 
 
     def on_refresh_changed(self, v):
         if self.timer.isActive():
             self.timer.start(v)
 
+    def on_budget_changed(self, v):
+        self._frame_budget = v
 
-    def flush_data(self): 
-        """从队列拉数据批量刷新"""
-        rows_to_add = []
-        while not self.data_queue.empty():
-            try:
-                rows_to_add.append(self.data_queue.get_nowait())
-            except queue.Empty:
-                break
-
-        for ts, tor,hex_str in rows_to_add:
-            self.model.appendRow([QStandardItem(ts), QStandardItem(tor),QStandardItem(hex_str)])
-        
-        # 更新计数
-        self.frame_count += len(rows_to_add)
+    def update_count_labels(self):
         self.label_count.setText(f"数据量: {self.frame_count}")
+        self.label_stats.setText(f"显示: {self.displayed_count}  丢弃: {self.dropped_count}")
 
-        # 控制最大行数
-        excess = self.model.rowCount() - self._max_rows
-        if excess > 0:
-            self.model.removeRows(0, excess)
+    def update_health_label(self):
+        if not self.health:
+            return
+        self.label_health.setText("  ".join(f"{tor}: {h.summary()}" for tor, h in self.health.items()))
+
+
+    def flush_data(self): 
+        """从队列拉数据批量刷新，每次最多显示 _frame_budget 帧"""
+        frames = drain_queue(self.data_queue)
+        received = len(frames)
+        self.update_health_label()
+        if received == 0:
+            return
+
+        # 超出预算时只显示最新的帧，其余计入丢弃（记录器不受影响）
+        budget = min(self._frame_budget, self._max_rows)
+        if received > budget:
+            rows_to_add = list(frames)[-budget:]
+        else:
+            rows_to_add = list(frames)
+        dropped = received - len(rows_to_add)
+
+        # 超出最大行数的最早行由模型在同一批次内移除
+        self.model.append_frames(rows_to_add)
+
+        # 更新计数
+        self.frame_count += received
+        self.displayed_count += len(rows_to_add)
+        self.dropped_count += dropped
+        self.update_count_labels()
         self.tableView.scrollToBottom()
 
 
     def on_row_double_clicked(self, index):
-        # 第二列为数据内容
-        row_TorR = self.model.item(index.row(), 1).text()
-        hex_str = self.model.item(index.row(), 2).text()
+        # 第三列为原始帧
+        row_TorR = self.model.direction(index.row())
+        frame = self.model.frame(index.row())
         protocol_name=self.protocol_config[row_TorR]
-        # 发射完整参数：hex_str, 协议dict, 行号, 通道方向
-        self.row_double_clicked.emit(hex_str, protocol_name, index.row(), row_TorR)
+        # 发射完整参数：原始帧, 协议名, 行号, 通道方向
+        self.row_double_clicked.emit(frame, protocol_name, index.row(), row_TorR)
 
 
     def show_settings(self):
@@ -151,6 +186,7 @@ class DataMonitor(QWidget, Ui_dockmonitor):
             new_protocol = dlg.get_selected_protocol()
             self.label_protocol.setText(f"协议文件: {new_protocol}")
             self.protocol_config = new_protocol
+            self.config_changed.emit(str(self.channel_id))
 
     
     
\ No newline at end of file
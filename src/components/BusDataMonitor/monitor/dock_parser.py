@@ -4,18 +4,17 @@ from PyQt5.QtGui import QStandardItemModel, QStandardItem
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QObject
 from src.components.BusDataMonitor.monitor.gui.Ui_dock_parser import Ui_dock_parser 
 from src.components.BusDataMonitor.monitor.busdata_parser import BusDataParser
-from src.components.BusDataMonitor.protocol import ProtocolLoader
+from src.components.BusDataMonitor.protocol import protocol_registry
 
 class ParserWorker(QObject):
     finished = pyqtSignal(dict)  # 解析完成后发出结果
-    def __init__(self, protocol, hex_data):
+    def __init__(self, parser: BusDataParser, data):
         super().__init__()
-        self.protocol = protocol
-        self.hex_data = hex_data
+        self.parser = parser  # 注册表中已编译的解析器，多个窗口共享
+        self.data = data
 
     def run(self):
-        parser = BusDataParser(self.protocol)
-        result = parser.parse(self.hex_data)
+        result = self.parser.parse(self.data)
         self.finished.emit(result)
 
 
@@ -42,13 +41,12 @@ class DockParser(QWidget, Ui_dock_parser):
         self.hex_display = not self.hex_display
         self.refresh_display()
 
-    def update_data(self, hex_str):
-        """ 启动线程解析数据 """
-        self.current_hex = hex_str
-        protocol_loader = ProtocolLoader()
-        protocol = protocol_loader.get(self.protocol_name)
+    def update_data(self, data):
+        """ 启动线程解析数据（原始帧 bytes 或十六进制字符串） """
+        self.current_data = data
+        parser = protocol_registry.parser(self.protocol_name)
         self.thread = QThread()
-        self.worker = ParserWorker(protocol, hex_str)
+        self.worker = ParserWorker(parser, data)
         self.worker.moveToThread(self.thread)
         self.thread.started.connect(self.worker.run)
         self.worker.finished.connect(self.on_parsed)
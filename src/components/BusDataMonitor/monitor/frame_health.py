@@ -0,0 +1,168 @@
+import time
+
+import numpy as np
+
+from src.components.BusDataMonitor.monitor.busdata_parser import BusDataParser
+
+COUNTER_FIELD = "帧计数"
+HEALTH_FIELDS = ("frames", "rate", "gaps", "lost", "duplicates", "reordered", "overflow")
+
+
+class FrameHealth:
+    """
+    单个通道方向的帧健康度统计（流式，每帧 O(1)）
+
+    - 帧计数连续性：按字段位宽取模比较相邻两帧，差 1 为正常，差 0 计为重复，
+      差超过半个量程计为乱序/计数复位，其余计为跳变并累加丢失帧数
+    - 帧率：按 window_s 秒的滑动窗口统计
+    - 队列溢出：显示队列满而丢弃的帧由生产者通过 overflow_inc() 计入
+
+    计数器位宽为 b 时，一次连续丢失 2^(b-1) 帧以上无法与乱序区分。
+    """
+    def __init__(self, counter_field=None, window_s=1.0):
+        """
+        :param counter_field: 帧计数字段的 CompiledField，为 None 时只统计帧率与溢出
+        """
+        self.window_ns = int(window_s * 1e9)
+        if counter_field is not None:
+            self._counter = counter_field
+            self._c_start = counter_field.start
+            self._c_stop = counter_field.stop
+            self._c_shift = counter_field.shift
+            self._c_mask = counter_field.mask
+            self._c_order = counter_field.byteorder
+        self.has_counter = counter_field is not None
+        self.reset()
+
+    @classmethod
+    def from_protocol(cls, protocol, window_s=1.0):
+        """按协议中的 帧计数 字段创建；协议为 None 或无该字段时不做连续性检查"""
+        counter = None
+        if protocol is not None:
+            counter = next((f for f in BusDataParser.compile(protocol) if f.name == COUNTER_FIELD), None)
+        return cls(counter, window_s)
+
+    def reset(self):
+        self.frames = 0
+        self.gaps = 0        # 跳变次数
+        self.lost = 0        # 按帧计数推算的丢失帧数
+        self.duplicates = 0
+        self.reordered = 0
+        self.overflow = 0    # 显示队列溢出丢弃的帧数
+        self.rate = 0.0
+        self.last_counter = None
+        self._last_ts = 0
+        self._window_start = None
+        self._window_frames = 0
+
+    def update(self, ts_ns, frame):
+        """处理一帧 (monotonic_ns, bytes)"""
+        self.frames += 1
+        self._last_ts = ts_ns
+
+        # 帧率窗口
+        if self._window_start is None:
+            self._window_start = ts_ns
+            self._window_frames = 0
+        else:
+            self._window_frames += 1
+            elapsed = ts_ns - self._window_start
+            if elapsed >= self.window_ns:
+                self.rate = self._window_frames * 1e9 / elapsed
+                self._window_start = ts_ns
+                self._window_frames = 0
+
+        if not self.has_counter or len(frame) < self._c_stop:
+            return
+        mask = self._c_mask
+        value = (int.from_bytes(frame[self._c_start:self._c_stop], self._c_order) >> self._c_shift) & mask
+        last = self.last_counter
+        self.last_counter = value
+        if last is None:
+            return
+        step = (value - last) & mask
+        if step == 1:
+            return
+        if step == 0:
+            self.duplicates += 1
+        elif step > (mask >> 1):
+            self.reordered += 1
+        else:
+            self.gaps += 1
+            self.lost += step - 1
+
+    def update_batch(self, ts_ns, data):
+        """
+        批量处理多帧，帧计数统计与逐帧 update() 相同
+        :param ts_ns: (N,) monotonic_ns 时间戳数组
+        :param data: (N, L) uint8 帧数组
+        """
+        n = len(ts_ns)
+        if n == 0:
+            return
+        self.frames += n
+        self._last_ts = int(ts_ns[-1])
+
+        if self._window_start is None:
+            self._window_start = int(ts_ns[0])
+            self._window_frames = n - 1
+        else:
+            self._window_frames += n
+        elapsed = self._last_ts - self._window_start
+        if elapsed >= self.window_ns:
+            self.rate = self._window_frames * 1e9 / elapsed
+            self._window_start = self._last_ts
+            self._window_frames = 0
+
+        if not self.has_counter or data.shape[1] < self._c_stop:
+            return
+        mask = self._c_mask
+        values = BusDataParser.raw_column(data, self._counter)
+        if self.last_counter is not None:
+            values = np.concatenate(([np.uint64(self.last_counter)], values))
+        self.last_counter = int(values[-1])
+        if len(values) < 2:
+            return
+        step = (values[1:] - values[:-1]) & np.uint64(mask)
+        half = np.uint64(mask >> 1)
+        gap = (step > 1) & (step <= half)
+        self.duplicates += int(np.count_nonzero(step == 0))
+        self.reordered += int(np.count_nonzero(step > half))
+        self.gaps += int(np.count_nonzero(gap))
+        self.lost += int((step[gap] - np.uint64(1)).sum())
+
+    def overflow_inc(self, n=1):
+        self.overflow += n
+
+    def snapshot(self, now_ns=None):
+        """
+        返回当前健康度
+        :return: dict，字段见 HEALTH_FIELDS，另含 loss_ratio（(lost + overflow) / 期望帧数）
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        rate = self.rate
+        if self.frames and now_ns - self._last_ts > 2 * self.window_ns:
+            rate = 0.0  # 长时间无数据
+        expected = self.frames + self.lost
+        result = {
+            "frames": self.frames,
+            "rate": rate,
+            "gaps": self.gaps,
+            "lost": self.lost,
+            "duplicates": self.duplicates,
+            "reordered": self.reordered,
+            "overflow": self.overflow,
+        }
+        result["loss_ratio"] = (self.lost + self.overflow) / expected if expected else 0.0
+        return result
+
+    def summary(self):
+        """状态栏显示用的简短文本"""
+        s = self.snapshot()
+        text = f"{s['rate']:.1f}Hz 丢帧:{s['lost']}"
+        if s["overflow"]:
+            text += f" 溢出:{s['overflow']}"
+        if s["duplicates"] or s["reordered"]:
+            text += f" 重复/乱序:{s['duplicates']}/{s['reordered']}"
+        return text
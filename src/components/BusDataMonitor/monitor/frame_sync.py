@@ -0,0 +1,149 @@
+from typing import Any, Dict, List, Union
+
+from src.components.BusDataMonitor.monitor.busdata_parser import BusDataParser
+
+HEADER_FIELDS = ("包头1", "包头2")
+LENGTH_FIELD = "包长度"
+DEFAULT_HEADER = (0xEB, 0x90)  # settings 未配置 header1/header2 时使用的同步字
+
+
+def _parse_int(value):
+    """支持 0xEB / 235 / "235" 形式的配置值"""
+    if isinstance(value, str):
+        return int(value, 0)
+    return int(value)
+
+
+class FrameSynchronizer:
+    """
+    从字节流中恢复帧边界
+
+    按协议中 包头1/包头2 字段的位置与取值搜索同步字，再读取 包长度 字段确定帧长；
+    同步字误匹配（包长度不合法）时只跳过 1 字节重新搜索，因此数据损坏后能在下一帧恢复同步。
+    输入按大块拼接到内部缓冲区，同步字搜索使用 bytes.find，不逐字节处理。
+    """
+    def __init__(self, protocol: Dict[str, Any], header=None, length_adjust=0, max_buffer=1 << 20):
+        """
+        :param protocol: 协议字典（需包含 包头1、包头2、包长度 字段）
+        :param header: (包头1 取值, 包头2 取值)，默认 DEFAULT_HEADER
+        :param length_adjust: 帧总长 = 包长度字段值 + length_adjust
+        :param max_buffer: 缓冲区上限，超出时丢弃最旧数据
+        """
+        fields = {f.name: f for f in BusDataParser.compile(protocol)}
+        missing = [name for name in HEADER_FIELDS + (LENGTH_FIELD,) if name not in fields]
+        if missing:
+            raise ValueError(f"协议缺少帧同步字段: {', '.join(missing)}")
+
+        header = DEFAULT_HEADER if header is None else tuple(_parse_int(v) for v in header)
+        h1, h2 = (fields[name] for name in HEADER_FIELDS)
+        for f in (h1, h2):
+            if f.shift != 0 or f.bit_length != (f.stop - f.start) * 8:
+                raise ValueError(f"帧头字段 {f.name} 必须按整字节对齐")
+        if h2.start != h1.stop:
+            raise ValueError("包头1 与 包头2 必须相邻")
+        self.sync_offset = h1.start
+        self.sync_word = (
+            header[0].to_bytes(h1.stop - h1.start, "big") + header[1].to_bytes(h2.stop - h2.start, "big")
+        )
+
+        length_field = fields[LENGTH_FIELD]
+        self._len_start = length_field.start
+        self._len_stop = length_field.stop
+        self._len_shift = length_field.shift
+        self._len_mask = length_field.mask
+        self._len_order = length_field.byteorder
+        self.length_adjust = length_adjust
+
+        # 帧长必须至少覆盖同步字与包长度字段；协议声明了固定帧长时必须一致
+        self.min_length = max(self.sync_offset + len(self.sync_word), self._len_stop)
+        self.fixed_length = protocol.get("protocol_length")
+        self.max_buffer = max_buffer
+
+        self._buf = bytearray()
+        self._in_sync = True
+        self.frames = 0      # 已输出帧数
+        self.bytes_in = 0    # 已输入字节数
+        self.discarded = 0   # 因失步丢弃的字节数
+        self.resyncs = 0     # 失步次数
+
+    @classmethod
+    def from_settings(cls, protocol, settings: Dict[str, Any]):
+        header = None
+        if "header1" in settings or "header2" in settings:
+            header = (settings.get("header1", DEFAULT_HEADER[0]), settings.get("header2", DEFAULT_HEADER[1]))
+        return cls(protocol, header=header, length_adjust=_parse_int(settings.get("length_adjust", 0)))
+
+    def _frame_length(self, buf, start):
+        raw = int.from_bytes(buf[start + self._len_start:start + self._len_stop], self._len_order)
+        length = ((raw >> self._len_shift) & self._len_mask) + self.length_adjust
+        if length < self.min_length:
+            return None
+        if self.fixed_length and length != self.fixed_length:
+            return None
+        return length
+
+    def feed(self, chunk: Union[bytes, bytearray, memoryview]) -> List[bytes]:
+        """输入一块数据，返回其中完整的帧"""
+        buf = self._buf
+        buf += chunk
+        self.bytes_in += len(chunk)
+
+        frames = []
+        sync = self.sync_word
+        offset = self.sync_offset
+        header_len = self.min_length
+        pos = 0
+        size = len(buf)
+        while True:
+            i = buf.find(sync, pos + offset)
+            if i < 0:
+                # 保留可能是同步字前半部分的尾部字节
+                keep = max(pos, size - offset - len(sync) + 1)
+                if keep > pos:
+                    self._lost(keep - pos)
+                pos = keep
+                break
+            start = i - offset  # 从 pos + offset 开始搜索，故 start >= pos
+            if start > pos:
+                self._lost(start - pos)
+                pos = start
+            if size - start < header_len:
+                break
+            length = self._frame_length(buf, start)
+            if length is None:
+                # 同步字误匹配，跳过 1 字节继续搜索
+                self._lost(1)
+                pos = start + 1
+                continue
+            if size - start < length:
+                break
+            frames.append(bytes(buf[start:start + length]))
+            pos = start + length
+            self._in_sync = True
+
+        del buf[:pos]
+        if len(buf) > self.max_buffer:
+            drop = len(buf) - self.max_buffer
+            self._lost(drop)
+            del buf[:drop]
+        self.frames += len(frames)
+        return frames
+
+    def _lost(self, n):
+        self.discarded += n
+        if self._in_sync:
+            self._in_sync = False
+            self.resyncs += 1
+
+    def reset(self):
+        self._buf.clear()
+        self._in_sync = True
+
+    def get_stats(self):
+        return {
+            "frames": self.frames,
+            "bytes": self.bytes_in,
+            "discarded": self.discarded,
+            "resyncs": self.resyncs,
+            "buffered": len(self._buf),
+        }
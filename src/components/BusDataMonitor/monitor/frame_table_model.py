@@ -0,0 +1,156 @@
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from src.components.BusDataMonitor.monitor.busdata_producer import format_frame_time, format_frame_hex
+
+FRAME_ROLE = Qt.UserRole + 1  # 返回原始值（monotonic_ns 时间戳 / 原始帧 bytes）
+
+
+class FrameTableModel(QAbstractTableModel):
+    """
+    基于定长环形缓冲区的帧表格模型
+
+    时间戳、方向、帧长与原始字节分别保存在预分配的 numpy 数组中，
+    显示字符串只在视图请求可见单元格时由 data() 生成；
+    每次 append_frames 最多触发一对 beginRemoveRows/beginInsertRows。
+    """
+    HEADERS = ["时间戳", "传输方向", "数据内容"]
+
+    def __init__(self, capacity=500, frame_width=128, parent=None):
+        super().__init__(parent)
+        self._directions = ["Tx", "Rx"]  # 方向编码表
+        self._dir_index = {name: i for i, name in enumerate(self._directions)}
+        self._allocate(capacity, frame_width)
+
+    def _allocate(self, capacity, frame_width):
+        self._capacity = max(1, int(capacity))
+        self._width = frame_width
+        self._ts = np.zeros(self._capacity, dtype=np.int64)
+        self._dir = np.zeros(self._capacity, dtype=np.uint8)
+        self._len = np.zeros(self._capacity, dtype=np.uint16)
+        self._raw = np.zeros((self._capacity, frame_width), dtype=np.uint8)
+        self._head = 0   # 最早一行所在的物理位置
+        self._count = 0
+
+    # ---------------- Qt 模型接口 ----------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, FRAME_ROLE):
+            return None
+        row = index.row()
+        if row >= self._count:
+            return None
+        col = index.column()
+        if col == 0:
+            ts = int(self._ts[self._physical(row)])
+            return ts if role == FRAME_ROLE else format_frame_time(ts)
+        if col == 1:
+            return self.direction(row)
+        frame = self.frame(row)
+        return frame if role == FRAME_ROLE else format_frame_hex(frame)
+
+    # ---------------- 环形缓冲区操作 ----------------
+
+    def _physical(self, row):
+        return (self._head + row) % self._capacity
+
+    def capacity(self):
+        return self._capacity
+
+    def frame(self, row) -> bytes:
+        p = self._physical(row)
+        return self._raw[p, :self._len[p]].tobytes()
+
+    def direction(self, row) -> str:
+        return self._directions[self._dir[self._physical(row)]]
+
+    def _direction_code(self, tor):
+        code = self._dir_index.get(tor)
+        if code is None:
+            code = len(self._directions)
+            self._directions.append(tor)
+            self._dir_index[tor] = code
+        return code
+
+    def _widen(self, frame_width):
+        """出现更长的帧时加宽原始字节数组（保持物理位置不变）"""
+        raw = np.zeros((self._capacity, frame_width), dtype=np.uint8)
+        raw[:, :self._width] = self._raw
+        self._raw = raw
+        self._width = frame_width
+
+    def append_frames(self, rows):
+        """
+        追加一批帧记录
+        :param rows: [(monotonic_ns, 方向, bytes), ...]
+        """
+        n = len(rows)
+        if n == 0:
+            return
+        if n > self._capacity:
+            rows = rows[-self._capacity:]
+            n = self._capacity
+
+        # 超出容量的最早行整体移除
+        removed = self._count + n - self._capacity
+        if removed > 0:
+            self.beginRemoveRows(QModelIndex(), 0, removed - 1)
+            self._head = (self._head + removed) % self._capacity
+            self._count -= removed
+            self.endRemoveRows()
+
+        ts_list, tor_list, frames = zip(*rows)
+        lengths = np.fromiter((len(f) for f in frames), dtype=np.uint16, count=n)
+        max_len = int(lengths.max())
+        if max_len > self._width:
+            self._widen(max_len)
+
+        pos = (self._head + self._count + np.arange(n)) % self._capacity
+        self.beginInsertRows(QModelIndex(), self._count, self._count + n - 1)
+        self._ts[pos] = ts_list
+        self._dir[pos] = [self._direction_code(t) for t in tor_list]
+        self._len[pos] = lengths
+        if int(lengths.min()) == max_len:
+            self._raw[pos, :max_len] = np.frombuffer(b"".join(frames), dtype=np.uint8).reshape(n, max_len)
+        else:
+            for p, f in zip(pos, frames):
+                self._raw[p, :len(f)] = np.frombuffer(f, dtype=np.uint8)
+        self._count += n
+        self.endInsertRows()
+
+    def set_capacity(self, capacity):
+        """修改最大行数，保留最新的若干行"""
+        capacity = max(1, int(capacity))
+        if capacity == self._capacity:
+            return
+        keep = min(self._count, capacity)
+        pos = (self._head + self._count - keep + np.arange(keep)) % self._capacity
+        ts, dirs, lens, raw = self._ts[pos], self._dir[pos], self._len[pos], self._raw[pos]
+
+        self.beginResetModel()
+        self._allocate(capacity, self._width)
+        self._ts[:keep] = ts
+        self._dir[:keep] = dirs
+        self._len[:keep] = lens
+        self._raw[:keep] = raw
+        self._count = keep
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self._head = 0
+        self._count = 0
+        self.endResetModel()
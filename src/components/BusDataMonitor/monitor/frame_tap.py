@@ -0,0 +1,73 @@
+import threading
+
+import numpy as np
+
+from src.components.BusDataMonitor.monitor.shm_ring import ShmRingReader
+
+
+class FrameTap:
+    """
+    进程内的帧旁路缓冲区（单写者、单读者）
+
+    thread 后端的 Producer 在写入显示队列的同时把帧写入订阅的 FrameTap，
+    读者按批取出 (时间戳数组, (N, frame_size) 帧数组)，可直接交给 BusDataParser 批量解析。
+    写者不等待读者，读者落后超过容量时丢弃最旧的帧并计入 lost；长度不等于 frame_size 的帧计入 mismatched。
+    """
+    def __init__(self, frame_size, capacity=16384):
+        self.frame_size = frame_size
+        self.capacity = capacity
+        self._ts = np.zeros(capacity, dtype=np.int64)
+        self._data = np.zeros((capacity, frame_size), dtype=np.uint8)
+        self._write_count = 0
+        self._read_count = 0
+        self._lock = threading.Lock()
+        self.lost = 0
+        self.mismatched = 0
+
+    def put(self, ts, frame):
+        """写入一帧 (monotonic_ns, bytes)"""
+        if len(frame) != self.frame_size:
+            self.mismatched += 1
+            return
+        with self._lock:
+            p = self._write_count % self.capacity
+            self._ts[p] = ts
+            self._data[p] = np.frombuffer(frame, dtype=np.uint8)
+            self._write_count += 1
+
+    def read(self):
+        """
+        取出新写入的全部帧
+        :return: (ts (N,) int64, data (N, frame_size) uint8)，均为拷贝
+        """
+        with self._lock:
+            available = self._write_count - self._read_count
+            if available > self.capacity:
+                self.lost += available - self.capacity
+                self._read_count = self._write_count - self.capacity
+                available = self.capacity
+            index = (self._read_count + np.arange(available)) % self.capacity
+            self._read_count = self._write_count
+            return self._ts[index], self._data[index]
+
+
+class ShmTap:
+    """
+    process 后端的帧旁路：共享内存环形缓冲区的独立读者，接口与 FrameTap.read() 一致
+    """
+    def __init__(self, ring, frame_size):
+        self.reader = ShmRingReader(ring)
+        self.frame_size = frame_size
+        self.mismatched = 0
+
+    @property
+    def lost(self):
+        return self.reader.lost
+
+    def read(self):
+        slots = self.reader.read()
+        ok = slots["len"] == self.frame_size
+        if not ok.all():
+            self.mismatched += int(len(ok) - np.count_nonzero(ok))
+            slots = slots[ok]
+        return slots["ts"], slots["data"][:, :self.frame_size]
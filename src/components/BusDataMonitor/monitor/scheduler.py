@@ -0,0 +1,201 @@
+import heapq
+import threading
+import time
+
+import numpy as np
+
+POLICY_CATCH_UP = "catch_up"  # 落后时连续补发错过的周期（不超过 max_catch_up 个）
+POLICY_SKIP = "skip"          # 落后时直接跳到下一个未来的周期，错过的周期计入 missed
+
+
+class _Task:
+    """调度任务：绝对截止时间 + 计时统计"""
+    __slots__ = ("key", "callback", "freq", "period_ns", "deadline", "active",
+                 "count", "missed", "overruns", "_starts", "_late", "_pos")
+
+    def __init__(self, key, callback, freq, window):
+        self.key = key
+        self.callback = callback
+        self.freq = freq
+        self.period_ns = int(round(1e9 / freq))
+        self.deadline = 0
+        self.active = True
+        self.count = 0      # 已执行次数
+        self.missed = 0     # 被跳过的周期数
+        self.overruns = 0   # 执行结束时已超过下一周期截止时间的次数
+        self._starts = np.zeros(window, dtype=np.int64)  # 最近 window 次的实际开始时间
+        self._late = np.zeros(window, dtype=np.int64)    # 最近 window 次的开始延迟(实际 - 截止)
+        self._pos = 0
+
+    def stats(self):
+        n = min(self.count, len(self._starts))
+        result = {
+            "freq": self.freq,
+            "count": self.count,
+            "missed": self.missed,
+            "overruns": self.overruns,
+            "rate": 0.0,
+            "jitter_p50_us": 0.0,
+            "jitter_p95_us": 0.0,
+            "jitter_p99_us": 0.0,
+            "jitter_max_us": 0.0,
+        }
+        if n == 0:
+            return result
+        starts = self._starts[:n]
+        late = self._late[:n] / 1e3
+        span = int(starts.max()) - int(starts.min())
+        if n > 1 and span > 0:
+            result["rate"] = (n - 1) * 1e9 / span
+        p50, p95, p99 = np.percentile(late, (50, 95, 99))
+        result.update(jitter_p50_us=float(p50), jitter_p95_us=float(p95),
+                      jitter_p99_us=float(p99), jitter_max_us=float(late.max()))
+        return result
+
+
+class PeriodicScheduler:
+    """
+    基于 monotonic 绝对截止时间的周期调度器
+
+    一个线程驱动任意多个周期任务：第 k 次执行的截止时间固定为 t0 + k * period，
+    回调耗时与唤醒延迟不会累积成频率漂移。落后时按 policy 补发或跳过错过的周期，
+    并为每个任务统计实际频率、开始延迟(抖动)分位数与超时次数。
+    """
+    def __init__(self, policy=POLICY_CATCH_UP, max_catch_up=10, spin_us=0, window=2048, name="PeriodicScheduler"):
+        """
+        :param policy: POLICY_CATCH_UP 或 POLICY_SKIP
+        :param max_catch_up: catch_up 模式下允许连续补发的最大周期数，超过后按 skip 处理
+        :param spin_us: 截止前最后 spin_us 微秒改为忙等，以 CPU 换取更低的抖动
+        :param window: 统计实际频率与抖动分位数的最近执行次数
+        """
+        if policy not in (POLICY_CATCH_UP, POLICY_SKIP):
+            raise ValueError(f"Invalid policy: {policy}")
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.spin_ns = int(spin_us * 1000)
+        self.window = window
+        self.name = name
+        self._tasks = {}
+        self._heap = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self.thread = None
+
+    # ---------------- 任务管理 ----------------
+
+    def add(self, key, callback, freq):
+        """添加周期任务，首次执行时间为当前时刻"""
+        if freq <= 0:
+            raise ValueError(f"Invalid freq: {freq}")
+        with self._cond:
+            old = self._tasks.get(key)
+            if old is not None:
+                old.active = False
+            task = _Task(key, callback, freq, self.window)
+            task.deadline = time.monotonic_ns()
+            self._tasks[key] = task
+            self._push(task)
+            self._cond.notify()
+
+    def remove(self, key):
+        with self._cond:
+            task = self._tasks.pop(key, None)
+            if task is not None:
+                task.active = False
+
+    def _push(self, task):
+        self._seq += 1
+        heapq.heappush(self._heap, (task.deadline, self._seq, task))
+
+    # ---------------- 线程控制 ----------------
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self.thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+
+    def is_running(self):
+        return self._running
+
+    def _next_due(self):
+        """等待并取出下一个到期任务；调度器停止时返回 None"""
+        cond = self._cond
+        with cond:
+            while self._running:
+                if not self._heap:
+                    cond.wait()
+                    continue
+                deadline, _, task = self._heap[0]
+                if not task.active:
+                    heapq.heappop(self._heap)
+                    continue
+                delay = deadline - time.monotonic_ns()
+                if delay > self.spin_ns:
+                    # 可能被新加入的更早任务唤醒，醒来后重新检查堆顶
+                    cond.wait((delay - self.spin_ns) / 1e9)
+                    continue
+                heapq.heappop(self._heap)
+                return task
+        return None
+
+    def _loop(self):
+        while True:
+            task = self._next_due()
+            if task is None:
+                break
+            deadline = task.deadline
+            while time.monotonic_ns() < deadline:
+                pass  # 仅在 spin_us > 0 时进入
+
+            start = time.monotonic_ns()
+            try:
+                task.callback()
+            except Exception as e:
+                print(f"[{self.name}] 任务 {task.key} 执行异常: {e}")
+            end = time.monotonic_ns()
+
+            pos = task._pos
+            task._starts[pos] = start
+            task._late[pos] = start - deadline
+            task._pos = (pos + 1) % self.window
+            task.count += 1
+
+            period = task.period_ns
+            next_deadline = deadline + period
+            if end > next_deadline:
+                task.overruns += 1
+                behind = (end - next_deadline) // period + 1  # 已错过的截止时间个数
+                if self.policy == POLICY_SKIP or behind > self.max_catch_up:
+                    task.missed += behind
+                    next_deadline += behind * period
+            task.deadline = next_deadline
+
+            with self._cond:
+                if task.active:
+                    self._push(task)
+
+    # ---------------- 统计 ----------------
+
+    def get_stats(self, key=None):
+        """
+        返回任务计时统计
+        :return: key 为 None 时返回 {key: stats}，否则返回该任务的 stats；
+                 stats 含 freq/rate(实际频率)/count/missed/overruns 与开始延迟分位数 jitter_p50/p95/p99/max_us
+        """
+        with self._cond:
+            tasks = dict(self._tasks)
+        if key is not None:
+            task = tasks.get(key)
+            return task.stats() if task is not None else None
+        return {k: t.stats() for k, t in tasks.items()}
@@ -0,0 +1,184 @@
+import queue
+import weakref
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+_HEADER_BYTES = 64          # 头部：[已写入帧总数, 容量, 槽位帧长]
+_DIRECTIONS = ("Tx", "Rx")  # 槽位中方向的编码
+
+
+def _slot_dtype(frame_size):
+    return np.dtype([("ts", "<i8"), ("len", "<u2"), ("dir", "u1"), ("data", "u1", (frame_size,))])
+
+
+def _release(shm, unlink):
+    try:
+        shm.close()
+    except BufferError:
+        pass  # 仍有 numpy 视图引用该内存，映射随进程退出释放
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ShmFrameRing:
+    """
+    共享内存帧环形缓冲区（单写者、多读者）
+
+    写者进程按 (monotonic_ns, 方向, bytes) 写入定长槽位后再递增头部的写入计数；
+    读者各自维护读位置，直接映射同一块共享内存读取，不经过管道拷贝。
+    写者不等待读者，读者落后超过一圈时丢弃最旧的数据并计入 lost。
+    """
+    def __init__(self, capacity=16384, frame_size=256, name=None, create=True):
+        if create:
+            dtype = _slot_dtype(frame_size)
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=_HEADER_BYTES + capacity * dtype.itemsize
+            )
+            self.header = np.ndarray((3,), dtype="<i8", buffer=self.shm.buf)
+            self.header[:] = (0, capacity, frame_size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.header = np.ndarray((3,), dtype="<i8", buffer=self.shm.buf)
+            capacity, frame_size = int(self.header[1]), int(self.header[2])
+            dtype = _slot_dtype(frame_size)
+
+        self.name = self.shm.name
+        self.capacity = capacity
+        self.frame_size = frame_size
+        self.slots = np.ndarray((capacity,), dtype=dtype, buffer=self.shm.buf, offset=_HEADER_BYTES)
+        self._ts = self.slots["ts"]
+        self._len = self.slots["len"]
+        self._dir = self.slots["dir"]
+        self._data = self.slots["data"]
+        self._write_count = int(self.header[0])
+        # 创建者负责在回收或解释器退出时释放共享内存
+        self._finalizer = weakref.finalize(self, _release, self.shm, create)
+
+    @classmethod
+    def attach(cls, name):
+        """在其他进程中按名称映射已有的环形缓冲区"""
+        return cls(name=name, create=False)
+
+    def write_count(self):
+        return int(self.header[0])
+
+    def put_nowait(self, item):
+        """写入一帧 (monotonic_ns, 方向, bytes)，接口与 queue.Queue 一致，永不阻塞"""
+        ts, tor, frame = item
+        n = len(frame)
+        if n > self.frame_size:
+            raise ValueError(f"帧长度 {n} 超过槽位大小 {self.frame_size}")
+        i = self._write_count
+        p = i % self.capacity
+        self._ts[p] = ts
+        self._len[p] = n
+        self._dir[p] = _DIRECTIONS.index(tor)
+        self._data[p, :n] = np.frombuffer(frame, dtype=np.uint8)
+        # 数据写完后再发布写入计数
+        self._write_count = i + 1
+        self.header[0] = i + 1
+
+    def close(self):
+        self._ts = self._len = self._dir = self._data = self.slots = self.header = None
+        self._finalizer()
+
+
+class ShmRingReader:
+    """环形缓冲区的独立读者"""
+    def __init__(self, ring: ShmFrameRing, from_start=False):
+        self.ring = ring
+        self.read_count = 0 if from_start else ring.write_count()
+        self.lost = 0
+
+    def available(self):
+        return min(self.ring.write_count() - self.read_count, self.ring.capacity)
+
+    def skip(self):
+        """跳过所有未读数据"""
+        self.read_count = self.ring.write_count()
+
+    def read(self, max_frames=None):
+        """
+        读取新写入的帧
+        :return: 槽位结构化数组的拷贝（字段 ts/len/dir/data）
+        """
+        ring = self.ring
+        write_count = ring.write_count()
+        available = write_count - self.read_count
+        if available > ring.capacity:
+            self.lost += available - ring.capacity
+            self.read_count = write_count - ring.capacity
+            available = ring.capacity
+        if max_frames is not None:
+            available = min(available, max_frames)
+        if available <= 0:
+            return ring.slots[:0].copy()
+
+        start = self.read_count
+        slots = ring.slots[(start + np.arange(available)) % ring.capacity]
+        self.read_count = start + available
+
+        # 拷贝期间写者可能已追上并覆盖了最早的槽位；写入计数为 W 时写者可能正在写槽位 W（与 W - capacity
+        # 为同一槽位，计数在写完后才发布），因此截至 W + 1 - capacity 之前的槽位都不可信
+        overwritten = ring.write_count() + 1 - ring.capacity - start
+        if overwritten > 0:
+            overwritten = min(overwritten, available)
+            self.lost += overwritten
+            slots = slots[overwritten:]
+        return slots
+
+    def read_frames(self, max_frames=None):
+        """读取新写入的帧，返回 [(monotonic_ns, 方向, bytes), ...]"""
+        return slots_to_frames(self.read(max_frames))
+
+
+def slots_to_frames(slots):
+    """将 read() 返回的槽位数组转换为 [(monotonic_ns, 方向, bytes), ...]"""
+    data = slots["data"]
+    return [
+        (ts, _DIRECTIONS[d], data[i, :n].tobytes())
+        for i, (ts, n, d) in enumerate(zip(slots["ts"].tolist(), slots["len"].tolist(), slots["dir"].tolist()))
+    ]
+
+
+class ShmChannelQueue:
+    """
+    将一个通道的环形缓冲区适配为显示队列
+
+    提供 drain()/get_nowait()/qsize()/empty()，可直接替代 queue.Queue 交给 DataMonitor。
+    """
+    def __init__(self, rings):
+        self.readers = [ShmRingReader(r) for r in rings]
+        self._pending = deque()
+
+    def drain(self):
+        items = self._pending
+        self._pending = deque()
+        batches = [r.read_frames() for r in self.readers]
+        if len(batches) == 1:
+            items.extend(batches[0])
+        else:
+            items.extend(sorted((f for b in batches for f in b), key=lambda f: f[0]))
+        return items
+
+    def get_nowait(self):
+        if not self._pending:
+            self._pending = self.drain()
+        if not self._pending:
+            raise queue.Empty
+        return self._pending.popleft()
+
+    def qsize(self):
+        return len(self._pending) + sum(r.available() for r in self.readers)
+
+    def empty(self):
+        return self.qsize() == 0
+
+    @property
+    def lost(self):
+        return sum(r.lost for r in self.readers)
@@ -0,0 +1,169 @@
+"""
+测试 RS422RealProducer 的帧同步与字节流传输
+
+使用 pty / socketpair 替身代替真实串口，覆盖吞吐量与数据损坏后的重新同步
+
+运行：python -m src.components.BusDataMonitor.monitor.test_rs422_transport
+"""
+import os
+import sys
+import queue
+import random
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))))
+from src.components.BusDataMonitor.monitor.busdata_producer import RS422RealProducer
+from src.components.BusDataMonitor.monitor.frame_sync import FrameSynchronizer, DEFAULT_HEADER
+from src.components.BusDataMonitor.monitor.transport import PtyTransport, SocketPairTransport, SerialTransport
+from src.components.BusDataMonitor.protocol import ProtocolLoader
+
+PROTOCOL = ProtocolLoader().get("recv422")
+FRAME_LEN = PROTOCOL["protocol_length"]
+
+
+def make_frame(counter, rng=random):
+    """按协议构造一帧：包头1/包头2 + 帧计数 + 包长度 + 随机负载"""
+    payload = rng.getrandbits((FRAME_LEN - 4) * 8).to_bytes(FRAME_LEN - 4, "big")
+    return bytes([DEFAULT_HEADER[0], DEFAULT_HEADER[1], counter & 0xFF, FRAME_LEN]) + payload
+
+
+def make_frames(n, seed=0):
+    rng = random.Random(seed)
+    return [make_frame(i, rng) for i in range(n)]
+
+
+def collect(q, expected, timeout=10.0):
+    """从队列收集 expected 帧（或直到超时）"""
+    frames = []
+    deadline = time.monotonic() + timeout
+    while len(frames) < expected and time.monotonic() < deadline:
+        try:
+            frames.append(q.get(timeout=0.1)[2])
+        except queue.Empty:
+            pass
+    return frames
+
+
+def test_sync_arbitrary_chunks():
+    """帧在任意位置被切分时仍能完整还原"""
+    frames = make_frames(500)
+    stream = b"".join(frames)
+    sync = FrameSynchronizer(PROTOCOL)
+    rng = random.Random(1)
+    out = []
+    pos = 0
+    while pos < len(stream):
+        n = rng.randint(1, 3 * FRAME_LEN)
+        out.extend(sync.feed(stream[pos:pos + n]))
+        pos += n
+    assert out == frames
+    assert sync.get_stats()["discarded"] == 0
+
+
+def test_sync_resync_after_corruption():
+    """垃圾字节、截断帧、错误包长度之后在下一帧恢复同步"""
+    frames = make_frames(30)
+    truncated = frames[10][:FRAME_LEN // 2]
+    bad_length = frames[20][:3] + bytes([FRAME_LEN - 1]) + frames[20][4:]
+    stream = (
+        b"\x00\x11" + bytes(DEFAULT_HEADER)            # 开头的垃圾与孤立同步字
+        + b"".join(frames[:10]) + truncated
+        + b"".join(frames[11:20]) + bad_length
+        + bytes(range(256)) + b"".join(frames[21:])
+    )
+    sync = FrameSynchronizer(PROTOCOL)
+    out = sync.feed(stream)
+    # 无校验时截断帧按包长度拼上下一帧的前半部分输出，下一帧因此丢失，之后的帧恢复同步
+    glued = truncated + frames[11][:FRAME_LEN - len(truncated)]
+    expected = frames[:10] + [glued] + frames[12:20] + frames[21:]
+    assert out == expected, f"{len(out)} != {len(expected)}"
+    assert sync.get_stats()["resyncs"] >= 3
+
+
+def _run_producer(transport, writer, frames, timeout=20.0):
+    q = queue.Queue()
+    producer = RS422RealProducer("0", q, "Rx", 20, {}, protocol=PROTOCOL, transport=transport)
+    producer.start()
+    t = threading.Thread(target=writer, daemon=True)
+    start = time.perf_counter()
+    t.start()
+    out = collect(q, len(frames), timeout)
+    elapsed = time.perf_counter() - start
+    producer.stop()
+    t.join()
+    return out, elapsed, producer.get_stats()
+
+
+def test_pty_throughput(n=20000):
+    """pty 替身上连续写入 n 帧，全部按序收到"""
+    frames = make_frames(n)
+    stream = b"".join(frames)
+    with PtyTransport() as transport:
+        def writer():
+            for i in range(0, len(stream), 4096):
+                transport.write_peer(stream[i:i + 4096])
+
+        out, elapsed, stats = _run_producer(transport, writer, frames)
+    assert out == frames, f"收到 {len(out)}/{n} 帧"
+    assert stats["discarded"] == 0
+    print(f"  pty 吞吐量: {n / elapsed:,.0f} 帧/秒, {len(stream) / elapsed / 1e6:.1f} MB/s")
+
+
+def test_pty_resync():
+    """pty 替身上注入损坏数据后继续收到后续帧"""
+    frames = make_frames(2000, seed=2)
+    garbage = bytes(random.Random(3).getrandbits(8) for _ in range(1000)).replace(bytes(DEFAULT_HEADER), b"\x00\x00")
+    with PtyTransport() as transport:
+        def writer():
+            transport.write_peer(b"".join(frames[:1000]))
+            transport.write_peer(garbage)
+            transport.write_peer(frames[1000][:50])  # 截断帧，与 frames[1001] 前半部分拼成一帧
+            transport.write_peer(b"".join(frames[1001:]))
+
+        glued = frames[1000][:50] + frames[1001][:FRAME_LEN - 50]
+        expected = frames[:1000] + [glued] + frames[1002:]
+        out, _, stats = _run_producer(transport, writer, expected)
+    assert out == expected, f"收到 {len(out)}/{len(expected)} 帧"
+    assert stats["resyncs"] >= 1
+
+
+def test_socketpair_transport():
+    frames = make_frames(5000, seed=4)
+    with SocketPairTransport() as transport:
+        out, _, _ = _run_producer(transport, lambda: transport.write_peer(b"".join(frames)), frames)
+    assert out == frames
+
+
+def test_serial_transport_by_path():
+    """按设备路径打开 pty 从端，验证串口路径的 termios 配置与读取"""
+    master, slave = os.openpty()
+    path = os.ttyname(slave)
+    frames = make_frames(3000, seed=5)
+    try:
+        transport = SerialTransport(path, baudrate=115200, parity="None")
+
+        def writer():
+            data = memoryview(b"".join(frames))
+            while data:
+                data = data[os.write(master, data[:4096]):]
+
+        out, _, _ = _run_producer(transport, writer, frames)
+        transport.close()
+    finally:
+        os.close(master)
+        os.close(slave)
+    assert out == frames, f"收到 {len(out)}/{len(frames)} 帧"
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in list(globals().items()) if k.startswith("test_") and callable(v)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
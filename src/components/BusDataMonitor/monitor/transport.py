@@ -0,0 +1,239 @@
+import os
+import select
+import socket
+from abc import ABC, abstractmethod
+
+try:
+    import termios
+    import tty
+    POSIX_TTY_AVAILABLE = True
+except ImportError:  # Windows 下改用 pyserial
+    POSIX_TTY_AVAILABLE = False
+
+DEFAULT_CHUNK_SIZE = 65536  # 单次读取的最大字节数
+
+
+class ByteTransport(ABC):
+    """
+    字节流传输接口
+
+    read() 一次返回当前可读的全部数据（最多 max_bytes），
+    超时无数据返回 b""；帧边界由 FrameSynchronizer 负责恢复
+    """
+    @abstractmethod
+    def read(self, max_bytes=DEFAULT_CHUNK_SIZE, timeout=0.05) -> bytes:
+        pass
+
+    @abstractmethod
+    def write(self, data: bytes) -> int:
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FdTransport(ByteTransport):
+    """基于非阻塞文件描述符的传输（tty / pty）"""
+    def __init__(self, fd):
+        self.fd = fd
+        os.set_blocking(fd, False)
+
+    def read(self, max_bytes=DEFAULT_CHUNK_SIZE, timeout=0.05):
+        if self.fd is None:
+            return b""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return b""
+        try:
+            return os.read(self.fd, max_bytes)
+        except (BlockingIOError, InterruptedError):
+            return b""
+        except OSError:
+            # pty 对端关闭时 Linux 返回 EIO
+            return b""
+
+    def write(self, data):
+        return os.write(self.fd, data)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def _baud_constant(baudrate):
+    name = f"B{int(baudrate)}"
+    if not hasattr(termios, name):
+        raise ValueError(f"Unsupported baudrate: {baudrate}")
+    return getattr(termios, name)
+
+
+class SerialTransport(ByteTransport):
+    """
+    按设备路径打开串口（如 /dev/ttyS0、/dev/ttyUSB0、COM3）
+
+    POSIX 下直接用 termios 配置为原始模式；其他平台需要安装 pyserial
+    """
+    _PARITY = {"none": "N", "even": "E", "odd": "O"}
+
+    def __init__(self, port, baudrate=9600, bytesize=8, stopbits=1, parity="None"):
+        self.port = port
+        self.baudrate = int(baudrate)
+        self.bytesize = int(bytesize)
+        self.stopbits = int(float(stopbits))
+        self.parity = str(parity).lower()
+        if self.parity not in self._PARITY:
+            raise ValueError(f"Invalid parity: {parity}")
+        self._fd_transport = None
+        self._serial = None
+        if POSIX_TTY_AVAILABLE:
+            self._open_posix()
+        else:
+            self._open_pyserial()
+
+    def _open_posix(self):
+        fd = os.open(self.port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            tty.setraw(fd)
+            attrs = termios.tcgetattr(fd)
+            iflag, oflag, cflag, lflag, ispeed, ospeed, cc = attrs
+            cflag &= ~(termios.CSIZE | termios.CSTOPB | termios.PARENB | termios.PARODD)
+            cflag |= {5: termios.CS5, 6: termios.CS6, 7: termios.CS7, 8: termios.CS8}[self.bytesize]
+            cflag |= termios.CLOCAL | termios.CREAD
+            if self.stopbits == 2:
+                cflag |= termios.CSTOPB
+            if self.parity != "none":
+                cflag |= termios.PARENB
+                if self.parity == "odd":
+                    cflag |= termios.PARODD
+            speed = _baud_constant(self.baudrate)
+            termios.tcsetattr(fd, termios.TCSANOW, [iflag, oflag, cflag, lflag, speed, speed, cc])
+        except Exception:
+            os.close(fd)
+            raise
+        self._fd_transport = FdTransport(fd)
+
+    def _open_pyserial(self):
+        try:
+            import serial
+        except ImportError:
+            raise ImportError("当前平台打开串口需要安装 pyserial：pip install pyserial")
+        self._serial = serial.Serial(
+            self.port, self.baudrate, bytesize=self.bytesize, stopbits=self.stopbits,
+            parity=self._PARITY[self.parity], timeout=0,
+        )
+
+    def read(self, max_bytes=DEFAULT_CHUNK_SIZE, timeout=0.05):
+        if self._fd_transport is not None:
+            return self._fd_transport.read(max_bytes, timeout)
+        self._serial.timeout = timeout
+        first = self._serial.read(1)
+        if not first:
+            return b""
+        waiting = self._serial.in_waiting
+        return first + (self._serial.read(min(waiting, max_bytes - 1)) if waiting else b"")
+
+    def write(self, data):
+        if self._fd_transport is not None:
+            return self._fd_transport.write(data)
+        return self._serial.write(data)
+
+    def close(self):
+        if self._fd_transport is not None:
+            self._fd_transport.close()
+        if self._serial is not None:
+            self._serial.close()
+
+
+class PtyTransport(FdTransport):
+    """
+    伪终端替身：读取 pty 主端，设备模拟程序或测试向 peer_name 路径（从端）写入数据
+
+    仅 POSIX 可用
+    """
+    def __init__(self):
+        if not POSIX_TTY_AVAILABLE:
+            raise OSError("PtyTransport 仅支持 POSIX 平台")
+        master, slave = os.openpty()
+        tty.setraw(master)
+        tty.setraw(slave)
+        self.peer_fd = slave
+        self.peer_name = os.ttyname(slave)
+        super().__init__(master)
+
+    def write_peer(self, data: bytes) -> int:
+        """从设备一侧写入数据（阻塞直到全部写完）"""
+        view = memoryview(data)
+        while view:
+            n = os.write(self.peer_fd, view)
+            view = view[n:]
+        return len(data)
+
+    def close(self):
+        super().close()
+        if self.peer_fd is not None:
+            os.close(self.peer_fd)
+            self.peer_fd = None
+
+
+class SocketPairTransport(ByteTransport):
+    """套接字对替身：读取一端，设备模拟程序或测试通过 peer 套接字写入数据"""
+    def __init__(self):
+        self.sock, self.peer = socket.socketpair()
+        self.sock.setblocking(False)
+
+    def read(self, max_bytes=DEFAULT_CHUNK_SIZE, timeout=0.05):
+        if self.sock is None:
+            return b""
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        if not readable:
+            return b""
+        try:
+            return self.sock.recv(max_bytes)
+        except (BlockingIOError, InterruptedError):
+            return b""
+
+    def write(self, data):
+        return self.sock.send(data)
+
+    def write_peer(self, data: bytes) -> int:
+        self.peer.sendall(data)
+        return len(data)
+
+    def close(self):
+        for s in (self.sock, self.peer):
+            if s is not None:
+                s.close()
+        self.sock = self.peer = None
+
+
+def open_transport(settings: dict) -> ByteTransport:
+    """
+    按通道 settings 打开传输
+
+    settings["transport"]：serial（默认，需 settings["port"]）、pty、socketpair
+    """
+    kind = settings.get("transport", "serial")
+    if kind == "serial":
+        port = settings.get("port")
+        if not port:
+            raise ValueError("串口传输需要在 settings 中配置 port")
+        return SerialTransport(
+            port,
+            baudrate=settings.get("baudrate", 9600),
+            bytesize=settings.get("bytesize", 8),
+            stopbits=settings.get("stopbits", 1),
+            parity=settings.get("parity", "None"),
+        )
+    if kind == "pty":
+        return PtyTransport()
+    if kind == "socketpair":
+        return SocketPairTransport()
+    raise ValueError(f"Invalid transport: {kind}")
@@ -11,7 +11,9 @@ from src.components.BusDataMonitor.monitor.busdata_producer import RS422Manager
 from src.components.BusDataMonitor.monitor.dock_monitor import DataMonitor
 from src.components.BusDataMonitor.monitor.dock_parser import DockParser
 from src.components.BusDataMonitor.config import channel_config
-from assets import ICON_TABLE,ICON_SITEMAP
+from src.components.RTDataPlot.RTdata_plot_demo import DataPlotForm, curve_config
+from src.components.RTDataPlot.bus_source import BusDataThread, bus_sources
+from assets import ICON_TABLE,ICON_SITEMAP,ICON_GLASS_CHART
 
 DEFAULT_MAX_ROWS = 500
 MAX_ALLOWED_ROWS = 200000
@@ -26,9 +28,11 @@ class BusDataMonitorForm(QMainWindow):
         # >>> 使用 RS422Manager 创建所有 producer/queue
         self.manager = RS422Manager(self.channel_config, use_sim=True)
         self.manager.start_all()
+        self.update_record_status()
 
         # 动态保存 dock monitor 引用
         self.dock_monitors = {}  # key = ch_id , value = dock widget
+        self.dock_plot = None  # 实时曲线 dock
 
         # 根据配置动态创建 toolbar action
         self.create_channel_actions()
@@ -49,6 +53,10 @@ class BusDataMonitorForm(QMainWindow):
         self.toolBar.addWidget(spacer)  # 添加到 toolbar 中，前面的按钮会被推到左边
 
         # 然后再添加你的右侧按钮
+        self.btn_plot = QAction(QIcon(ICON_GLASS_CHART), "实时曲线", self)
+        self.btn_plot.triggered.connect(self.show_plot_dock)
+        self.toolBar.addAction(self.btn_plot)
+
         self.btn_layout = QAction(QIcon(ICON_TABLE), "默认布局", self)
         self.btn_layout.triggered.connect(self.reset_layout)
         self.toolBar.addAction(self.btn_layout)  
@@ -74,7 +82,8 @@ class BusDataMonitorForm(QMainWindow):
         q = self.manager.queues[ch_id]
 
         # 创建 DataMonitor
-        monitor = DataMonitor(f"通道 {ch_id} 数据监控", data_queue=q, channel_id=ch_id)
+        monitor = DataMonitor(f"通道 {ch_id} 数据监控", data_queue=q, channel_id=ch_id,
+                              health=self.manager.health.get(ch_id))
         dock = QDockWidget(f"通道 {ch_id} 数据监控", self)
         dock.setWidget(monitor)
         dock.setObjectName(f"Dock_{ch_id}")
@@ -86,10 +95,41 @@ class BusDataMonitorForm(QMainWindow):
 
         # 双击行显示解析窗口
         monitor.row_double_clicked.connect(self.show_parsed_dock)
+        monitor.config_changed.connect(self.on_channel_config_changed)
+        dock.show()
+
+
+    def show_plot_dock(self):
+        """显示实时曲线：曲线配置中带 source 的项由对应通道的协议字段驱动"""
+        if self.dock_plot is not None:
+            self.dock_plot.raise_()
+            self.dock_plot.show()
+            return
+        form = DataPlotForm(thread_factory=lambda: BusDataThread(self.manager, bus_sources(curve_config())))
+        dock = QDockWidget("实时曲线", self)
+        dock.setWidget(form)
+        dock.setObjectName("Dock_plot")
+        dock.setFeatures(QDockWidget.DockWidgetMovable |
+                         QDockWidget.DockWidgetClosable |
+                         QDockWidget.DockWidgetFloatable)
+        self.addDockWidget(Qt.RightDockWidgetArea, dock)
+        self.dock_plot = dock
         dock.show()
 
+    def on_channel_config_changed(self, ch_id):
+        """通道配置（含 store 标志）修改后同步到记录器"""
+        self.manager.refresh_store()
+        self.update_record_status()
+
+    def update_record_status(self):
+        recorder = self.manager.recorder
+        if recorder.is_recording():
+            self.statusBar().showMessage(f"正在记录: {recorder.filename}")
+        else:
+            self.statusBar().showMessage("未记录")
+
 
-    def show_parsed_dock(self, hex_str, protocol, index, source):
+    def show_parsed_dock(self, frame, protocol, index, source):
         parser = DockParser(protocol, index, self)
         dock = QDockWidget(f"{source.upper()} 解析", self)
         dock.setWidget(parser)
@@ -97,7 +137,7 @@ class BusDataMonitorForm(QMainWindow):
                          QDockWidget.DockWidgetClosable | 
                          QDockWidget.DockWidgetFloatable)
         self.addDockWidget(Qt.BottomDockWidgetArea, dock)
-        parser.update_data(hex_str)
+        parser.update_data(frame)
         dock.show()
 
 
@@ -130,6 +170,8 @@ class BusDataMonitorForm(QMainWindow):
 
 
     def closeEvent(self, e: QCloseEvent):
+        if self.dock_plot is not None:
+            self.dock_plot.widget().close()  # 先停止曲线线程再停止通道
         self.manager.stop_all()
         super().closeEvent(e)
 
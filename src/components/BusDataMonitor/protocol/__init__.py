@@ -1,36 +1,135 @@
 import json
+import hashlib
+import os
+import threading
+import time
 from pathlib import Path
 
+from src.components.BusDataMonitor.monitor.busdata_parser import BusDataParser, COMPILED_SUFFIX
+
 PROTOCOL_PATH = Path(__file__).parent
 
 
-class ProtocolLoader:
-    def __init__(self):
-        self.directory_path = PROTOCOL_PATH
-        self._cache = {}  # 已加载的协议
-        if not PROTOCOL_PATH.exists() or not PROTOCOL_PATH.is_dir():
-            raise FileNotFoundError(f"Directory not found: {PROTOCOL_PATH}")
+class _ProtocolEntry:
+    __slots__ = ("signature", "digest", "protocol", "parser", "checked")
 
-    def get(self, name: str):
-        """按协议名（不含扩展名）获取 JSON 数据"""
-        if name in self._cache:
-            return self._cache[name]
+    def __init__(self, signature, digest, protocol):
+        self.signature = signature  # (mtime_ns, size)
+        self.digest = digest        # 文件内容 sha1
+        self.protocol = protocol
+        self.parser = None          # 首次请求时编译
+        self.checked = time.monotonic()
 
-        file_path = self.directory_path / f"{name}.json"
-        if not file_path.exists():
-            raise FileNotFoundError(f"Protocol file not found: {file_path}")
 
+class ProtocolRegistry:
+    """
+    进程级协议注册表
+
+    每个协议 JSON 只读取、编译一次，按文件 mtime/大小与内容哈希判断是否需要重新加载，
+    excel2json 重新生成协议后自动生效。返回的协议字典与解析器在进程内共享，调用方不得修改。
+    协议 JSON 旁存在内容哈希一致的预编译文件（COMPILED_SUFFIX）时，解析器直接由其加载。
+    """
+    def __init__(self, directory=PROTOCOL_PATH, check_interval=0.5):
+        """
+        :param check_interval: 同一协议两次检查文件是否变化的最小间隔(s)，为 0 时每次都检查
+        """
+        self.directory_path = Path(directory)
+        self.check_interval = check_interval
+        self._entries = {}  # name -> _ProtocolEntry
+        self._lock = threading.RLock()
+        if not self.directory_path.exists() or not self.directory_path.is_dir():
+            raise FileNotFoundError(f"Directory not found: {self.directory_path}")
+
+    def _path(self, name):
+        return self.directory_path / f"{name}.json"
+
+    def compiled_path(self, name):
+        return self.directory_path / f"{name}{COMPILED_SUFFIX}"
+
+    def _load(self, name, file_path, signature, old=None):
         try:
-            with file_path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-                self._cache[name] = data
-                return data
-        except json.JSONDecodeError as e:
+            content = file_path.read_bytes()
+        except OSError:
+            raise FileNotFoundError(f"Protocol file not found: {file_path}")
+        digest = hashlib.sha1(content).hexdigest()
+        if old is not None and old.digest == digest:
+            # 仅时间戳变化，沿用已编译的解析器
+            old.signature = signature
+            old.checked = time.monotonic()
+            return old
+        try:
+            protocol = json.loads(content.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
             raise ValueError(f"Invalid JSON in {file_path}: {e}")
+        entry = _ProtocolEntry(signature, digest, protocol)
+        self._entries[name] = entry
+        return entry
+
+    def _entry(self, name) -> _ProtocolEntry:
+        entry = self._entries.get(name)
+        if entry is not None and time.monotonic() - entry.checked < self.check_interval:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(name)
+            file_path = self._path(name)
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                self._entries.pop(name, None)
+                raise FileNotFoundError(f"Protocol file not found: {file_path}")
+            signature = (st.st_mtime_ns, st.st_size)
+            if entry is not None and entry.signature == signature:
+                entry.checked = time.monotonic()
+                return entry
+            return self._load(name, file_path, signature, entry)
+
+    def get(self, name: str) -> dict:
+        """按协议名（不含扩展名）获取协议字典"""
+        return self._entry(name).protocol
+
+    def parser(self, name: str) -> BusDataParser:
+        """按协议名获取已编译的 BusDataParser"""
+        entry = self._entry(name)
+        parser = entry.parser
+        if parser is None:
+            with self._lock:
+                if entry.parser is None:
+                    fields = BusDataParser.load_compiled(self.compiled_path(name), entry.digest)
+                    entry.parser = BusDataParser(entry.protocol, fields)
+                parser = entry.parser
+        return parser
+
+    def invalidate(self, name=None):
+        """丢弃缓存（name 为 None 时清空全部），下次访问重新加载"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
 
     def list_protocols(self):
         """列出目录下所有可用的协议文件名（不含扩展名）"""
         return [p.stem for p in self.directory_path.glob("*.json")]
 
 
+protocol_registry = ProtocolRegistry()
+
+
+class ProtocolLoader:
+    """协议加载器，所有实例共享进程级的 protocol_registry"""
+    def __init__(self):
+        self.registry = protocol_registry
+        self.directory_path = protocol_registry.directory_path
 
+    def get(self, name: str):
+        """按协议名（不含扩展名）获取 JSON 数据"""
+        return self.registry.get(name)
+
+    def parser(self, name: str):
+        """按协议名获取已编译的 BusDataParser"""
+        return self.registry.parser(name)
+
+    def list_protocols(self):
+        """列出目录下所有可用的协议文件名（不含扩展名）"""
+        return self.registry.list_protocols()
@@ -0,0 +1,112 @@
+"""
+SessionQuery 检索结果测试：与逐帧暴力求值的结果比较，覆盖有符号与定点等不建立取值位图的字段
+
+运行：python -m src.components.BusDataMonitor.test_hdf_query
+"""
+import os
+import sys
+import tempfile
+
+import h5py
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+from src.components.BusDataMonitor.hdf_query import SessionQuery, Field, INDEX_SUFFIX
+
+CHANNEL = "0/Rx"
+PROTOCOL = {
+    "fields": [
+        {"name": "计数", "type": "uint", "byte_offset": 0, "bit_length": 8},
+        {"name": "温度", "type": "int", "byte_offset": 1, "bit_length": 8},
+        {"name": "电压", "type": "fixed", "byte_offset": 2, "bit_length": 8, "scale": 10, "offset": 0},
+        {"name": "状态", "type": "enum", "byte_offset": 3, "bit_offset": 4, "bit_length": 4, "values": {"0": "待机", "3": "工作"}},
+    ]
+}
+
+
+def _check(raw, where, expected_mask, chunk_rows=256):
+    """把原始帧写成会话文件，检索结果须与 expected_mask 一致"""
+    fd, path = tempfile.mkstemp(suffix=".h5")
+    os.close(fd)
+    try:
+        with h5py.File(path, "w") as f:
+            grp = f.require_group(f"/data/{CHANNEL}")
+            grp.create_dataset("raw", data=raw)
+            grp.create_dataset("timestamp", data=np.arange(len(raw), dtype="f8") * 1e-3)
+        with SessionQuery(path, protocols={CHANNEL: PROTOCOL}, chunk_rows=chunk_rows, persist_index=False) as q:
+            # 第二次检索使用首次建立的列索引
+            for _ in range(2):
+                hits = q.select(CHANNEL, where=where)["index"]
+                assert np.array_equal(hits, np.flatnonzero(expected_mask)), \
+                    f"命中 {len(hits)} 帧，期望 {int(expected_mask.sum())} 帧"
+    finally:
+        os.remove(path)
+
+
+def _raw(rows=5000, seed=1):
+    """随机帧：计数、温度、电压各 1 字节，状态为低 4 位"""
+    rng = np.random.default_rng(seed)
+    raw = rng.integers(0, 256, size=(rows, 4), dtype=np.uint8)
+    raw[:, 3] &= 0x0F
+    return raw
+
+
+def test_signed_field():
+    raw = _raw()
+    temp = raw[:, 1].view(np.int8).astype(np.int64)
+    _check(raw, Field("温度") < -100, temp < -100)
+    _check(raw, Field("温度") == -5, temp == -5)
+    _check(raw, Field("温度").isin([-128, 0, 127]), np.isin(temp, [-128, 0, 127]))
+
+
+def test_scaled_field():
+    raw = _raw()
+    volt = raw[:, 2].astype(np.float64) * 10
+    _check(raw, Field("电压") > 2000, volt > 2000)
+    _check(raw, Field("电压") == 300, volt == 300)
+    _check(raw, Field("电压").between(1000, 1500), (volt >= 1000) & (volt <= 1500))
+
+
+def test_bitmap_fields():
+    raw = _raw()
+    count, state = raw[:, 0], raw[:, 3]
+    _check(raw, Field("计数") == 7, count == 7)
+    _check(raw, (Field("状态") == "工作") & (Field("温度") < 0),
+           (state == 3) & (raw[:, 1].view(np.int8) < 0))
+
+
+def test_protocol_change():
+    """协议修改字段定义后，索引文件中按旧定义建立的索引不能再用于排除块"""
+    raw = _raw()
+    raw[:, 0] = 0  # 按原定义"计数"恒为 0，各块索引的最大值为 0
+    moved = {"fields": [dict(f, byte_offset=2) if f["name"] == "计数" else f for f in PROTOCOL["fields"]]}
+    fd, path = tempfile.mkstemp(suffix=".h5")
+    os.close(fd)
+    try:
+        with h5py.File(path, "w") as f:
+            grp = f.require_group(f"/data/{CHANNEL}")
+            grp.create_dataset("raw", data=raw)
+            grp.create_dataset("timestamp", data=np.arange(len(raw), dtype="f8") * 1e-3)
+        with SessionQuery(path, protocols={CHANNEL: PROTOCOL}, chunk_rows=256) as q:
+            assert len(q.select(CHANNEL, where=Field("计数") > 100)["index"]) == 0
+        with SessionQuery(path, protocols={CHANNEL: moved}, chunk_rows=256) as q:
+            hits = q.select(CHANNEL, where=Field("计数") > 100)["index"]
+        expected = np.flatnonzero(raw[:, 2] > 100)
+        assert np.array_equal(hits, expected), f"命中 {len(hits)} 帧，期望 {len(expected)} 帧"
+    finally:
+        os.remove(path)
+        if os.path.exists(path + INDEX_SUFFIX):
+            os.remove(path + INDEX_SUFFIX)
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in list(globals().items()) if k.startswith("test_") and callable(v)]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
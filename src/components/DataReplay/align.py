@@ -0,0 +1,242 @@
+'''
+多文件时间对齐
+=============
+
+把来自不同文件（采样率、起止时刻、长度各不相同）的数据列放到同一条真实时间轴上，x 为相对于所选文件中最早时刻的秒数：
+
+- ALIGN_ASOF：以第一个选中文件的时间戳为基准，其他文件取时刻最近的采样点；
+  距离超过该文件一个采样周期（中位数）的点记为 NaN，不跨越数据缺口
+- ALIGN_RESAMPLE：按所选文件中最高的采样率生成统一时间网格，各列线性插值；网格点所在的采样间隔超过
+  GAP_FACTOR 个采样周期时记为 NaN
+- ALIGN_RAW：各文件使用自己的原始时间轴，不做任何插值
+
+全部为有序数组上的二分查找与向量化运算。各文件的时间轴（有效、升序的纳秒时间戳）、各数据列的包络
+以及每次选择的对齐结果均有缓存，重复绘制同一选择时直接复用。
+'''
+
+from collections import OrderedDict
+
+import numpy as np
+
+from src.components.DataReplay.lod import ColumnPyramid
+
+ALIGN_ASOF = "asof"
+ALIGN_RESAMPLE = "resample"
+ALIGN_RAW = "raw"
+ALIGN_MODES = {
+    ALIGN_ASOF: "最近时刻对齐",
+    ALIGN_RESAMPLE: "重采样到统一速率",
+    ALIGN_RAW: "各文件原始时间轴",
+}
+
+GAP_FACTOR = 5  # 重采样时超过该倍数采样周期的间隔视为数据缺口
+RESAMPLE_MAX_POINTS = 20000000  # 重采样网格的最大点数，超过时降低速率
+INTERVAL_SAMPLES = 100000  # 估计采样周期时最多使用的间隔个数
+
+
+class TimeAxis:
+    """单个文件的时间轴：去除无效时间戳并按时间排序（已有序时不拷贝数据）"""
+    def __init__(self, store):
+        t = store.timestamps().view(np.int64)
+        diffs = np.diff(t)
+        # NaT 为 int64 最小值，出现时必然破坏单调性
+        if len(t) and t[0] != np.iinfo(np.int64).min and (diffs >= 0).all():
+            self.order = None
+            self.t = t
+        else:
+            self.order = np.flatnonzero(t != np.iinfo(np.int64).min)
+            self.order = self.order[np.argsort(t[self.order], kind="stable")]
+            self.t = t[self.order]
+            diffs = np.diff(self.t)
+        # 采样周期取间隔的中位数（纳秒），数据很长时按等间距抽样估计
+        diffs = diffs[::max(len(diffs) // INTERVAL_SAMPLES, 1)]
+        diffs = diffs[diffs > 0]
+        self.interval = int(np.median(diffs)) if len(diffs) else 0
+
+    def __len__(self):
+        return len(self.t)
+
+    def take(self, y):
+        """按时间轴的顺序取数据列"""
+        return y if self.order is None else y[self.order]
+
+
+class AlignedCurves:
+    """
+    一次对齐的结果
+
+    curves 与选择一一对应，每项为 (x, y, 包络)，x 为相对 origin（datetime64[ns]）的秒数（float64，单调递增）。
+    """
+    def __init__(self, origin, curves, interval):
+        self.origin = origin
+        self.curves = curves
+        self.interval = interval  # 最小的采样周期（秒），重采样时为网格间隔
+
+    def x_bounds(self):
+        """所有曲线 x 的 (最小值, 最大值)；没有数据时为 None"""
+        lows = [x[0] for x, _, _ in self.curves if len(x)]
+        highs = [x[-1] for x, _, _ in self.curves if len(x)]
+        if not lows:
+            return None
+        return float(min(lows)), float(max(highs))
+
+
+class TimeAligner:
+    """多文件时间对齐引擎，带缓存"""
+    def __init__(self, cache_size=4):
+        """
+        :param cache_size: 保留的对齐结果个数（按最近使用淘汰）
+        """
+        self.cache_size = cache_size
+        self._axes = {}      # 文件名 -> TimeAxis
+        self._pyramids = {}  # (文件名, 列名) -> 按时间轴顺序的数据列的 ColumnPyramid
+        self._x = {}         # (文件名, 起点) -> 时间轴相对起点的秒数，各结果共用
+        self._results = OrderedDict()  # (模式, ((文件名, 列名), ...)) -> AlignedCurves
+
+    def axis(self, filename, store):
+        if filename not in self._axes:
+            self._axes[filename] = TimeAxis(store)
+        return self._axes[filename]
+
+    def column(self, filename, col, store):
+        """按时间轴顺序的数据列及其包络（按列缓存）"""
+        key = (filename, col)
+        if key not in self._pyramids:
+            y = self.axis(filename, store).take(store.column(col))
+            self._pyramids[key] = ColumnPyramid(y)
+        pyramid = self._pyramids[key]
+        return pyramid.y, pyramid
+
+    def drop_file(self, filename):
+        """文件被移除时清除相关缓存"""
+        self._axes.pop(filename, None)
+        self._x = {k: v for k, v in self._x.items() if k[0] != filename}
+        self._pyramids = {k: v for k, v in self._pyramids.items() if k[0] != filename}
+        for key in [k for k in self._results if any(f == filename for f, _ in k[1])]:
+            del self._results[key]
+
+    def clear(self):
+        self._axes.clear()
+        self._x.clear()
+        self._pyramids.clear()
+        self._results.clear()
+
+    def align(self, selections, mode=ALIGN_ASOF):
+        """
+        对齐选中的数据列
+
+        :param selections: [(文件名, 列名, 数据源)]，第一个文件为 ALIGN_ASOF 的基准
+        :param mode: ALIGN_ASOF / ALIGN_RESAMPLE / ALIGN_RAW
+        :return: AlignedCurves
+        """
+        if mode not in ALIGN_MODES:
+            raise ValueError(f"未知的对齐方式: {mode}")
+        key = (mode, tuple((filename, col) for filename, col, _ in selections))
+        if key in self._results:
+            self._results.move_to_end(key)
+            return self._results[key]
+
+        axes = {filename: self.axis(filename, store) for filename, _, store in selections}
+        starts = [axis.t[0] for axis in axes.values() if len(axis)]
+        origin = min(starts) if starts else 0
+        intervals = [axis.interval for axis in axes.values() if axis.interval]
+        interval = min(intervals) if intervals else 0
+
+        if mode == ALIGN_RAW:
+            result = self._align_raw(selections, axes, origin, interval)
+        elif mode == ALIGN_ASOF:
+            result = self._align_asof(selections, axes, origin, interval)
+        else:
+            result = self._align_resample(selections, axes, origin, interval)
+
+        self._results[key] = result
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _seconds(t, origin):
+        return (t - origin) / 1e9
+
+    def _file_x(self, filename, axis, origin):
+        key = (filename, int(origin))
+        if key not in self._x:
+            self._x[key] = self._seconds(axis.t, origin)
+        return self._x[key]
+
+    def _align_raw(self, selections, axes, origin, interval):
+        curves = []
+        for filename, col, store in selections:
+            y, pyramid = self.column(filename, col, store)
+            curves.append((self._file_x(filename, axes[filename], origin), y, pyramid))
+        return AlignedCurves(_datetime(origin), curves, interval / 1e9)
+
+    def _align_asof(self, selections, axes, origin, interval):
+        ref_name = selections[0][0]
+        ref = axes[ref_name].t
+        x = self._file_x(ref_name, axes[ref_name], origin)
+        nearest = {}  # 文件名 -> (最近点下标, 超出容差的掩码)
+        curves = []
+        for filename, col, store in selections:
+            if filename == ref_name:
+                y, pyramid = self.column(filename, col, store)
+                curves.append((x, y, pyramid))
+                continue
+            axis = axes[filename]
+            if filename not in nearest:
+                nearest[filename] = _nearest(axis.t, ref, axis.interval)
+            idx, miss = nearest[filename]
+            y = axis.take(store.column(col))[idx] if len(axis) else np.full(len(ref), np.nan)
+            y[miss] = np.nan
+            curves.append((x, y, ColumnPyramid(y)))
+        return AlignedCurves(_datetime(origin), curves, interval / 1e9)
+
+    def _align_resample(self, selections, axes, origin, interval):
+        ends = [axis.t[-1] for axis in axes.values() if len(axis)]
+        if not ends or not interval:
+            return self._align_raw(selections, axes, origin, interval)
+        span = max(ends) - origin
+        step = max(interval, -(-span // (RESAMPLE_MAX_POINTS - 1)))
+        grid = origin + np.arange(span // step + 1, dtype=np.int64) * step
+        x = self._seconds(grid, origin)
+        positions = {}  # 文件名 -> (源时间轴的秒数, 缺口掩码)
+        curves = []
+        for filename, col, store in selections:
+            axis = axes[filename]
+            if filename not in positions:
+                positions[filename] = (self._seconds(axis.t, origin), _gaps(axis.t, grid, axis.interval * GAP_FACTOR))
+            xp, gap = positions[filename]
+            y = np.interp(x, xp, axis.take(store.column(col)), left=np.nan, right=np.nan) if len(xp) \
+                else np.full(len(x), np.nan)
+            y[gap] = np.nan
+            curves.append((x, y, ColumnPyramid(y)))
+        return AlignedCurves(_datetime(origin), curves, step / 1e9)
+
+
+def _datetime(ns):
+    return np.datetime64(int(ns), "ns")
+
+
+def _nearest(t, query, tolerance):
+    """
+    对有序的 query 中每个时刻在有序数组 t 中找最近的点（距离相等时取前一个）
+
+    两个数组都有序，只需对 t 中相邻两点的中点在 query 中二分查找，得到每个点"管辖"的 query 区间，
+    再展开为逐个 query 的下标；二分查找次数为 len(t)，通常远少于 len(query)。
+    :return: (下标数组, 距离超过 tolerance 或 t 为空的掩码)
+    """
+    if not len(t):
+        return np.zeros(len(query), dtype=np.intp), np.ones(len(query), dtype=bool)
+    mid = t[:-1] + np.diff(t) // 2
+    bounds = np.searchsorted(query, mid, side="right")
+    idx = np.repeat(np.arange(len(t)), np.diff(bounds, prepend=0, append=len(query)))
+    miss = np.abs(t[idx] - query) > tolerance
+    return idx, miss
+
+
+def _gaps(t, query, max_gap):
+    """query 中落在 t 的超长间隔（大于 max_gap）内的点"""
+    if len(t) < 2 or not max_gap:
+        return np.zeros(len(query), dtype=bool)
+    right = np.searchsorted(t, query, side="right").clip(1, len(t) - 1)
+    return (t[right] - t[right - 1]) > max_gap
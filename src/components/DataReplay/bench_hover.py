@@ -0,0 +1,92 @@
+"""
+功能描述：DataReplay 悬停命中检测性能基准
+
+10 列数据、不同行数下，对比原实现（逐点 mapViewToScene 计算像素距离）与 CurveHitTester
+（x 二分查找 + 阈值窗口内向量化计算）单次鼠标移动的耗时（毫秒），以及传入 ColumnPyramid 后
+阈值窗口内点数较多时改用包络检测的耗时。
+分别测量显示全部数据与显示 1000 个点两种缩放状态；原实现只测量 1 万行以内。
+
+运行：python -m src.components.DataReplay.bench_hover
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+import pyqtgraph as pg
+from PyQt5.QtCore import QPointF
+from PyQt5.QtWidgets import QApplication
+from src.components.DataReplay.hit_test import CurveHitTester
+from src.components.DataReplay.lod import ColumnPyramid
+
+COLUMNS = 10
+
+
+def _timeit(func, budget=0.5):
+    """重复执行直到耗时超过 budget 秒，返回单次平均耗时"""
+    count = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget:
+            return elapsed / count
+
+
+def legacy_hit(vb, curves, scene_pos, pixel_threshold=20):
+    """原实现：遍历所有曲线的所有点"""
+    mouse_pixel_pos = scene_pos.toPoint()
+    closest = None
+    closest_dist = float('inf')
+    for c, (x_data, y_data) in enumerate(curves):
+        for i in range(len(x_data)):
+            pt_pixel = vb.mapViewToScene(QPointF(x_data[i], y_data[i])).toPoint()
+            dist = (pt_pixel - mouse_pixel_pos).manhattanLength()
+            if dist < pixel_threshold and dist < closest_dist:
+                closest_dist = dist
+                closest = (c, i)
+    return closest
+
+
+def bench(row_counts=(1000, 10000, 100000, 1000000, 10000000), legacy_limit=10000):
+    widget = pg.PlotWidget()
+    widget.resize(1200, 600)
+    widget.show()
+    vb = widget.getViewBox()
+    print(f"{'行数':>10}{'可见点数':>10}{'原实现(ms)':>14}{'CurveHitTester(ms)':>22}{'包络检测(ms)':>16}")
+    for rows in row_counts:
+        x = np.arange(rows)
+        curves = [(x, np.sin(x * 0.01) + 3 * c) for c in range(COLUMNS)]  # 各曲线互不重叠
+        tester = CurveHitTester(curves)
+        envelope_tester = CurveHitTester(curves, [ColumnPyramid(y) for _, y in curves])
+        for visible in (rows, 1000):
+            center = rows // 2
+            vb.setRange(xRange=(center - visible / 2, center + visible / 2), yRange=(-1, 3 * COLUMNS), padding=0)
+            QApplication.processEvents()
+            # 鼠标放在中间一条曲线的点上
+            target = QPointF(center, curves[COLUMNS // 2][1][center])
+            scene_pos = vb.mapViewToScene(target)
+
+            def hit(tester=tester):
+                view_pos = vb.mapSceneToView(scene_pos)
+                return tester.hit(view_pos.x(), view_pos.y(), vb.viewPixelSize())
+
+            assert hit()[0] == COLUMNS // 2
+            assert hit(envelope_tester)[0] == COLUMNS // 2
+            t_new = _timeit(hit)
+            t_envelope = _timeit(lambda: hit(envelope_tester))
+            if rows <= legacy_limit:
+                t_old = f"{_timeit(lambda: legacy_hit(vb, curves, scene_pos), budget=1.0) * 1e3:.1f}"
+            else:
+                t_old = "-"
+            print(f"{rows:>10}{min(visible, rows):>10}{t_old:>14}{t_new * 1e3:>22.3f}{t_envelope * 1e3:>16.3f}")
+    widget.close()
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    bench()
@@ -0,0 +1,77 @@
+"""
+功能描述：DataReplay 文件加载性能基准
+
+生成 COLUMNS 列、不同行数的 CSV，对比原实现（pd.read_csv 两行表头整表读入）与 CsvColumnStore
+首次打开（分块解析并写出列缓存）、再次打开（只读表头并校验缓存）以及读取 1 列的耗时（秒）。
+
+运行：python -m src.components.DataReplay.bench_loader
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+from src.components.DataReplay.column_store import CsvColumnStore, CACHE_SUFFIX
+
+COLUMNS = 12
+
+
+def _timeit(func, budget=0.5):
+    """重复执行直到耗时超过 budget 秒，返回单次平均耗时"""
+    count = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget:
+            return elapsed / count
+
+
+def write_csv(path, rows):
+    """写出与 RTDataPlot 记录格式相同的 CSV（第 1 行列名、第 2 行单位）"""
+    times = pd.date_range("2025-07-16 09:00:00", periods=rows, freq="ms").strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
+    df = pd.DataFrame({f"数据{i + 1}": np.random.rand(rows).round(4) for i in range(COLUMNS)})
+    df.insert(0, "时间戳", times)
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        f.write(",".join(df.columns) + "\n")
+        f.write(",".join(["ms"] + ["V"] * COLUMNS) + "\n")
+    df.to_csv(path, mode="a", header=False, index=False, encoding="utf-8")
+
+
+def legacy_load(path):
+    """原实现"""
+    df = pd.read_csv(path, header=[0, 1])
+    df.index = pd.to_datetime(df[df.columns[0]])
+    df.drop(columns=[df.columns[0]], inplace=True)
+    return df
+
+
+def bench(row_counts=(10000, 100000, 1000000)):
+    tmp = tempfile.mkdtemp()
+    print(f"{'行数':>10}{'原实现(s)':>12}{'首次打开(s)':>14}{'再次打开(s)':>14}{'读取1列(s)':>12}")
+    try:
+        for rows in row_counts:
+            path = os.path.join(tmp, f"bench_{rows}.csv")
+            write_csv(path, rows)
+            t_old = _timeit(lambda: legacy_load(path), budget=1.0)
+
+            def first_open():
+                shutil.rmtree(path + CACHE_SUFFIX, ignore_errors=True)
+                return CsvColumnStore(path)
+
+            t_first = _timeit(first_open, budget=1.0)
+            t_reopen = _timeit(lambda: CsvColumnStore(path))
+            t_column = _timeit(lambda: np.nanmax(CsvColumnStore(path).column("数据1")))
+            print(f"{rows:>10}{t_old:>12.3f}{t_first:>14.3f}{t_reopen:>14.5f}{t_column:>12.5f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,79 @@
+"""
+功能描述：DataReplay 滚动重绘性能基准
+
+单条曲线、不同行数下，显示 10% 数据（与 draw_plot 的初始窗口相同）并移动一次滑动条，对比原实现
+（全部数据交给 PlotDataItem，由 pyqtgraph 按可见范围绘制）与 ColumnPyramid（按可见范围抽取包络后 setData）
+每次滚动的耗时（毫秒，含重绘到离屏图像）。同时给出包络的计算耗时。原实现只测量 1000 万行以内。
+
+运行：python -m src.components.DataReplay.bench_render
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+import pyqtgraph as pg
+from PyQt5.QtWidgets import QApplication
+from src.components.DataReplay.lod import ColumnPyramid
+
+
+def _timeit(func, budget=0.5):
+    """重复执行直到耗时超过 budget 秒，返回单次平均耗时"""
+    count = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget:
+            return elapsed / count
+
+
+def bench(row_counts=(100000, 1000000, 10000000, 100000000), legacy_limit=10000000):
+    widget = pg.PlotWidget()
+    widget.resize(1200, 600)
+    widget.show()
+    vb = widget.getViewBox()
+    print(f"{'行数':>12}{'包络计算(ms)':>14}{'原实现(ms)':>12}{'ColumnPyramid(ms)':>20}")
+    for rows in row_counts:
+        x = np.arange(rows, dtype=np.float64)
+        y = np.sin(x * 1e-3) + np.random.rand(rows) * 0.1
+        window = rows // 10
+        state = {"start": 0}
+
+        def step():
+            # 每次向右滚动 1% 的数据，到末尾后回到开头
+            state["start"] = (state["start"] + rows // 100) % (rows - window)
+            vb.setXRange(state["start"], state["start"] + window, padding=0)
+
+        curve = widget.plot(pen='b')
+        if rows <= legacy_limit:
+            curve.setData(x, y)
+            # 原实现：整条曲线交给 pyqtgraph，每次重绘都处理全部数据
+            t_old = f"{_timeit(lambda: (step(), widget.grab()), budget=1.0) * 1e3:.1f}"
+        else:
+            t_old = "-"
+
+        start = time.perf_counter()
+        pyramid = ColumnPyramid(y)
+        t_build = time.perf_counter() - start
+
+        def render():
+            step()
+            x0, x1 = vb.viewRange()[0]
+            curve.setData(*pyramid.render(x, x0, x1, int(vb.width())))
+            widget.grab()
+
+        t_new = _timeit(render, budget=1.0)
+        print(f"{rows:>12}{t_build * 1e3:>14.1f}{t_old:>12}{t_new * 1e3:>20.2f}")
+        widget.removeItem(curve)
+        del x, y, pyramid
+    widget.close()
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    bench()
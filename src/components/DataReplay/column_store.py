@@ -0,0 +1,242 @@
+'''
+列式数据源
+=========
+
+回放文件按列按需读取，内存占用只与实际绘制的列有关：
+
+- CSV：首次打开时分块解析一次，每列转换为一个 .npy 文件（时间戳为 Unix 纳秒 int64，数据为 float64），
+  缓存在同目录的 "<文件名>.cols" 目录中（目录不可写时放在系统临时目录）；之后打开只读取两行表头并校验缓存，
+  各列以 memmap 方式按需映射
+- HDF5 记录文件（RTDataPlot.data_recorder 写出的 .h5）：直接按列读取数据集
+
+打开时可传入 progress(已处理行数, 总行数) 回调与 cancel（threading.Event），供后台加载显示进度和中途取消；
+CSV 每解析完一个分块报告一次进度并检查取消，取消时抛出 LoadCancelled。
+'''
+
+import csv
+import json
+import hashlib
+import tempfile
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pandas as pd
+
+from src.components.RTDataPlot.data_recorder import to_local_datetime
+
+CACHE_SUFFIX = ".cols"
+CACHE_VERSION = 1
+CHUNK_ROWS = 200000  # CSV 分块解析的行数
+_LINE_SCAN_BYTES = 1 << 24
+
+
+class LoadCancelled(Exception):
+    """加载被取消"""
+
+
+def _count_lines(path):
+    """统计文件行数（按换行符计数，末行无换行符时加一）"""
+    count = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_LINE_SCAN_BYTES)
+            if not block:
+                break
+            count += block.count(b"\n")
+            last = block[-1:]
+    return count + (last != b"\n")
+
+
+def _parse_time(values):
+    """解析时间戳列，优先按 ISO8601（RTDataPlot 写出的格式），其他格式回退为逐个推断，无法解析的为 NaT"""
+    try:
+        return pd.to_datetime(values, format="ISO8601")
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, errors="coerce")
+
+
+def read_header(path):
+    """读取 CSV 的两行表头，返回 (列名列表, 单位列表)，不含首列时间戳"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        names = next(reader, [])
+        units = next(reader, [])
+    units = units + [""] * (len(names) - len(units))
+    return names[1:], units[1:len(names)]
+
+
+class CsvColumnStore:
+    """CSV 文件的列式缓存"""
+    def __init__(self, path, progress=None, cancel=None):
+        self.path = Path(path)
+        self.names, self.units = read_header(self.path)
+        self.cache_dir = self._cache_dir()
+        self._columns = {}  # 列序号 -> memmap
+        self._index = None
+        meta = self._load_meta()
+        if meta is None:
+            meta = self._build(progress, cancel)
+        self.rows = meta["rows"]
+        if progress is not None:
+            progress(self.rows, self.rows)
+
+    @property
+    def columns(self):
+        """[(列名, 单位)]"""
+        return list(zip(self.names, self.units))
+
+    def __len__(self):
+        return self.rows
+
+    # ---------------- 缓存 ----------------
+
+    def _source_info(self):
+        stat = self.path.stat()
+        return {"version": CACHE_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                "names": self.names, "units": self.units}
+
+    def _cache_dir(self):
+        cache_dir = self.path.with_name(self.path.name + CACHE_SUFFIX)
+        try:
+            cache_dir.mkdir(exist_ok=True)
+            return cache_dir
+        except OSError:
+            digest = hashlib.sha1(str(self.path.resolve()).encode("utf-8")).hexdigest()
+            cache_dir = Path(tempfile.gettempdir()) / "DataReplay" / digest
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            return cache_dir
+
+    def _load_meta(self):
+        """缓存与源文件一致时返回 meta，否则返回 None"""
+        try:
+            meta = json.loads((self.cache_dir / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if {k: meta.get(k) for k in self._source_info()} != self._source_info():
+            return None
+        return meta
+
+    def _build(self, progress=None, cancel=None):
+        """分块解析 CSV，逐列写入 .npy；meta.json 最后写出，中断时缓存视为无效"""
+        (self.cache_dir / "meta.json").unlink(missing_ok=True)
+        capacity = max(_count_lines(self.path) - 2, 0)  # 行数上限（可能含空行），真实行数记录在 meta 中
+        n_cols = len(self.names)
+        time_file = np.lib.format.open_memmap(self.cache_dir / "time.npy", mode="w+", dtype=np.int64,
+                                              shape=(capacity,))
+        col_files = [np.lib.format.open_memmap(self.cache_dir / f"c{i}.npy", mode="w+", dtype=np.float64,
+                                               shape=(capacity,)) for i in range(n_cols)]
+        rows = 0
+        # 数据列交给 C 解析器直接转为数值，只有混入非数值文本的分块才逐列转换
+        reader = pd.read_csv(self.path, header=None, skiprows=2, chunksize=CHUNK_ROWS,
+                             encoding="utf-8-sig", dtype={0: str}, usecols=range(n_cols + 1))
+        for chunk in reader:
+            n = len(chunk)
+            end = rows + n
+            time_file[rows:end] = _parse_time(chunk[0]).to_numpy("datetime64[ns]").view(np.int64)
+            for i in range(n_cols):
+                values = chunk[i + 1]
+                if not pd.api.types.is_numeric_dtype(values):
+                    values = pd.to_numeric(values, errors="coerce")
+                col_files[i][rows:end] = values.to_numpy(np.float64, na_value=np.nan)
+            rows = end
+            if cancel is not None and cancel.is_set():
+                raise LoadCancelled(str(self.path))
+            if progress is not None:
+                progress(rows, capacity)
+        for f in [time_file] + col_files:
+            f.flush()
+        del time_file, col_files
+
+        meta = dict(self._source_info(), rows=rows)
+        (self.cache_dir / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        return meta
+
+    # ---------------- 按需读取 ----------------
+
+    def _column(self, name):
+        return np.load(self.cache_dir / name, mmap_mode="r")[:self.rows]
+
+    def column(self, name):
+        """按列名取数据（float64 memmap，只读），同名列取第一个"""
+        i = self.names.index(name)
+        if i not in self._columns:
+            self._columns[i] = self._column(f"c{i}.npy")
+        return self._columns[i]
+
+    def timestamps(self):
+        """采集时刻（datetime64[ns] memmap）"""
+        return self._column("time.npy").view("datetime64[ns]")
+
+    def index(self):
+        if self._index is None:
+            self._index = pd.DatetimeIndex(self.timestamps())
+        return self._index
+
+    def series(self, name):
+        """按列名取带时间戳索引的 Series"""
+        return pd.Series(self.column(name), index=self.index(), name=name, copy=False)
+
+
+class RecordColumnStore:
+    """RTDataPlot HDF5 记录文件（布局见 RTDataPlot.data_recorder）"""
+    def __init__(self, path, progress=None, cancel=None):
+        self.path = Path(path)
+        self._keys = []
+        self.names, self.units = [], []
+        with h5py.File(self.path, "r") as f:
+            self.rows = f["timestamp"].shape[0]
+            for key in f.attrs["columns"]:
+                dset = f[f"columns/{key}"]
+                # 异常退出时各数据集长度可能不一致，按最短的对齐
+                self.rows = min(self.rows, dset.shape[0])
+                self._keys.append(key)
+                self.names.append(dset.attrs["name"])
+                self.units.append(dset.attrs["unit"])
+        self._columns = {}
+        self._index = None
+        if progress is not None:
+            progress(self.rows, self.rows)
+
+    @property
+    def columns(self):
+        return list(zip(self.names, self.units))
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name):
+        i = self.names.index(name)
+        if i not in self._columns:
+            with h5py.File(self.path, "r") as f:
+                self._columns[i] = f[f"columns/{self._keys[i]}"][:self.rows]
+        return self._columns[i]
+
+    def timestamps(self):
+        """采集时刻（本地时间，datetime64[ns]）"""
+        with h5py.File(self.path, "r") as f:
+            return to_local_datetime(f["timestamp"][:self.rows])
+
+    def index(self):
+        if self._index is None:
+            self._index = pd.DatetimeIndex(self.timestamps())
+        return self._index
+
+    def series(self, name):
+        return pd.Series(self.column(name), index=self.index(), name=name, copy=False)
+
+
+def read_columns(path):
+    """只读取表头，返回 [(列名, 单位)]，供加载完成前预览文件结构"""
+    if str(path).lower().endswith(".h5"):
+        with h5py.File(path, "r") as f:
+            return [(f[f"columns/{key}"].attrs["name"], f[f"columns/{key}"].attrs["unit"]) for key in f.attrs["columns"]]
+    return list(zip(*read_header(path)))
+
+
+def open_store(path, progress=None, cancel=None):
+    """按扩展名打开回放文件"""
+    if str(path).lower().endswith(".h5"):
+        return RecordColumnStore(path, progress, cancel)
+    return CsvColumnStore(path, progress, cancel)
@@ -10,6 +10,9 @@
 - 通过鼠标悬停实时检查数据点
 - 使用滑动条控件进行基于时间的数据导航
 - 支持多文件和多列数据选择
+- 按列按需读取：CSV 首次打开时转换为列式缓存（见 column_store），再次打开只读取表头
+- 后台并行加载多个文件，显示进度并可取消（见 file_loader）
+- 多文件按真实时间对齐：最近时刻对齐、重采样到统一速率或各文件原始时间轴（见 align）
 
 使用方法：
 1. 右键点击左侧列表使用文件树中的上下文菜单添加CSV文件
@@ -23,6 +26,8 @@ CSV格式要求：
 - 第二行：各列的单位
 - 后续行：数据值
 
+也可加载 RTDataPlot 保存的 HDF5 记录文件（.h5，见 RTDataPlot.data_recorder）
+
 Author: JIN && <jjyrealdeal@163.com>
 Date: 2025-7-16 08:43:14
 Copyright (c) 2025 by JIN, All Rights Reserved. 
@@ -39,6 +44,10 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtGui import *
 from PyQt5.QtCore import *
 from src.components.DataReplay.Ui_DataReplay_Form import Ui_DataReplay_Form
+from src.components.DataReplay.file_loader import FileLoader
+from src.components.DataReplay.column_store import read_columns
+from src.components.DataReplay.hit_test import CurveHitTester
+from src.components.DataReplay.align import TimeAligner, ALIGN_MODES
 from assets import ICON_BACKWARD,ICON_PLUS,ICON_MINUS,ICON_ALLCHECK,ICON_ALLUNCHECK,ICON_BROOM
 
 
@@ -120,12 +129,17 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
     def __init__(self):
         super(DataReplayForm, self).__init__()
         self.setupUi(self)
-        self.data = pd.DataFrame() 
         self.all_data = {}
+        self.loading = {}                    # 正在加载的文件：文件路径 -> {item, loader, done, total}
+        self.loaders = []                    # 运行中的 FileLoader
         self.curves=[]
-        self.timestamps = np.array([])       # x轴时间戳
-        self.window_width = 0                # 当前窗口宽度
-        self.scroll_position = 0             # 当前滚动起始位置
+        self.hit_tester = CurveHitTester([])  # 悬停命中检测，与 self.curves 一一对应
+        self.curve_pyramids = []             # 各曲线的最小/最大值包络，与 self.curves 一一对应
+        self.aligner = TimeAligner()         # 多文件时间对齐，缓存时间轴、包络及对齐结果
+        self.time_origin = None              # x轴零点对应的时刻，x 为相对该时刻的秒数
+        self.x_bounds = None                 # 所有曲线 x 的 (最小值, 最大值)
+        self.window_width = 0                # 当前窗口宽度(s)
+        self.scroll_position = 0             # 当前滚动起始位置(s)
 
         self.initUI()
         self.init_graph()
@@ -140,6 +154,24 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
         self.horizontalSlider.setAttribute(Qt.WA_Hover, True)
         self.horizontalSlider.installEventFilter(self)
 
+        # 多文件时间对齐方式
+        self.comboBox_align = QComboBox()
+        for mode, name in ALIGN_MODES.items():
+            self.comboBox_align.addItem(name, mode)
+        self.comboBox_align.setToolTip("多个文件的数据在时间轴上的对齐方式")
+        self.horizontalLayout_3.insertWidget(self.horizontalLayout_3.indexOf(self.pushButton_plot), self.comboBox_align)
+
+        # 后台加载进度（加载期间显示）
+        self.label_loading = QLabel()
+        self.progressBar_loading = QProgressBar()
+        self.progressBar_loading.setRange(0, 100)
+        self.progressBar_loading.setMaximumWidth(240)
+        self.pushButton_cancel_loading = QPushButton("取消")
+        self.pushButton_cancel_loading.clicked.connect(self.cancel_loading)
+        for i, widget in enumerate((self.label_loading, self.progressBar_loading, self.pushButton_cancel_loading)):
+            self.horizontalLayout_3.insertWidget(i, widget)
+            widget.hide()
+
 
     def init_graph(self):
         """
@@ -162,7 +194,7 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
         # 设置标题和坐标轴标签
         self.plot_widget.getPlotItem().setTitle(" ", color='k', size='15pt')
         self.plot_widget.getPlotItem().setLabel('left', " ", units='', **{'color': 'black', 'font-size': '12pt'})
-        self.plot_widget.getPlotItem().setLabel('bottom', "时间", units='ms', **{'color': 'black', 'font-size': '12pt'})
+        self.plot_widget.getPlotItem().setLabel('bottom', "时间", units='s', **{'color': 'black', 'font-size': '12pt'})
 
         # 绑定鼠标移动事件（监听整个plot区域）
         self.proxy = pg.SignalProxy(self.plot_widget.scene().sigMouseMoved, rateLimit=60, slot=self.onMouseMoved)
@@ -201,7 +233,11 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
     def init_connections(self):
         """初始化信号槽连接"""
         self.horizontalSlider.valueChanged.connect(self.scroll_plot)
+        # 缩放、平移、滚动及绘图区尺寸变化时按新的可见范围重新抽取
+        self.view_box.sigXRangeChanged.connect(self.render_view)
+        self.view_box.sigResized.connect(self.render_view)
         self.pushButton_plot.clicked.connect(self.draw_plot)
+        self.comboBox_align.currentIndexChanged.connect(self.on_align_mode_changed)
         self.treeWidget_datafile.customContextMenuRequested.connect(self.TreeContextMenuEvent)
 
     def TreeContextMenuEvent(self, pos):
@@ -248,7 +284,8 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
         iterator = QTreeWidgetItemIterator(self.treeWidget_datafile)
         while iterator.value():
             item = iterator.value()
-            item.setCheckState(0, Qt.Checked)
+            if item.flags() & Qt.ItemIsUserCheckable:  # 跳过加载中的文件及其预览列
+                item.setCheckState(0, Qt.Checked)
             iterator += 1
 
 
@@ -257,20 +294,27 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
         iterator = QTreeWidgetItemIterator(self.treeWidget_datafile)
         while iterator.value():
             item = iterator.value()
-            item.setCheckState(0, Qt.Unchecked)
+            if item.flags() & Qt.ItemIsUserCheckable:  # 跳过加载中的文件及其预览列
+                item.setCheckState(0, Qt.Unchecked)
             iterator += 1
 
     
     def clear_all_files(self):
         """清空数据列表并清空图表"""
+        self.cancel_loading()
+        self.loading = {}
+        self.update_loading_progress()
         self.treeWidget_datafile.clear()
         self.plot_widget.clear()
 
         # 清理内部变量
         self.all_data = {}
         self.curves = []
+        self.curve_pyramids = []
+        self.aligner.clear()
+        self.x_bounds = None
+        self.hit_tester = CurveHitTester([])
         self.selected_columns = []
-        self.data = pd.DataFrame() 
 
     
     def remove_file(self):
@@ -283,19 +327,19 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
         for item in selected_items:
             # 确保是顶层节点（即文件）
             if item.parent() is None:
+                # 仍在加载的文件：取消加载
+                for path, entry in list(self.loading.items()):
+                    if entry["item"] is item:
+                        entry["loader"].cancel(path)
+                        del self.loading[path]
                 filename = item.text(0)
-                del self.all_data[filename]  # 从数据中删除
-                index = self.treeWidget_datafile.indexOfTopLevelItem(item)
-                self.treeWidget_datafile.takeTopLevelItem(index)  # 从树中删除
+                self.all_data.pop(filename, None)  # 从数据中删除
+                self.aligner.drop_file(filename)
+                self._take_item(item)  # 从树中删除
+        self.update_loading_progress()
 
         # 刷新列计数器和映射
-        self.col_counter = {}
-        self.column_mapping = {}
-
-        for filename, df in self.all_data.items():
-            for col in df.columns:
-                self.col_counter[col] = self.col_counter.get(col, 0) + 1
-                self.column_mapping[(filename, col)] = col
+        self.update_column_counter()
 
         # 重新绘图
         self.draw_plot()
@@ -312,79 +356,184 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
 
         功能说明：
             - 使用文件对话框选择一个或多个CSV文件；
-            - 每个文件解析为带多级列名（名称+单位）的DataFrame；
-            - 时间戳列作为索引处理；
             - 避免重复加载同一文件；
-            - 在TreeWidget中展示文件结构和列信息；
-            - 更新滑动条的最大值以匹配最新加载文件的数据长度。
+            - 各文件在后台线程池中并行打开为列式数据源（file_loader / column_store），界面不阻塞；
+            - 加载开始时只读取表头，在TreeWidget中预览列信息（加载完成前不可勾选）并显示进度，
+              可通过"取消"按钮或移除文件中止；
+            - 每个文件加载完成后立即可勾选其数据列，并更新滑动条的最大值。
         """
         # 打开文件选择对话框，允许选择多个CSV文件
-        paths, _ = QFileDialog.getOpenFileNames(self, "选择CSV文件", "", "*.csv")
+        paths, _ = QFileDialog.getOpenFileNames(self, "选择CSV文件", "", "数据文件 (*.csv *.h5)")
         if not paths:
             return
 
-        # 初始化数据存储结构
-        if not hasattr(self, "all_data"):
-            self.all_data = {}
-        self.col_counter = {}  # 统计所有列名出现次数
-        self.column_mapping = {}  # (filename, name) -> (name, unit)
-
-        # 遍历选中的每个文件路径进行处理
+        new_paths = []
         for path in paths:
             filename = os.path.basename(path)
 
             # 避免重复加载相同文件名的文件
-            if filename in self.all_data:
+            if filename in self.all_data or any(os.path.basename(p) == filename for p in self.loading):
                 QMessageBox.information(self, "提示", f"{filename} 已被加载，请勿重复操作")
                 continue
 
-            # 尝试读取CSV文件，前两行为标题行（列名+单位）
+            # 先在TreeWidget中占位并预览列信息，加载完成后才可勾选
+            root = QTreeWidgetItem([f"{filename} (0%)"])
+            root.setToolTip(0, path)
+            root.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)  # 加载期间不可勾选，但可选中后移除
+            root.setForeground(0, QBrush(Qt.gray))
             try:
-                df = pd.read_csv(path, header=[0, 1])  # 两行标题（列名 + 单位）
-            except Exception as e:
-                QMessageBox.warning(self, "错误", f"读取文件失败：{filename}\n{str(e)}")
-                continue
+                columns = read_columns(path)
+            except Exception:
+                columns = []  # 表头无法读取时由后台加载报告错误
+            for name, unit in columns:
+                item = QTreeWidgetItem([name])
+                item.setFlags(Qt.NoItemFlags)
+                item.setToolTip(0, f"单位: {unit}")
+                root.addChild(item)
+            self.treeWidget_datafile.addTopLevelItem(root)
+            root.setExpanded(True)
+            self.loading[path] = {"item": root, "done": 0, "total": 0}
+            new_paths.append(path)
+
+        if not new_paths:
+            return
+
+        loader = FileLoader(new_paths, parent=self)
+        loader.progress.connect(self.on_file_progress)
+        loader.file_loaded.connect(self.on_file_loaded)
+        loader.file_failed.connect(self.on_file_failed)
+        loader.file_cancelled.connect(self.on_file_cancelled)
+        loader.finished.connect(lambda: self.on_loader_finished(loader))
+        for path in new_paths:
+            self.loading[path]["loader"] = loader
+        self.loaders.append(loader)
+        loader.start()
+        self.update_loading_progress()
+
+
+    def _loading_entry(self, path, pop=False):
+        """
+        发出信号的加载器负责的加载项
+
+        文件在加载期间被移除（可能随即又被重新添加，由新的加载器负责）时，旧加载器随后发出的信号返回 None
+        """
+        entry = self.loading.get(path)
+        if entry is None or entry["loader"] is not self.sender():
+            return None
+        if pop:
+            del self.loading[path]
+        return entry
+
+
+    def on_file_progress(self, path, done, total):
+        """更新单个文件的加载进度"""
+        entry = self._loading_entry(path)
+        if entry is None:
+            return
+        entry["done"], entry["total"] = done, total
+        percent = int(100 * done / total) if total else 0
+        entry["item"].setText(0, f"{os.path.basename(path)} ({percent}%)")
+        self.update_loading_progress()
+
+
+    def on_file_loaded(self, path, store):
+        """文件加载完成：存储数据源并在TreeWidget中展示文件结构和列信息（仅显示列名）"""
+        filename = os.path.basename(path)
+        entry = self._loading_entry(path, pop=True)
+        if entry is None:
+            return  # 加载期间已被移除
+
+        self.all_data[filename] = store
+        self.update_column_counter()
+
+        root = entry["item"]
+        root.setText(0, filename)
+        root.setData(0, Qt.ForegroundRole, None)
+        root.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable | Qt.ItemIsAutoTristate)
+        root.setCheckState(0, Qt.Unchecked)
+        root.takeChildren()  # 丢弃预览项，按数据源的列重建
+        for name, unit in store.columns:
+            item = QTreeWidgetItem([name])  # 显示列名
+            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable | Qt.ItemIsAutoTristate)
+            item.setCheckState(0, Qt.Unchecked)
+            item.setToolTip(0, f"单位: {unit}")
+            root.addChild(item)
+        root.setExpanded(True)
+
+        # 更新滑动条最大值为最后加载完成的文件的行数
+        self.horizontalSlider.setMaximum(len(store))
+        self.update_loading_progress()
+
+
+    def on_file_failed(self, path, error):
+        """文件加载失败：移除占位项并提示"""
+        filename = os.path.basename(path)
+        entry = self._loading_entry(path, pop=True)
+        if entry is None:
+            return
+        self._take_item(entry["item"])
+        self.update_loading_progress()
+        QMessageBox.warning(self, "错误", f"读取文件失败：{filename}\n{error}")
+
+
+    def on_file_cancelled(self, path):
+        """文件加载被取消：移除占位项"""
+        entry = self._loading_entry(path, pop=True)
+        if entry is not None:
+            self._take_item(entry["item"])
+        self.update_loading_progress()
+
 
-            # 设置时间戳列为索引并删除原时间列
-            df.index = pd.to_datetime(df[df.columns[0]])  # 将时间戳列设为 index
-            df.drop(columns=[df.columns[0]], inplace=True)  # 删除原时间列
+    def on_loader_finished(self, loader):
+        if loader in self.loaders:
+            self.loaders.remove(loader)
+        loader.deleteLater()
+        self.update_loading_progress()
 
-            # 存储解析后的DataFrame
-            self.all_data[filename] = df
 
-            # 统计列名出现次数并记录完整映射关系
-            for col in df.columns:
-                name, unit = col
+    def update_loading_progress(self):
+        """刷新总进度（各文件进度的平均值），没有正在加载的文件时隐藏进度条"""
+        if not self.loading:
+            self.label_loading.hide()
+            self.progressBar_loading.hide()
+            self.pushButton_cancel_loading.hide()
+            return
+        fractions = [e["done"] / e["total"] if e["total"] else 0 for e in self.loading.values()]
+        self.progressBar_loading.setValue(int(100 * sum(fractions) / len(fractions)))
+        self.label_loading.setText(f"正在加载 {len(self.loading)} 个文件")
+        self.label_loading.show()
+        self.progressBar_loading.show()
+        self.pushButton_cancel_loading.show()
+
+
+    def cancel_loading(self):
+        """取消所有正在加载的文件"""
+        for loader in self.loaders:
+            loader.cancel()
+
+
+    def update_column_counter(self):
+        """统计所有已加载文件中列名出现的次数并记录完整映射关系"""
+        self.col_counter = {}  # 统计所有列名出现次数
+        self.column_mapping = {}  # (filename, name) -> (name, unit)
+        for filename, store in self.all_data.items():
+            for name, unit in store.columns:
                 self.col_counter[name] = self.col_counter.get(name, 0) + 1
                 self.column_mapping[(filename, name)] = (name, unit)
 
-        # 更新TreeWidget显示内容：展示文件及其列信息（仅显示列名）
-        for filename, df in self.all_data.items():
-            exists = False
-            for i in range(self.treeWidget_datafile.topLevelItemCount()):
-                item = self.treeWidget_datafile.topLevelItem(i)
-                if item.text(0) == filename:
-                    exists = True
-                    break
-            if not exists:
-                root = QTreeWidgetItem([filename])
-                root.setToolTip(0, path)
-                root.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable | Qt.ItemIsAutoTristate)
-                root.setCheckState(0, Qt.Unchecked)
-                for name, unit in df.columns:
-                    item = QTreeWidgetItem([name])  # 显示列名
-                    item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable | Qt.ItemIsAutoTristate)
-                    item.setCheckState(0, Qt.Unchecked)
-                    item.setToolTip(0, f"单位: {unit}")
-                    root.addChild(item)
-                self.treeWidget_datafile.addTopLevelItem(root)
-                root.setExpanded(True)
-
-        # 如果成功加载了数据，则更新滑动条最大值为最后一个文件的行数
-        if self.all_data:
-            last_df = list(self.all_data.values())[-1]
-            self.horizontalSlider.setMaximum(len(last_df))
 
+    def _take_item(self, item):
+        index = self.treeWidget_datafile.indexOfTopLevelItem(item)
+        if index >= 0:
+            self.treeWidget_datafile.takeTopLevelItem(index)
+
+
+    def closeEvent(self, event):
+        """关闭窗口前停止后台加载"""
+        self.cancel_loading()
+        for loader in list(self.loaders):
+            loader.wait()
+        super().closeEvent(event)
 
 
     def draw_plot(self):
@@ -393,8 +542,9 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
 
         该方法会：
         - 清除当前绘图区域并保留必要的交互元素；
-        - 遍历所有文件及其选中的列，构建绘图数据；
-        - 绘制每条曲线，并设置颜色和图例；
+        - 遍历所有文件及其选中的列，按所选对齐方式放到同一条真实时间轴上（见 align），
+          各列首次选中时计算最小/最大值包络，对齐结果按选择缓存；
+        - 创建每条曲线，并设置颜色和图例，曲线数据由 render_view() 按可见范围生成；
         - 设置坐标轴范围和滑动条参数，以支持数据浏览。
 
         """
@@ -407,15 +557,18 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
         self.text_item.hide()
         self.highlighted_curve = None
         self.curves = []  # 保存所有PlotDataItem
-        combined_df = pd.DataFrame()
+        self.curve_pyramids = []  # 与 self.curves 一一对应的包络
+        self.x_bounds = None
+        self.hit_tester = CurveHitTester([])
+        selections = []  # [(legend_name, filename, col, store)]
         self.selected_columns = []
 
         # 遍历所有文件
         for i in range(self.treeWidget_datafile.topLevelItemCount()):
             file_item = self.treeWidget_datafile.topLevelItem(i)
             filename = file_item.text(0)
-            df = self.all_data.get(filename)
-            if df is None:
+            store = self.all_data.get(filename)
+            if store is None:
                 continue
 
             # 遍历文件中的所有列
@@ -429,29 +582,38 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
                     else:
                         legend_name = f'{col} {unit}'
 
-                    # 添加到绘图数据
-                    combined_df[legend_name] = df[col]
+                    selections.append((legend_name, filename, col, store))
                     self.selected_columns.append((legend_name, legend_name))
 
-        if combined_df.empty:
+        if not selections:
             return
-        
-        self.data = combined_df
-        self.timestamps = np.arange(len(combined_df))  
-        self.window_width = max(100, int(len(self.timestamps) * 0.1))
-        self.scroll_position = 0  # 初始起点
-
-        # 遍历所有选中的列
-        for i, (colname, legend_name) in enumerate(self.selected_columns):
-            y = self.data[legend_name].to_numpy()
+
+        # 按所选对齐方式把各文件的数据放到同一条真实时间轴上（结果按选择缓存）
+        aligned = self.aligner.align([(filename, col, store) for _, filename, col, store in selections],
+                                     self.comboBox_align.currentData())
+        self.time_origin = aligned.origin
+        self.x_bounds = aligned.x_bounds()
+        if self.x_bounds is None:
+            return
+        x_lo, x_hi = self.x_bounds
+        interval = aligned.interval or 1e-3
+        span = max(x_hi - x_lo, interval)
+        self.window_width = min(max(100 * interval, span * 0.1), span)
+        self.scroll_position = x_lo  # 初始起点
+
+        # 遍历所有选中的列（只读取勾选的列）
+        for i, ((legend_name, _, _, _), (x, y, pyramid)) in enumerate(zip(selections, aligned.curves)):
             color = QColor.fromHsv((i * 30) % 255, 200, 230)
-            curve = self.plot_widget.plot(self.timestamps, y, pen=pg.mkPen(color=color, width=1), name=legend_name)
+            curve = self.plot_widget.plot(pen=pg.mkPen(color=color, width=1), name=legend_name)
             curve.default_pen = pg.mkPen(color=color, width=1)
-            self.curves.append((curve, self.timestamps, y))
+            self.curves.append((curve, x, y))
+            self.curve_pyramids.append(pyramid)
+        self.hit_tester = CurveHitTester([(x, y) for _, x, y in self.curves], self.curve_pyramids)
 
         x_min = self.scroll_position
         x_max = self.scroll_position + self.window_width
-        y_min, y_max = combined_df.min().min(), combined_df.max().max()
+        bounds = np.array([pyramid.bounds() for pyramid in self.curve_pyramids])
+        y_min, y_max = np.nanmin(bounds[:, 0]), np.nanmax(bounds[:, 1])
 
         y_range = y_max - y_min
         # 添加 5% 的上下留白
@@ -461,23 +623,46 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
 
         vb = self.view_box
         vb.setLimits(
-            xMin=0,
-            xMax=len(self.timestamps),
+            xMin=x_lo,
+            xMax=x_lo + span,
             yMin=y_min,
             yMax=y_max,
-            minXRange=10,
-            maxXRange=len(self.timestamps),
+            minXRange=10 * interval,
+            maxXRange=span,
             minYRange=y_range * 0.01,
             maxYRange=y_range * 1.1
         )
         vb.setXRange(x_min, x_max, padding=0)
         vb.setYRange(y_min, y_max, padding=0)
+        self.render_view()
 
         # 设置滑动条最大值为 100（百分比控制）
         self.horizontalSlider.setMaximum(100)
         self.horizontalSlider.setValue(0)
 
 
+    def on_align_mode_changed(self):
+        """切换对齐方式后按新方式重绘当前选择"""
+        if self.curves:
+            self.draw_plot()
+
+
+    def plot_pixels(self):
+        """绘图区宽度（像素），决定包络的块数"""
+        return max(int(self.view_box.width()), 100)
+
+
+    def render_view(self):
+        """按当前可见范围为各曲线生成绘制数据（原始数据切片或最小/最大值包络）"""
+        if not self.curves:
+            return
+        x0, x1 = self.view_box.viewRange()[0]
+        pixels = self.plot_pixels()
+        for (curve, x, _), pyramid in zip(self.curves, self.curve_pyramids):
+            xs, ys = pyramid.render(x, x0, x1, pixels)
+            curve.setData(xs, ys)
+
+
     def scroll_plot(self, value):
         """
         根据滑动条位置滚动图表显示区域
@@ -488,22 +673,22 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
         返回值:
             None: 无返回值，直接修改图表显示区域
         """
-        # 如果没有时间戳或者时间戳长度为0，则直接返回
-        if not hasattr(self, 'timestamps') or len(self.timestamps) == 0:
+        # 如果没有绘制数据，则直接返回
+        if self.x_bounds is None:
             return
 
-        # 获取时间戳的总数
-        total_points = len(self.timestamps)
-        # 如果时间戳总数小于等于窗口宽度，则直接返回
-        if total_points <= self.window_width:
+        # 获取时间轴的总长度(s)
+        x_lo, x_hi = self.x_bounds
+        # 如果总长度小于等于窗口宽度，则直接返回
+        if x_hi - x_lo <= self.window_width:
             return
 
-        # 计算起始索引位置
-        max_start = total_points - self.window_width
+        # 计算起始位置的最大值
+        max_start = x_hi - x_lo - self.window_width
         # 根据滑动条位置计算滚动位置
-        self.scroll_position = int((value / 100.0) * max_start)
+        self.scroll_position = x_lo + (value / 100.0) * max_start
         # 确保滚动位置在有效范围内
-        self.scroll_position = max(0, min(self.scroll_position, max_start))
+        self.scroll_position = max(x_lo, min(self.scroll_position, x_lo + max_start))
 
         # 获取图表的视图框
         vb = self.plot_widget.getViewBox()
@@ -534,20 +719,14 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
                 * pos.x()
                 / self.horizontalSlider.width()
             )
-            # 计算索引
-            index = int(len(self.data) * (val / 100.0))
-            # 如果索引在数据范围内
-            if 0 <= index < len(self.data):
+            # 如果已绘制数据，按比例换算为时间轴上的时刻
+            if self.x_bounds is not None and 0 <= val <= 100:
                 try:
-                    # 获取时间戳
-                    timestamp = self.data.index[index]
-                    # 如果时间戳是pd.Timestamp类型
-                    if isinstance(timestamp, pd.Timestamp):
-                        # 格式化时间戳
-                        tip = timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-                    else:
-                        # 否则直接转换为字符串
-                        tip = str(timestamp)
+                    x_lo, x_hi = self.x_bounds
+                    seconds = x_lo + (x_hi - x_lo) * (val / 100.0)
+                    timestamp = pd.Timestamp(self.time_origin) + pd.Timedelta(seconds=seconds)
+                    # 格式化时间戳
+                    tip = timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
                     # 显示提示信息
                     QToolTip.showText(self.horizontalSlider.mapToGlobal(pos), tip)
                 except Exception:
@@ -585,39 +764,17 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
             return
 
         # 将鼠标位置映射到视图坐标
-        view_pos = self.plot_widget.plotItem.vb.mapSceneToView(pos)
-        # 获取鼠标在像素坐标系下的位置
-        mouse_pixel_pos = pos.toPoint()
+        vb = self.plot_widget.plotItem.vb
+        view_pos = vb.mapSceneToView(pos)
 
         # 设置像素阈值
         pixel_threshold = 20
 
-        # 初始化最近的曲线及相关信息
-        closest_curve = None
-        closest_idx = None
-        closest_dist = float('inf')
-        closest_x_data = None
-        closest_y_data = None
-
-        # 遍历所有曲线，寻找最近的点
-        for curve, x_data, y_data in self.curves:
-            if len(x_data) == 0:
-                continue
-
-            for i in range(len(x_data)):
-                pt_data = QPointF(x_data[i], y_data[i])
-                pt_pixel = self.plot_widget.plotItem.vb.mapViewToScene(pt_data).toPoint()
-                dist = (pt_pixel - mouse_pixel_pos).manhattanLength()
-
-                if dist < pixel_threshold and dist < closest_dist:
-                    closest_dist = dist
-                    closest_curve = curve
-                    closest_idx = i
-                    closest_x_data = x_data
-                    closest_y_data = y_data
+        # 在阈值窗口内查找最近的点
+        hit = self.hit_tester.hit(view_pos.x(), view_pos.y(), vb.viewPixelSize(), pixel_threshold)
 
         # 如果没有找到最近的曲线，则隐藏相关显示元素并返回
-        if closest_curve is None:
+        if hit is None:
             self.text_item.hide()
             self.hover_marker.clear()
             self.v_line.hide()
@@ -625,6 +782,9 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
             self.restore_curve(self.highlighted_curve)
             self.highlighted_curve = None
             return
+        curve_index, closest_idx, _ = hit
+        closest_curve, closest_x_data, closest_y_data = self.curves[curve_index]
+        stats = self.hit_tester.stats[curve_index]
 
         # 恢复其他曲线原色
         if self.highlighted_curve is not None and self.highlighted_curve != closest_curve:
@@ -648,7 +808,7 @@ class DataReplayForm(QWidget, Ui_DataReplay_Form):
         self.h_line.show()
 
         # 显示数据浮窗
-        text = f'{closest_curve.name()}\nX: {int(x_val)}\nY: {y_val:.3f}\nMIN: {min(closest_y_data):.3f}\nMAX: {max(closest_y_data):.3f}\nAVG: {np.mean(closest_y_data):.3f}\n'
+        text = f'{closest_curve.name()}\nX: {x_val:.3f} s\nY: {y_val:.3f}\nMIN: {stats.min:.3f}\nMAX: {stats.max:.3f}\nAVG: {stats.mean:.3f}\n'
         self.text_item.setText(text)
         self.text_item.setPos(view_pos.x(), view_pos.y())
         self.text_item.show()
@@ -0,0 +1,71 @@
+'''
+后台文件加载
+===========
+
+每个文件一个任务，在线程池中并行打开（CSV 首次打开时分块解析、写出列缓存，见 column_store）。
+pandas 的 C 解析器在分词和数值转换时释放 GIL，多个文件可以同时占用多个核。
+各信号均在工作线程中发出，接收方在界面线程时按队列连接自动切回界面线程。
+'''
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from src.components.DataReplay.column_store import open_store, LoadCancelled
+
+
+class FileLoader(QThread):
+    """
+    后台加载一批文件
+
+    progress(path, 已处理行数, 总行数) 每解析完一个分块发出一次；每个文件结束时发出 file_loaded(path, 数据源)、
+    file_failed(path, 错误信息) 或 file_cancelled(path) 之一；全部结束后发出 QThread.finished。
+    """
+    progress = pyqtSignal(str, int, int)
+    file_loaded = pyqtSignal(str, object)
+    file_failed = pyqtSignal(str, str)
+    file_cancelled = pyqtSignal(str)
+
+    def __init__(self, paths, max_workers=None, parent=None):
+        """
+        :param paths: 文件路径列表
+        :param max_workers: 并行任务数，默认为 CPU 核数
+        """
+        super().__init__(parent)
+        self.paths = list(paths)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._cancel = {path: threading.Event() for path in self.paths}
+
+    def cancel(self, path=None):
+        """取消指定文件（默认全部）的加载，正在解析的文件在当前分块结束后停止"""
+        for p in ([path] if path is not None else self.paths):
+            if p in self._cancel:
+                self._cancel[p].set()
+
+    def _load(self, path):
+        cancel = self._cancel[path]
+        if cancel.is_set():
+            raise LoadCancelled(path)
+        return open_store(path, progress=lambda done, total: self.progress.emit(path, done, total), cancel=cancel)
+
+    def run(self):
+        if not self.paths:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.paths))) as executor:
+            futures = {executor.submit(self._load, path): path for path in self.paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    store = future.result()
+                except LoadCancelled:
+                    self.file_cancelled.emit(path)
+                except Exception as e:
+                    self.file_failed.emit(path, str(e))
+                else:
+                    # 解析完成后才取消的文件同样丢弃
+                    if self._cancel[path].is_set():
+                        self.file_cancelled.emit(path)
+                    else:
+                        self.file_loaded.emit(path, store)
@@ -0,0 +1,129 @@
+import numpy as np
+
+HIT_MAX_POINTS = 4096  # 阈值窗口内的点数超过该值时改用包络检测
+
+
+
+class CurveStats:
+    """曲线的预计算统计量（忽略 NaN）"""
+    def __init__(self, y):
+        finite = np.isfinite(y)
+        if finite.any():
+            values = y[finite]
+            self.min = float(values.min())
+            self.max = float(values.max())
+            self.mean = float(values.mean())
+        else:
+            self.min = self.max = self.mean = float("nan")
+
+
+class CurveHitTester:
+    """
+    曲线悬停命中检测
+
+    各曲线的 x 需单调递增。命中时先对 x 二分查找出鼠标左右 threshold 像素内的下标区间，
+    再在视图坐标下对区间内的点向量化计算像素曼哈顿距离，取最近的点。
+    缩小显示大量数据时，区间内的点数超过 HIT_MAX_POINTS 且曲线有包络（ColumnPyramid）时，
+    改为对块数不超过 HIT_MAX_POINTS 的一级包络计算距离（即到块的 x 范围与最小/最大值矩形的距离，
+    与绘制出的包络一致），再逐级向下只在距离最近的块内细化到原始点；耗时与数据长度和缩放无关。
+    """
+    def __init__(self, curves, pyramids=None):
+        """
+        :param curves: [(x, y)]，x 与 y 等长的一维数组
+        :param pyramids: 与 curves 一一对应的 ColumnPyramid（按 y 建立），可为 None
+        """
+        converted = {}  # 共用的 x 数组只转换一次，命中时据此共用二分查找结果
+        self.curves = []
+        for x, y in curves:
+            if id(x) not in converted:
+                converted[id(x)] = np.asarray(x, dtype=np.float64)
+            self.curves.append((converted[id(x)], np.asarray(y, dtype=np.float64)))
+        self.stats = [CurveStats(y) for _, y in self.curves]
+        self.pyramids = list(pyramids) if pyramids is not None else [None] * len(self.curves)
+
+    def hit(self, x, y, pixel_size, threshold=20):
+        """
+        查找距离 (x, y) 最近的数据点
+
+        :param x, y: 鼠标位置（视图坐标）
+        :param pixel_size: (一个像素对应的 x 宽度, 一个像素对应的 y 高度)，即 ViewBox.viewPixelSize()
+        :param threshold: 像素阈值，距离小于该值才算命中
+        :return: (曲线序号, 点下标, 像素距离)；未命中时为 None
+        """
+        px, py = abs(pixel_size[0]), abs(pixel_size[1])
+        if not px or not py:
+            return None
+        half = threshold * px
+        best = None
+        best_dist = threshold
+        windows = {}  # 共用同一 x 数组的曲线只查找一次
+        for i, (xs, ys) in enumerate(self.curves):
+            key = id(xs)
+            if key not in windows:
+                windows[key] = (np.searchsorted(xs, x - half, side="left"),
+                                np.searchsorted(xs, x + half, side="right"))
+            lo, hi = windows[key]
+            if hi <= lo:
+                continue
+            pyramid = self.pyramids[i]
+            if hi - lo > HIT_MAX_POINTS and pyramid is not None and pyramid.levels:
+                found = _envelope_hit(pyramid, xs, lo, hi, x, y, px, py)
+                if found is not None and found[1] < best_dist:
+                    best_dist = found[1]
+                    best = (i, found[0], best_dist)
+                continue
+            j, dist = _nearest_point(xs, ys, lo, hi, x, y, px, py)
+            if j >= 0 and dist < best_dist:
+                best_dist = dist
+                best = (i, j, best_dist)
+        return best
+
+
+def _nearest_point(xs, ys, lo, hi, x, y, px, py):
+    """[lo, hi) 内距离 (x, y) 最近的点，返回 (下标, 像素距离)；全为 NaN 时下标为 -1"""
+    dist = np.abs(xs[lo:hi] - x) / px + np.abs(ys[lo:hi] - y) / py
+    if np.isnan(dist).all():
+        return -1, float("inf")
+    j = int(np.nanargmin(dist))
+    return lo + j, float(dist[j])
+
+
+def _block_distance(pyramid, xs, k, b0, b1, x, y, px, py):
+    """第 k 级包络中 [b0, b1) 各块到 (x, y) 的像素距离（块的 x 范围与最小/最大值构成的矩形），全为 NaN 的块为 NaN"""
+    size = pyramid.sizes[k]
+    level_min, level_max = pyramid.levels[k]
+    starts = np.arange(b0, b1) * size
+    ends = np.minimum(starts + size, len(xs)) - 1
+    dx = np.maximum(np.maximum(xs[starts] - x, x - xs[ends]), 0) / px
+    dy = np.maximum(np.maximum(level_min[b0:b1] - y, y - level_max[b0:b1]), 0) / py
+    return dx + dy
+
+
+def _envelope_hit(pyramid, xs, lo, hi, x, y, px, py):
+    """
+    在包络上检测 [lo, hi) 范围，返回 (原始点下标, 到包络的像素距离)；没有有效数据时为 None
+
+    先在块数不超过 HIT_MAX_POINTS 的一级中取距离最近的块，再逐级只比较其子块，最后在最低一级的块内
+    取距离最近的原始点。命中距离取到包络的距离，与屏幕上绘制的包络一致。
+    """
+    k = 0
+    while k < len(pyramid.sizes) - 1 and (hi - lo) > HIT_MAX_POINTS * pyramid.sizes[k]:
+        k += 1
+    size = pyramid.sizes[k]
+    b0, b1 = lo // size, -(-hi // size)
+    dist = _block_distance(pyramid, xs, k, b0, b1, x, y, px, py)
+    if np.isnan(dist).all():
+        return None
+    j = int(np.nanargmin(dist))
+    block, block_dist = b0 + j, float(dist[j])
+    while k > 0:
+        ratio = pyramid.sizes[k] // pyramid.sizes[k - 1]
+        k -= 1
+        c0 = block * ratio
+        c1 = min(c0 + ratio, len(pyramid.levels[k][0]))
+        dist = _block_distance(pyramid, xs, k, c0, c1, x, y, px, py)
+        block = c0 + int(np.nanargmin(dist))
+    size = pyramid.sizes[0]
+    s, e = block * size, min((block + 1) * size, len(xs))
+    index, _ = _nearest_point(xs, pyramid.y, s, e, x, y, px, py)
+    return index, block_dist
@@ -0,0 +1,84 @@
+import numpy as np
+
+from src.components.RTDataPlot.lod import LOD_FACTOR
+
+
+def _block_reduce(values, size, func):
+    """每 size 个数据合并为一块（末块可不满），func 为 np.fmin / np.fmax（忽略 NaN）"""
+    n = len(values)
+    full = n // size
+    out = np.empty(-(-n // size))
+    if full:
+        out[:full] = func.reduce(values[:full * size].reshape(full, size), axis=1)
+    if full < len(out):
+        out[-1] = func.reduce(values[full * size:])
+    return out
+
+
+class ColumnPyramid:
+    """
+    回放数据列的多级最小/最大值包络
+
+    与 RTDataPlot.lod.MinMaxPyramid 相同的分级方式，但针对已完整读入（或 memmap 映射）的静态数据列：
+    创建时一次性逐级计算，第一级块大小为 min_block，之后每级为上一级的 factor 倍，内存约为原始数据的
+    2 / (min_block - min_block / factor)。render() 根据可见范围选级，绘制点数约为 2 倍像素宽度，与数据总长度无关。
+    """
+    def __init__(self, y, factor=LOD_FACTOR, min_block=LOD_FACTOR ** 2):
+        """
+        :param y: 一维数据（float64，可为只读 memmap）
+        :param factor: 相邻两级之间的合并倍数
+        :param min_block: 第一级的块大小
+        """
+        self.y = y
+        self.factor = factor
+        self.sizes = []   # 各级块大小
+        self.levels = []  # [(最小值数组, 最大值数组)]
+        src_min = src_max = y
+        src_size = 1
+        size = min_block
+        while size < len(y):
+            step = size // src_size
+            src_min, src_max = _block_reduce(src_min, step, np.fmin), _block_reduce(src_max, step, np.fmax)
+            self.sizes.append(size)
+            self.levels.append((src_min, src_max))
+            src_size = size
+            size *= factor
+
+    def __len__(self):
+        return len(self.y)
+
+    def bounds(self):
+        """数据的 (最小值, 最大值)，忽略 NaN；由最高一级计算"""
+        mins, maxs = self.levels[-1] if self.levels else (self.y, self.y)
+        if not len(mins) or np.isnan(mins).all():
+            return float("nan"), float("nan")
+        return float(np.nanmin(mins)), float(np.nanmax(maxs))
+
+    def render(self, x, x0, x1, pixels=1000):
+        """
+        生成 [x0, x1] 范围内用于绘制的数据
+
+        :param x: 与 y 等长、单调递增的 x 数组
+        :param pixels: 绘图区宽度（像素）
+        :return: (x, y)；范围内点数不超过 factor 倍像素宽度时为原始数据切片，否则为最小/最大值交替的包络
+        """
+        n_total = len(self.y)
+        # 范围两端各多取一个点，使曲线延伸到绘图区边缘
+        i0 = max(int(np.searchsorted(x, x0, side="left")) - 1, 0)
+        i1 = min(int(np.searchsorted(x, x1, side="right")) + 1, n_total)
+        n = i1 - i0
+        if n <= pixels * self.factor or not self.levels:
+            return x[i0:i1], self.y[i0:i1]
+
+        k = 0
+        while k < len(self.levels) - 1 and n > pixels * self.sizes[k]:
+            k += 1
+        size = self.sizes[k]
+        level_min, level_max = self.levels[k]
+        b0 = i0 // size
+        b1 = -(-i1 // size)
+        xs = x[b0 * size:i1:size]
+        out_y = np.empty(2 * len(xs))
+        out_y[0::2] = level_min[b0:b1]
+        out_y[1::2] = level_max[b0:b1]
+        return np.repeat(xs, 2), out_y
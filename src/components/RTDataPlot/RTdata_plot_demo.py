@@ -6,12 +6,17 @@
 - 可设置X轴(固定/滚动)和Y轴(固定/自动)模式
 - 可选择是否保存曲线数据
 - 可对待绘制数据进行选择并进行颜色配置
-- 可进行数据存储
+- 可进行数据存储：勾选保存数据后由 DataRecorder 在后台线程流式写入 saveddata 目录（CSV 或 HDF5），
+  时间戳为真实采集时刻
 
 使用方法：
 - 该工具具有独立可运行的界面， 也可以将其作为模块嵌入到其他界面中
 - 数据源为实时数据，数据格式为字典，包含多个键值对，每个键值对表示一条曲线的数据
 - DataThread类为数据获取线程,负责从数据源获取数据并传递给主线程进行绘制,可在DataThread中替换真实数据源
+- 数据按批发送：字典的值为 numpy 数组，x 轴为等长数组（见 bus_source.BusDataThread）；也兼容单个数值
+- 收到的数据只写入缓冲区，界面由定时器按 display_hz 统一重绘，采集频率与重绘频率无关
+- 固定模式下按可见范围绘制多级最小/最大值包络（lod.MinMaxPyramid），绘制点数与缓冲区长度无关，
+  buffer_size 可设为上千万点
 
 
 Author: JIN && <jjyrealdeal@163.com>
@@ -25,21 +30,28 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
 from src.components.RTDataPlot.Ui_Dialog_Select import Ui_Dialog_Select
 import json
-import math
-import csv
+import time
 import datetime
-from collections import deque
+import numpy as np
 from pathlib import Path
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 import pyqtgraph as pg
 from src.components.RTDataPlot.Ui_Form_RTdata_plot import *
+from src.components.RTDataPlot.ring_buffer import RingBuffer
+from src.components.RTDataPlot.lod import MinMaxPyramid
+from src.components.RTDataPlot.data_recorder import DataRecorder, FORMAT_CSV
 from assets import ICON_PLAY,ICON_PAUSE,ICON_STOP
 
 
 _CONF_PATH = Path(__file__).parent / 'rtdataconf.json' #  配置文件路径
 _BASE_PATH= Path(__file__).parent  # 项目路径
+BUFFER_SIZE = 10000  # 每条曲线保留的历史点数（绘制开销与其无关，可按内存调大）
+SCROLL_POINTS = 100  # 滚动模式显示的点数
+DEFAULT_SAMPLE_RATE = 10  # 模拟数据每秒采样点数
+DEFAULT_BATCH_HZ = 30  # 数据获取线程每秒发送的批次数
+DEFAULT_DISPLAY_HZ = 30  # 界面每秒重绘次数
 
 
 
@@ -68,44 +80,69 @@ def save_config():
 _CONFIG=load_config( _CONF_PATH) # 加载配置文件
 
 
+def curve_config():
+    """当前曲线配置（CurveDialog 的修改直接作用于该字典）"""
+    return _CONFIG
+
+
 class DataThread(QThread):
-    """数据获取线程"""
-    data_updated = pyqtSignal(dict, int) # 数据更新信号，传递数据字典和x轴时间
+    """数据获取线程：按 sample_rate 产生数据，每 1/batch_hz 秒将积累的数据成批发送"""
+    data_updated = pyqtSignal(dict, object) # 数据更新信号，传递数据字典（值为数组）和x轴数组
+    data_recorded = pyqtSignal(dict, object) # 待存储数据信号，传递数据字典和采集时刻数组（Unix 纳秒）
 
-    def __init__(self):
+    def __init__(self, sample_rate=DEFAULT_SAMPLE_RATE, batch_hz=DEFAULT_BATCH_HZ):
+        """
+        :param sample_rate: 每秒采样点数
+        :param batch_hz: 每秒发送的批次数
+        """
         super().__init__()
+        self.sample_rate = sample_rate
+        self.batch_hz = batch_hz
         self._mutex = QMutex() # 互斥锁
         self._condition = QWaitCondition() # 条件变量
         self._is_paused = False # 暂停标志
         self._is_running = True  # 运行标志
-        self._is_stopped = False  # 新增停止标志
-        self.xtime = 0  # 将 xtime 移到类级别以便重置
+        self.xtime = 0  # 已产生的采样点数，即下一个点的 x 轴值
 
     def run(self):
-        xtime = 0
         keys = [k for k in _CONFIG.keys()]
+        offsets = np.arange(len(keys))
+        start = time.monotonic()
+        start_ns = time.time_ns()  # start 对应的真实时刻
+        produced = 0  # 自 start 起已产生的点数
         while self._is_running:
             self._mutex.lock()
-            if self._is_paused and not self._is_stopped:
+            paused = self._is_paused
+            if paused:
                 self._condition.wait(self._mutex)
-            elif self._is_stopped:
-                self.xtime = 0
-                self._is_stopped = False  # 重置停止标志
             self._mutex.unlock()
 
             # 判断退出标志，避免唤醒后继续执行
             if not self._is_running:
                 break
-            
+            if paused:
+                # 暂停期间不补发数据
+                start = time.monotonic()
+                start_ns = time.time_ns()
+                produced = 0
+
+            self.msleep(int(1000 / self.batch_hz))
+            due = int((time.monotonic() - start) * self.sample_rate)
+            n = due - produced
+            if n <= 0:
+                continue
+            # 各点的采集时刻
+            timestamps = start_ns + ((produced + np.arange(n)) * (1e9 / self.sample_rate)).astype(np.int64)
+            produced = due
+
             """ 生成模拟数据（此处可替换为真实数据源）"""
-            combined_data = {}
-            for i, key in enumerate(keys):
-                angle = xtime * 0.1 
-                combined_data[key] = math.sin(angle)+i
+            xtime = self.xtime + np.arange(n)
+            wave = np.sin(xtime * 0.1)
+            combined_data = {key: wave + i for key, i in zip(keys, offsets)}
+            self.xtime += n
 
             self.data_updated.emit(combined_data, xtime) # 发送数据更新信号
-            xtime += 1
-            self.msleep(100)
+            self.data_recorded.emit(combined_data, timestamps)
 
 
     def pause(self):
@@ -124,7 +161,6 @@ class DataThread(QThread):
     def stop(self):
         self._mutex.lock() # 获取锁
         self._is_running = False # 停止运行
-        self._is_stopped = True # 设置停止标志
         self._condition.wakeAll() # 唤醒所有等待的线程
         self._mutex.unlock() # 释放锁
 
@@ -304,19 +340,41 @@ class CurveDialog(QDialog, Ui_Dialog_Select):
 
 class DataPlotForm(QWidget, Ui_RTDataPlotForm):
     """运行时数据曲线显示窗体"""
-    def __init__(self):
+    def __init__(self, thread_factory=DataThread, buffer_size=BUFFER_SIZE, display_hz=DEFAULT_DISPLAY_HZ,
+                 record_format=FORMAT_CSV):
+        """
+        :param thread_factory: 创建数据获取线程的可调用对象，线程需提供 data_updated/data_recorded 信号
+                               与 pause/resume/stop，默认为模拟数据的 DataThread
+        :param buffer_size: 每条曲线保留的历史点数
+        :param display_hz: 每秒重绘次数；收到的数据先写入缓冲区，由定时器统一绘制
+        :param record_format: 保存数据的文件格式，FORMAT_CSV / FORMAT_HDF5
+        """
         super(DataPlotForm,self).__init__()
         self.setupUi(self)
         self.setWindowTitle('数据采集')
-        self.data_buffer = {}  
+        self.thread_factory = thread_factory
+        self.buffer_size = buffer_size
+        self.data_buffer = {}  # 曲线 key -> MinMaxPyramid
+        # 同一次发送的各曲线共用一个 x 轴缓冲区：数据源（发送的 key 组合） -> RingBuffer
+        self.x_buffer = {}
+        self.x_source = {}  # 曲线 key -> 所属数据源
+        self.dirty_keys = set()  # 上次重绘后收到新数据的曲线
+        self.view_dirty = False  # 暂停后手动缩放/平移了 X 轴，需按新的可见范围重新生成包络
+        self.pending_range = None  # 上次重绘后收到数据的 [最小值, 最大值]，用于自动 Y 轴
+        self.spinboxes = {}  # 曲线 key -> 数值显示框
         self.auto_y_scale = False  # 默认固定
         self.scroll_x_mode = False  # 默认固定
         self.should_save_data = False
         self.is_stopped = True
-        self.saved_rows = []
+        self.record_format = record_format
+        self.recorder = None  # 保存数据时的 DataRecorder
         self.init_plot_system()
         self.init_connections()
 
+        self.render_timer = QTimer(self)
+        self.render_timer.timeout.connect(self.render_plot)
+        self.render_timer.start(int(1000 / display_hz))
+
 
     def init_plot_system(self):
         """初始化绘图系统"""
@@ -327,11 +385,12 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
         self.plot_widget.setLabel('left', '数值')
         self.plot_widget.setLabel('bottom', '时间')
         self.gridLayout_plot.addWidget(self.plot_widget)
+        self.plot_widget.sigXRangeChanged.connect(self.on_x_range_changed)
 
 
         # 初始化组件
         self.curves = {}
-        self.data_thread = DataThread()
+        self.data_thread = self.thread_factory()
         self.init_curves()
         self.init_dataview()
 
@@ -344,10 +403,16 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
         self.pushButton_control.clicked.connect(self.plot_control)
         self.pushButton_stop.setIcon(QIcon(ICON_STOP))
         self.pushButton_stop.clicked.connect(self.stop_plotting)
-        self.data_thread.data_updated.connect(self.update_plot)
+        self.connect_thread(self.data_thread)
         self.horizontalSlider_X.valueChanged.connect(self.toggle_x_mode)
         self.horizontalSlider_Y.valueChanged.connect(self.toggle_y_autoscale)
-        self.checkBox_savedata.stateChanged.connect(self.toggle_save_data)
+
+
+
+    def connect_thread(self, thread):
+        """连接数据获取线程的信号"""
+        thread.data_updated.connect(self.update_plot)
+        thread.data_recorded.connect(self.record_data)
 
 
 
@@ -360,7 +425,25 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
         # 清空 data_buffer 中所有不可见的 key
         for key in list(self.data_buffer.keys()):
             if not _CONFIG.get(key, {}).get("visible", False):
-                del self.data_buffer[key]
+                self.drop_buffer(key)
+
+
+
+    def drop_buffer(self, key):
+        """移除曲线的数据缓冲区，数据源不再有曲线时一并移除其 x 轴缓冲区"""
+        del self.data_buffer[key]
+        self.dirty_keys.discard(key)
+        source = self.x_source.pop(key)
+        if source not in self.x_source.values():
+            del self.x_buffer[source]
+
+
+    def clear_buffers(self):
+        self.data_buffer.clear()
+        self.x_buffer.clear()
+        self.x_source.clear()
+        self.dirty_keys.clear()
+        self.pending_range = None
 
 
     def toggle_y_autoscale(self,value):
@@ -382,15 +465,6 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
 
 
     
-    def toggle_save_data(self,state):
-        """启用保存数据"""
-        if state == Qt.Checked:  # 启用保存数据
-            self.data_thread.save_data = True
-        else:  # 禁用保存数据
-            self.data_thread.save_data = False
-    
-
-
     def init_curves(self):
         """初始化曲线"""
         self.clear_curves()
@@ -422,6 +496,7 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
                 widget.setParent(None)
 
         # 重新添加可见参数的 label + spinbox
+        self.spinboxes.clear()
         row = 0
         for key, params in _CONFIG.items():
             if not params.get("visible", False):
@@ -439,6 +514,7 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
 
             self.gridLayout_dataview.addWidget(label, row, 0)
             self.gridLayout_dataview.addWidget(spinbox, row, 1)
+            self.spinboxes[key] = spinbox
             row += 1
 
         # 添加一个 vertical spacer 占据剩余空间，使控件靠上排列
@@ -449,68 +525,137 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
 
     def update_plot(self, data, xtime):
         """
-        更新 PyQtGraph 图表显示内容，包括曲线数据和相关控件状态。
+        将数据获取线程发送的数据写入缓冲区，由 render_plot 按显示频率统一绘制。
 
         参数:
-            data (dict): 包含各曲线键值对的字典，用于更新图表数据。
-            xtime (int): 当前时间戳，作为 X 轴最新数据点的时间基准。
+            data (dict): 包含各曲线键值对的字典，用于更新图表数据；值为单个数值或一批数值（numpy 数组）。
+            xtime (int | ndarray): 单个数值时为当前时间戳；成批数据时为与各值等长的 x 轴数组。
 
         返回值:
             无
         """
-        # 如果需要保存数据，则将数据添加到 saved_rows 中
-        if self.should_save_data:
-            row = []
-            for key in _CONFIG:
-                row.append(data.get(key, ""))
-            self.saved_rows.append(row)
-
-        # 遍历 curves 字典，更新每个曲线的数据
-        for key, curve in self.curves.items():
-            # 如果数据中包含该键，并且该键在 _CONFIG 中可见，则更新曲线数据
-            if key in data and _CONFIG.get(key, {}).get("visible", False):
-                # 如果该键不在 data_buffer 中，则创建一个 deque，最大长度为10000
-                if key not in self.data_buffer:
-                    self.data_buffer[key] = deque(maxlen=10000) 
-
-                # 将数据添加到 data_buffer 中
+        batched = np.ndim(xtime) > 0
+        if batched and len(xtime) == 0:
+            return
+        keys = [key for key in self.curves
+                if key in data and _CONFIG.get(key, {}).get("visible", False)]
+        if not keys:
+            return
+
+        # x 轴每次只写入一次，由本次发送的各曲线共用
+        source = tuple(data)
+        if source not in self.x_buffer:
+            self.x_buffer[source] = RingBuffer(self.buffer_size)
+        x_buffer = self.x_buffer[source]
+        if batched:
+            x_buffer.extend(xtime)
+        else:
+            x_buffer.append(xtime)
+
+        for key in keys:
+            # 曲线中途加入时其缓冲区比 x 轴短，两者按最新数据对齐
+            if key not in self.data_buffer:
+                start = x_buffer.total - (len(xtime) if batched else 1)
+                self.data_buffer[key] = MinMaxPyramid(self.buffer_size, start=start)
+                self.x_source[key] = source
+            if batched:
+                self.data_buffer[key].extend(data[key])
+            else:
                 self.data_buffer[key].append(data[key])
-                ydata_full = list(self.data_buffer[key])
-
-                # 构建完整 x 轴（以当前 xtime 为尾部）
-                start_xtime = xtime - len(ydata_full) + 1
-                xdata_full = list(range(start_xtime, xtime + 1))
-
-                # 决定显示区域
-                if self.scroll_x_mode:
-                    # 滚动模式：仅显示最近100个点
-                    ydata = ydata_full[-100:]
-                    xdata = xdata_full[-100:]
-                    self.plot_widget.setXRange(xdata[0], xdata[-1], padding=0)
-                else:
-                    # 固定模式：显示全部历史
-                    ydata = ydata_full
-                    xdata = xdata_full
-                    self.plot_widget.enableAutoRange(axis='x', enable=True)  # 可选：自动扩展X轴
-
-                # 如果 xdata 和 ydata 长度相同，则更新曲线数据
-                if len(xdata) == len(ydata):
-                    curve.setData(x=xdata, y=ydata)
-                    #  更新 SpinBox 的值
-                    spinbox = self.findChild(QDoubleSpinBox, f'doublespinbox_{key}')
-                    if spinbox:
-                        spinbox.setValue(ydata[-1])
-
-
-        # 自动 Y 轴缩放
+        self.dirty_keys.update(keys)
+
         if self.auto_y_scale:
-            # 获取所有可见数据的最小值和最大值
-            visible_data = [data[k] for k in data if _CONFIG.get(k, {}).get("visible", False)]
-            if visible_data:
-                min_val = min(visible_data)
-                max_val = max(visible_data)
-                # 设置 Y 轴范围，最小值为最小值的0.9倍，最大值为最大值的1.1倍
-                self.plot_widget.setYRange(min_val * 0.9, max_val * 1.1)
+            min_val = min(np.min(data[key]) for key in keys)
+            max_val = max(np.max(data[key]) for key in keys)
+            if self.pending_range is not None:
+                min_val = min(min_val, self.pending_range[0])
+                max_val = max(max_val, self.pending_range[1])
+            self.pending_range = [min_val, max_val]
+
+
+
+    def render_plot(self):
+        """
+        按显示频率重绘：把上次重绘后写入缓冲区的数据一次性交给曲线，并更新数值显示框和坐标轴范围。
+        """
+        if not self.dirty_keys:
+            if self.view_dirty:
+                self.render_view()
+            return
+        self.view_dirty = False
+
+        x_first, x_last = [], []
+        pixels = self.plot_pixels()
+        for key in self.dirty_keys:
+            buffer = self.data_buffer[key]
+            x_buffer = self.x_buffer[self.x_source[key]]
+            # 决定显示区域：滚动模式仅显示最近 SCROLL_POINTS 个点，固定模式显示全部历史
+            if self.scroll_x_mode:
+                n = min(len(buffer), SCROLL_POINTS)
+                # 传入缓冲区视图，不做列表转换
+                xview, yview = x_buffer.view(n), buffer.view(n)
+            else:
+                xview, yview = buffer.render(x_buffer, pixels=pixels)
+            if len(xview) == 0:
+                continue
+            self.curves[key].setData(x=xview, y=yview)
+            x_first.append(xview[0])
+            x_last.append(xview[-1])
+            #  更新 SpinBox 的值
+            spinbox = self.spinboxes.get(key)
+            if spinbox:
+                spinbox.setValue(buffer.last)
+        self.dirty_keys.clear()
+
+        if self.scroll_x_mode and x_first:
+            self.plot_widget.setXRange(min(x_first), max(x_last), padding=0)
+        else:
+            self.plot_widget.enableAutoRange(axis='x', enable=True)  # 可选：自动扩展X轴
+
+        # 自动 Y 轴缩放：使用上次重绘后收到数据的最小值和最大值
+        if self.auto_y_scale and self.pending_range is not None:
+            min_val, max_val = self.pending_range
+            # 设置 Y 轴范围，最小值为最小值的0.9倍，最大值为最大值的1.1倍
+            self.plot_widget.setYRange(min_val * 0.9, max_val * 1.1)
+        self.pending_range = None
+
+
+
+    def plot_pixels(self):
+        """绘图区宽度（像素），决定包络的块数"""
+        return max(int(self.plot_widget.getViewBox().width()), 100)
+
+
+
+    def on_x_range_changed(self, _, x_range):
+        """X 轴范围被手动改变（非自动范围）时，在下次重绘时按新范围重新生成包络"""
+        if not self.scroll_x_mode and not self.plot_widget.getViewBox().autoRangeEnabled()[0]:
+            self.view_dirty = True
+
+
+
+    def render_view(self):
+        """按当前可见范围重新生成各曲线的包络，不改变坐标轴范围"""
+        self.view_dirty = False
+        x0, x1 = self.plot_widget.getViewBox().viewRange()[0]
+        pixels = self.plot_pixels()
+        for key, buffer in self.data_buffer.items():
+            x, y = buffer.render(self.x_buffer[self.x_source[key]], x0, x1, pixels)
+            self.curves[key].setData(x=x, y=y)
+
+
+
+    def record_data(self, data, timestamps):
+        """
+        保存数据：数据获取线程发送的全部数据（成批数据为全速率，不受显示抽取影响），交给记录器在后台写入
+
+        参数:
+            data (dict): 值为单个数值或等长数组
+            timestamps: 采集时刻（Unix 纳秒），单个数值或与各值等长的数组
+        """
+        if self.recorder is not None:
+            self.recorder.write(data, timestamps)
+
 
 
     def plot_control(self):
@@ -534,8 +679,9 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
 
         # 如果当前处于停止状态，需要重新初始化绘图环境
         if self.is_stopped:
-            self.saved_rows.clear()
-            self.data_buffer.clear()
+            self.clear_buffers()
+            if self.should_save_data:
+                self.start_recording()
 
             for curve in self.curves.values():
                 curve.clear()
@@ -547,14 +693,16 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
             self.plot_widget.setXRange(0, 100, padding=0)
 
             # 启动新线程进行数据采集
-            self.data_thread = DataThread()
-            self.data_thread.data_updated.connect(self.update_plot)
+            self.data_thread = self.thread_factory()
+            self.connect_thread(self.data_thread)
             self.data_thread.start()
 
             self.is_stopped = False  # 标记为非停止
         else:
             # 当前处于暂停状态，恢复数据采集线程
             self.data_thread.resume()
+        # 成批数据源仅在需要保存时解析全速率数据；是否保存在开始时确定，暂停期间勾选"保存数据"不影响本次采集
+        self.data_thread.record_enabled = self.recorder is not None
 
         self.pushButton_control.setText("暂停")
         self.pushButton_control.setIcon(QIcon(ICON_PAUSE))
@@ -572,47 +720,41 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
 
     def stop_plotting(self):
         """
-        停止数据采集和绘图，并保存已收集的数据到CSV文件
+        停止数据采集和绘图，并结束数据保存
         
         该函数执行以下操作：
-        1. 停止数据采集线程
+        1. 停止数据采集线程，并处理线程退出前发出的最后一批数据
         2. 更新控制按钮状态为"开始"
         3. 设置停止标志
-        4. 如果需要保存数据且存在已收集数据，则将数据保存到CSV文件
+        4. 如果正在保存数据，写完剩余数据并关闭记录文件
         """
         self.data_thread.stop()
+        self.data_thread.wait()
+        QCoreApplication.sendPostedEvents(self)  # 线程退出前排队的信号
+        self.render_plot()  # 绘制最后一批数据
         self.pushButton_control.setText("开始")
         self.pushButton_control.setIcon(QIcon(ICON_PLAY))
         self.is_stopped = True
 
-        # 如果需要保存数据且存在已收集的数据，则保存到CSV文件
-        if self.should_save_data and self.saved_rows:
-            # 生成带时间戳的文件名
-            timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-            filename = f"试验数据_{timestamp}.csv"
-            save_path = _BASE_PATH / f'saveddata/{filename}'
+        self.stop_recording()
+
 
-            # 写入 CSV 文件
-            with open(save_path, mode='w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.writer(f)
 
-                # 写表头
-                header = ["时间戳"]+[v["name"] for k, v in _CONFIG.items()]
-                writer.writerow(header)
+    def start_recording(self):
+        """创建带时间戳的记录文件，开始流式保存数据"""
+        timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        columns = [(key, params["name"], params.get("unit", "")) for key, params in _CONFIG.items()]
+        self.recorder = DataRecorder(_BASE_PATH / f'saveddata/试验数据_{timestamp}', columns, self.record_format)
 
-                # 单位行（第2行）：单位
-                unit_row = ["ms"] + [v.get("unit", "") for k, v in _CONFIG.items()]
-                writer.writerow(unit_row)
 
-                # 写数据（为每行加时间戳）
-                start_time = datetime.datetime.now()
-                for i, row in enumerate(self.saved_rows):
-                    row_time = start_time + datetime.timedelta(milliseconds=100 * i)  # 假设每100ms一条
-                    timestr = row_time.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]  # 精确到毫秒
-                    writer.writerow([timestr] + row)
 
-            print(f"数据已保存至：{save_path}")
-            self.saved_rows = []  # 清空旧数据
+    def stop_recording(self):
+        """写完剩余数据并关闭记录文件"""
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return
+        recorder.close()
+        print(f"数据已保存至：{recorder.path}（{recorder.rows} 行）")
 
 
 
@@ -633,9 +775,7 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
         # 同步数据缓冲区与更新后的配置
         for key in list(self.data_buffer.keys()):
             if not updated_config.get(key, {}).get("visible", False):
-                del self.data_buffer[key]  # 移除隐藏曲线的数据缓冲区
-            else:
-                self.data_buffer.setdefault(key, [])  # 确保可见曲线拥有数据缓冲区
+                self.drop_buffer(key)  # 移除隐藏曲线的数据缓冲区
 
         self.init_curves()  # 根据新配置重新初始化曲线
         self.init_dataview()  # 重新初始化数据视图
@@ -643,8 +783,10 @@ class DataPlotForm(QWidget, Ui_RTDataPlotForm):
 
     def closeEvent(self, event):
         # 停止线程安全退出
+        self.render_timer.stop()
         self.data_thread.stop()
         self.data_thread.wait()
+        self.stop_recording()
         super().closeEvent(event)
 
 
@@ -0,0 +1,170 @@
+"""
+功能描述：DataPlotForm.update_plot 性能基准
+
+在不同曲线数、缓冲区长度下，对比原实现（deque 缓冲 + 每次转换为列表再 setData）
+与现实现（RingBuffer 缓冲 + 最小/最大值包络）的单次 update_plot + render_plot 耗时（毫秒）。
+每组先把缓冲区写满，再分别测量逐点发送（1 个点）与成批发送（33 个点，约 1 kHz / 30 Hz）。
+另测量 1 kHz 逐点发送时，每秒界面线程的总耗时：原实现每个点重绘一次，
+现实现每个点只写缓冲区、每秒重绘 DEFAULT_DISPLAY_HZ 次。
+最后测量单条曲线缓冲区为 10 万 ~ 1000 万点时，MinMaxPyramid 的写入吞吐量，
+以及全范围包络生成 + setData + 绘制一帧的耗时，对比直接把全部数据交给 setData 后绘制。
+
+运行：python -m src.components.RTDataPlot.bench_update_plot
+"""
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+from PyQt5.QtWidgets import QApplication, QDoubleSpinBox
+import pyqtgraph as pg
+from src.components.RTDataPlot.RTdata_plot_demo import DataPlotForm, curve_config, DEFAULT_DISPLAY_HZ
+from src.components.RTDataPlot.ring_buffer import RingBuffer
+from src.components.RTDataPlot.lod import MinMaxPyramid
+
+BATCH = 33
+RATE = 1000
+
+
+def _timeit(func, budget=0.5):
+    """重复执行直到耗时超过 budget 秒，返回单次平均耗时"""
+    count = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= budget:
+            return elapsed / count
+
+
+class Rendered:
+    """每次 update_plot 后立即 render_plot，与原实现逐次重绘对比"""
+    def __init__(self, form):
+        self.form = form
+
+    def update_plot(self, data, xtime):
+        self.form.update_plot(data, xtime)
+        self.form.render_plot()
+
+
+class LegacyBuffers:
+    """原实现：每条曲线一个 deque，每次更新把整个缓冲区转换为列表后 setData"""
+    def __init__(self, form, capacity):
+        self.form = form
+        self.y = {key: deque(maxlen=capacity) for key in form.curves}
+        self.x = {key: deque(maxlen=capacity) for key in form.curves}
+
+    def update_plot(self, data, xtime):
+        batched = np.ndim(xtime) > 0
+        for key, curve in self.form.curves.items():
+            if batched:
+                self.y[key].extend(np.asarray(data[key]).tolist())
+                self.x[key].extend(np.asarray(xtime).tolist())
+            else:
+                self.y[key].append(data[key])
+                self.x[key].append(xtime)
+            ydata = list(self.y[key])
+            xdata = list(self.x[key])
+            curve.setData(x=xdata, y=ydata)
+            spinbox = self.form.findChild(QDoubleSpinBox, f'doublespinbox_{key}')
+            if spinbox:
+                spinbox.setValue(ydata[-1])
+
+
+def bench_config(n_curves):
+    """临时替换曲线配置（仅内存中，不写回配置文件），返回原配置"""
+    config = curve_config()
+    saved = dict(config)
+    config.clear()
+    for i in range(n_curves):
+        config[f"bench{i}"] = {"name": f"曲线{i}", "color": "#FF0000", "visible": True}
+    return saved
+
+
+def bench(curve_counts=(1, 8, 32), buffer_sizes=(1000, 10000, 100000)):
+    print(f"{'实现':<12}{'曲线数':>8}{'缓冲长度':>10}{'逐点(ms)':>12}{'成批(ms)':>12}{'1kHz(ms/s)':>14}")
+    config = curve_config()
+    for n_curves in curve_counts:
+        saved = bench_config(n_curves)
+        try:
+            for size in buffer_sizes:
+                form = DataPlotForm(buffer_size=size)
+                legacy = LegacyBuffers(form, size)
+                keys = list(form.curves)
+                batch = {key: np.sin(np.arange(BATCH) * 0.1) + i for i, key in enumerate(keys)}
+                state = {"x": 0}
+
+                def point(target):
+                    state["x"] += 1
+                    target.update_plot({key: float(i) for i, key in enumerate(keys)}, state["x"])
+
+                def batched(target):
+                    x = state["x"] + np.arange(1, BATCH + 1, dtype=np.float64)
+                    state["x"] += BATCH
+                    target.update_plot(batch, x)
+
+                def second():
+                    """1 秒的数据逐点到达，期间按显示频率重绘"""
+                    per_frame = RATE // DEFAULT_DISPLAY_HZ
+                    for i in range(RATE):
+                        point(form)
+                        if i % per_frame == 0:
+                            form.render_plot()
+
+                for name, target in (("原实现", legacy), ("DataPlotForm", Rendered(form))):
+                    # 一次发送 size 个点写满缓冲区
+                    target.update_plot({key: np.zeros(size) for key in keys}, np.arange(size, dtype=np.float64))
+                    state["x"] = size
+                    t_point = _timeit(lambda: point(target))
+                    t_batch = _timeit(lambda: batched(target))
+                    t_second = (t_point * RATE) if target is legacy else _timeit(second, budget=1.0)
+                    print(f"{name:<12}{n_curves:>8}{size:>10}{t_point * 1e3:>12.3f}{t_batch * 1e3:>12.3f}"
+                          f"{t_second * 1e3:>14.0f}")
+                form.deleteLater()
+        finally:
+            config.clear()
+            config.update(saved)
+
+
+def bench_lod(buffer_sizes=(100000, 1000000, 10000000), pixels=1000):
+    print(f"\n{'缓冲长度':>10}{'写入(点/秒)':>16}{'包络点数':>10}{'包络绘制(ms)':>16}{'全部绘制(ms)':>16}")
+    widget = pg.PlotWidget()
+    widget.resize(pixels, 400)
+    widget.show()
+    curve = widget.plot()
+    for size in buffer_sizes:
+        x_buffer = RingBuffer(size)
+        pyramid = MinMaxPyramid(size)
+        x = np.arange(size, dtype=np.float64)
+        y = np.sin(x * 1e-3) + np.random.default_rng(0).normal(scale=0.1, size=size)
+        start = time.perf_counter()
+        for i in range(0, size, BATCH * 30):
+            x_buffer.extend(x[i:i + BATCH * 30])
+            pyramid.extend(y[i:i + BATCH * 30])
+        t_write = time.perf_counter() - start
+
+        def draw_lod():
+            xs, ys = pyramid.render(x_buffer, pixels=widget.getViewBox().width())
+            curve.setData(x=xs, y=ys)
+            widget.grab()
+
+        def draw_full():
+            curve.setData(x=x_buffer.view(), y=pyramid.view())
+            widget.grab()
+
+        t_lod = _timeit(draw_lod)
+        n_points = len(curve.getData()[0])
+        t_full = _timeit(draw_full, budget=1.0)
+        print(f"{size:>10}{size / t_write:>16,.0f}{n_points:>10}{t_lod * 1e3:>16.2f}{t_full * 1e3:>16.1f}")
+    widget.close()
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    bench()
+    bench_lod()
@@ -0,0 +1,181 @@
+'''
+总线数据源
+=========
+
+从 RS422Manager 的通道帧旁路持续解析选定的协议字段，按批送往 DataPlotForm：
+
+- 曲线配置中带 "source" 的项由总线数据驱动，例如
+  "data1": {"name": "帧计数", ..., "source": {"channel": "1", "TorR": "Rx", "field": "帧计数"}}
+  数组字段可用 "index" 指定元素
+- 每个显示周期（display_hz）取出各通道方向积累的全部帧，一次 numpy 批量解析
+- data_updated 发送按 plot_rate 抽取后的数据，供绘图；
+  record_enabled 为 True 时另外解析全部帧，经 data_recorded 发送全速率数据及各帧的采集时刻（Unix 纳秒），供存储
+- x 轴为自线程启动起的秒数（帧的 monotonic 时间戳）
+'''
+
+import time
+from collections import defaultdict
+
+import numpy as np
+from PyQt5.QtCore import QThread, QMutex, QWaitCondition, pyqtSignal
+
+from src.components.BusDataMonitor.monitor.busdata_parser import BusDataParser
+from src.components.BusDataMonitor.protocol import protocol_registry
+
+DEFAULT_DISPLAY_HZ = 30   # 每秒发送到界面的批次数
+DEFAULT_PLOT_RATE = 200   # 每条曲线每秒最多绘制的点数
+
+
+def bus_sources(config):
+    """从曲线配置中取出带 source 的项：{key: source}"""
+    return {key: params["source"] for key, params in config.items() if params.get("source")}
+
+
+class _SourceGroup:
+    """同一通道方向的若干曲线：共用一个帧旁路与一次批量解析"""
+    def __init__(self, ch_id, tor, protocol_name):
+        self.ch_id = ch_id
+        self.tor = tor
+        self.parser = protocol_registry.parser(protocol_name)
+        protocol = protocol_registry.get(protocol_name)
+        self.frame_size = protocol.get("protocol_length") or self.parser.min_length
+        self.fields = {}
+        for f in self.parser.fields:
+            self.fields.setdefault(f.name, f)  # 重名字段取第一个
+        self.curves = []  # [(key, CompiledField, 数组元素序号或 None)]
+        self.tap = None
+        self.last_bin = None  # 上一个已绘制点所在的抽取时间格
+
+    def add(self, key, source):
+        name = source["field"]
+        if name not in self.fields:
+            raise KeyError(f"通道 {self.ch_id} {self.tor} 的协议中不存在字段: {name}")
+        self.curves.append((key, self.fields[name], source.get("index")))
+
+    def decode(self, data):
+        """批量解析 (N, L) 帧数组中各曲线的字段值"""
+        windows = {}
+        values = {}
+        for key, f, index in self.curves:
+            column = BusDataParser.numeric_column(data, f, windows=windows)
+            if column.ndim == 2:
+                column = column[:, 0 if index is None else index]
+            values[key] = column.astype(np.float64, copy=False)
+        return values
+
+    def decimate(self, x, plot_rate):
+        """按时间抽取：每 1/plot_rate 秒的时间格内只保留第一个点，与帧率无关"""
+        bins = np.floor(x * plot_rate).astype(np.int64)
+        prev = np.empty_like(bins)
+        prev[0] = bins[0] - 1 if self.last_bin is None else self.last_bin
+        prev[1:] = bins[:-1]
+        self.last_bin = int(bins[-1])
+        return np.flatnonzero(bins != prev)
+
+
+class BusDataThread(QThread):
+    """总线数据获取线程，接口与 DataThread 一致（pause/resume/stop）"""
+    data_updated = pyqtSignal(dict, object)   # {key: ndarray}, x ndarray（抽取后）
+    data_recorded = pyqtSignal(dict, object)  # {key: ndarray}, 采集时刻 ndarray（全速率，Unix 纳秒）
+
+    def __init__(self, manager, sources, display_hz=DEFAULT_DISPLAY_HZ, plot_rate=DEFAULT_PLOT_RATE):
+        """
+        :param manager: 已启动的 RS422Manager
+        :param sources: {曲线 key: {"channel", "TorR", "field"[, "index"]}}，见 bus_sources()
+        :param display_hz: 每秒向界面发送的批次数
+        :param plot_rate: 每条曲线每秒最多发送的显示点数，为 None 时不抽取
+        """
+        super().__init__()
+        self.manager = manager
+        self.display_hz = display_hz
+        self.plot_rate = plot_rate
+        self.record_enabled = False
+        self._mutex = QMutex()
+        self._condition = QWaitCondition()
+        self._is_paused = False
+        self._is_running = True
+
+        groups = {}
+        for key, source in sources.items():
+            ch_id, tor = str(source["channel"]), source["TorR"]
+            group = groups.get((ch_id, tor))
+            if group is None:
+                protocol_name = manager.config[ch_id].get("protocol", {}).get(tor)
+                if not protocol_name:
+                    raise KeyError(f"通道 {ch_id} {tor} 未配置协议")
+                group = groups[(ch_id, tor)] = _SourceGroup(ch_id, tor, protocol_name)
+            group.add(key, source)
+        self.groups = list(groups.values())
+        self.frames = defaultdict(int)  # (ch_id, tor) -> 已解析帧数
+
+    def run(self):
+        for group in self.groups:
+            group.tap = self.manager.subscribe(group.ch_id, group.tor, group.frame_size)
+        t0 = time.monotonic_ns()
+        self._wall_offset = time.time_ns() - t0  # 帧的 monotonic 时间戳 → Unix 时间
+        period = 1.0 / self.display_hz
+        deadline = time.monotonic()
+        try:
+            while self._is_running:
+                self._mutex.lock()
+                paused = self._is_paused
+                if paused:
+                    self._condition.wait(self._mutex)
+                self._mutex.unlock()
+                if not self._is_running:
+                    break
+                if paused:
+                    # 暂停期间积累的帧不再显示
+                    for group in self.groups:
+                        group.tap.read()
+                        group.last_bin = None
+                    deadline = time.monotonic()
+
+                deadline += period
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    deadline = time.monotonic()  # 落后时不追赶
+
+                for group in self.groups:
+                    self._process(group, t0)
+        finally:
+            for group in self.groups:
+                if group.tap is not None:
+                    self.manager.unsubscribe(group.ch_id, group.tor, group.tap)
+                    group.tap = None
+
+    def _process(self, group, t0):
+        ts, data = group.tap.read()
+        if len(ts) == 0:
+            return
+        self.frames[(group.ch_id, group.tor)] += len(ts)
+        x = (ts - t0) / 1e9
+        keep = group.decimate(x, self.plot_rate) if self.plot_rate else None
+
+        if self.record_enabled:
+            values = group.decode(data)
+            self.data_recorded.emit(values, ts + self._wall_offset)
+            if keep is not None:
+                values = {key: v[keep] for key, v in values.items()}
+        else:
+            values = group.decode(data if keep is None else data[keep])
+        self.data_updated.emit(values, x if keep is None else x[keep])
+
+    def pause(self):
+        self._mutex.lock()
+        self._is_paused = True
+        self._mutex.unlock()
+
+    def resume(self):
+        self._mutex.lock()
+        self._is_paused = False
+        self._condition.wakeAll()
+        self._mutex.unlock()
+
+    def stop(self):
+        self._mutex.lock()
+        self._is_running = False
+        self._condition.wakeAll()
+        self._mutex.unlock()
@@ -0,0 +1,246 @@
+'''
+曲线数据记录器
+=============
+
+采集线程发送的数据由界面线程入队后立即返回，唯一的 I/O 线程批量取出写入追加式文件，并定时 flush，
+异常退出时最多丢失 flush_interval 秒的数据；内存占用与记录时长无关。
+
+- CSV（.csv）：第 1 行列名、第 2 行单位、之后每行一个采样点，时间戳为采集时刻（本地时间，精确到毫秒），
+  格式与 DataReplay 兼容
+- HDF5（.h5）：列式存储，/timestamp 为采集时刻（Unix 纳秒，int64），/columns/{key} 为各曲线数据（float64，
+  缺失为 NaN），属性 name/unit；文件属性 columns 记录列顺序。可由 read_record() 读取
+'''
+
+import csv
+import time
+import threading
+from collections import deque
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pandas as pd
+
+FORMAT_CSV = "csv"
+FORMAT_HDF5 = "h5"
+RECORD_FORMATS = (FORMAT_CSV, FORMAT_HDF5)
+
+
+_OFFSET_STEP_NS = 60 * 10**9     # 时区偏移（夏令时切换）只在整分钟处变化
+_OFFSET_TABLE_MAX = 1 << 20     # 时间跨度不超过该分钟数时按分钟查表，否则只计算出现过的分钟
+_OFFSET_STABLE_MINUTES = 7 * 24 * 60  # 两次时区偏移切换至少相隔的分钟数
+
+
+def _utc_offsets_ns(timestamps_ns):
+    """各时间戳所在时刻的本地时区偏移（纳秒），跨越夏令时切换的记录各自使用当时的偏移"""
+    minutes = timestamps_ns // _OFFSET_STEP_NS
+    if not len(minutes):
+        return np.zeros(0, dtype=np.int64)
+    first, last = int(minutes.min()), int(minutes.max())
+    if last - first < _OFFSET_TABLE_MAX:
+        keys, index = np.arange(first, last + 1), minutes - first
+    else:
+        keys, index = np.unique(minutes, return_inverse=True)
+    # 偏移在一次记录中通常不变，只在变化处逐分钟计算
+    offsets = np.empty(len(keys), dtype=np.int64)
+    _fill_offsets(offsets, keys, 0, len(keys) - 1)
+    return offsets[index]
+
+
+def _fill_offsets(offsets, keys, lo, hi):
+    """二分填充 keys[lo:hi+1] 的偏移：区间不超过一周且两端相同即视为区间内不变"""
+    offsets[lo] = time.localtime(int(keys[lo]) * 60).tm_gmtoff * 10**9
+    offsets[hi] = time.localtime(int(keys[hi]) * 60).tm_gmtoff * 10**9
+    stable = offsets[lo] == offsets[hi] and keys[hi] - keys[lo] <= _OFFSET_STABLE_MINUTES
+    if stable or hi - lo <= 1:
+        offsets[lo:hi] = offsets[lo]
+        return
+    mid = (lo + hi) // 2
+    _fill_offsets(offsets, keys, lo, mid)
+    _fill_offsets(offsets, keys, mid, hi)
+
+
+def to_local_datetime(timestamps_ns):
+    """Unix 纳秒时间戳 → 本地时间 datetime64[ns]（按各时刻当时的时区偏移换算）"""
+    timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+    return (timestamps_ns + _utc_offsets_ns(timestamps_ns)).astype("datetime64[ns]")
+
+
+def _local_time_strings(timestamps_ns):
+    """Unix 纳秒时间戳 → 本地时间字符串 'YYYY-mm-dd HH:MM:SS.fff'"""
+    text = np.datetime_as_string(to_local_datetime(timestamps_ns), unit="ms")
+    return [s.replace("T", " ") for s in text]
+
+
+class _CsvFile:
+    def __init__(self, path, columns):
+        self.columns = columns
+        self.file = open(path, mode='w', newline='', encoding='utf-8-sig')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["时间戳"] + [name for _, name, _ in columns])
+        self.writer.writerow(["ms"] + [unit for _, _, unit in columns])
+
+    def write(self, timestamps, data):
+        n = len(timestamps)
+        values = [np.asarray(data[key]).tolist() if key in data else [""] * n for key, _, _ in self.columns]
+        self.writer.writerows(zip(_local_time_strings(timestamps), *values))
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class _Hdf5File:
+    def __init__(self, path, columns, chunk_rows=4096):
+        self.columns = columns
+        self.file = h5py.File(path, 'w')
+        self.file.attrs["columns"] = [key for key, _, _ in columns]
+        self.length = 0
+        self.timestamp = self.file.create_dataset(
+            "timestamp", shape=(0,), maxshape=(None,), dtype='i8', chunks=(chunk_rows,)
+        )
+        self.datasets = {}
+        for key, name, unit in columns:
+            dset = self.file.create_dataset(
+                f"columns/{key}", shape=(0,), maxshape=(None,), dtype='f8', chunks=(chunk_rows,)
+            )
+            dset.attrs["name"] = name
+            dset.attrs["unit"] = unit
+            self.datasets[key] = dset
+
+    def write(self, timestamps, data):
+        n = len(timestamps)
+        start, end = self.length, self.length + n
+        self.timestamp.resize(end, axis=0)
+        self.timestamp[start:end] = timestamps
+        for key, dset in self.datasets.items():
+            dset.resize(end, axis=0)
+            dset[start:end] = np.asarray(data[key], dtype='f8') if key in data else np.nan
+        self.length = end
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class DataRecorder:
+    """
+    流式数据记录器
+
+    write() 只把 (时间戳数组, 数据字典) 追加到队列；I/O 线程持有文件句柄，取出全部排队的批次依次写入，
+    并每 flush_interval 秒 flush 一次。
+    """
+    def __init__(self, path, columns, record_format=FORMAT_CSV, drain_interval=0.1, flush_interval=2):
+        """
+        :param path: 文件路径，未带扩展名时按 record_format 补全
+        :param columns: [(key, 名称, 单位)]，决定列顺序；数据中缺少的列留空（HDF5 为 NaN）
+        :param record_format: FORMAT_CSV / FORMAT_HDF5
+        :param drain_interval: 队列为空时 I/O 线程的轮询周期(s)
+        :param flush_interval: 定时 flush 周期(s)
+        """
+        if record_format not in RECORD_FORMATS:
+            raise ValueError(f"未知的记录格式: {record_format}")
+        path = Path(path)
+        if path.suffix != f".{record_format}":
+            path = path.with_name(f"{path.name}.{record_format}")
+        self.path = path
+        self.columns = list(columns)
+        self.record_format = record_format
+        self.drain_interval = drain_interval
+        self.flush_interval = flush_interval
+        self.rows = 0
+        self.write_errors = 0
+
+        # deque 的 append/popleft 在 CPython 中是原子操作，界面线程无需加锁
+        self._queue = deque()
+        self._file = None
+        self._error = None
+        self._ready = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._io_worker, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def write(self, data, timestamps):
+        """
+        入队一批数据，立即返回
+        :param data: {key: 数值或数组}
+        :param timestamps: 采集时刻（Unix 纳秒），与 data 的值等长；单个数值时为一个采样点
+        """
+        if np.ndim(timestamps) == 0:
+            timestamps = [timestamps]
+            data = {key: [value] for key, value in data.items()}
+        if len(timestamps):
+            self._queue.append((np.asarray(timestamps, dtype=np.int64), data))
+
+    def _drain(self):
+        q = self._queue
+        n = len(q)
+        for _ in range(n):
+            timestamps, data = q.popleft()
+            try:
+                self._file.write(timestamps, data)
+                self.rows += len(timestamps)
+            except Exception as e:
+                self.write_errors += len(timestamps)
+                print(f"[DataRecorder] {self.path} 写入失败: {e}")
+        return n
+
+    def _io_worker(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.record_format == FORMAT_CSV:
+                self._file = _CsvFile(self.path, self.columns)
+            else:
+                self._file = _Hdf5File(self.path, self.columns)
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        last_flush = time.monotonic()
+        while True:
+            stopping = self._stop_event.is_set()
+            drained = self._drain()
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._file.flush()
+                last_flush = time.monotonic()
+            if drained:
+                continue
+            if stopping:
+                break
+            self._stop_event.wait(self.drain_interval)
+
+        self._file.close()
+
+    def close(self):
+        """停止接收并在 I/O 线程中写完剩余数据后关闭文件"""
+        self._stop_event.set()
+        self._thread.join()
+
+
+def read_record(path):
+    """
+    读取 HDF5 记录文件
+    :return: DataFrame，索引为采集时刻（本地时间），列为 (名称, 单位) 两级列名，与 CSV 读取结果一致
+    """
+    with h5py.File(path, 'r') as f:
+        length = f["timestamp"].shape[0]
+        columns = {}
+        for key in f.attrs["columns"]:
+            dset = f[f"columns/{key}"]
+            # 异常退出时各数据集长度可能不一致，按最短的对齐
+            length = min(length, dset.shape[0])
+            columns[(dset.attrs["name"], dset.attrs["unit"])] = dset
+        timestamps = f["timestamp"][:length]
+        df = pd.DataFrame({col: dset[:length] for col, dset in columns.items()})
+    df.index = pd.DatetimeIndex(to_local_datetime(timestamps))
+    df.columns = pd.MultiIndex.from_tuples(df.columns)
+    return df
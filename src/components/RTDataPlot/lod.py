@@ -0,0 +1,153 @@
+import math
+
+import numpy as np
+
+from src.components.RTDataPlot.ring_buffer import RingBuffer
+
+LOD_FACTOR = 4  # 相邻两级之间的合并倍数
+
+
+def _reduce(src_min, src_max, dst_min, dst_max, factor):
+    """把 src 中新凑满的每 factor 个数据合并为 dst 的一个 [最小值, 最大值] 块，返回是否有新块"""
+    done = dst_min.total
+    new = src_min.total // factor - done
+    if new <= 0:
+        return False
+    start = done * factor
+    oldest = src_min.total - len(src_min)
+    if start < oldest:
+        # 源数据已被覆盖（或曲线中途加入时首块不完整），这些块记为 NaN
+        skip = min(new, -(-(oldest - start) // factor))
+        gap = np.full(skip, np.nan)
+        dst_min.extend(gap)
+        dst_max.extend(gap)
+        new -= skip
+        start += skip * factor
+    if new > 0:
+        count = new * factor
+        dst_min.extend(np.fmin.reduce(src_min.since(start)[:count].reshape(new, factor), axis=1))
+        dst_max.extend(np.fmax.reduce(src_max.since(start)[:count].reshape(new, factor), axis=1))
+    return True
+
+
+class MinMaxPyramid:
+    """
+    带多级最小/最大值包络的曲线数据缓冲区
+
+    原始数据保存在 RingBuffer 中，第 k 级把每 factor**k 个原始数据合并为一个 [最小值, 最大值] 块，
+    随数据写入逐级增量更新，均摊开销 O(1)。render() 根据可见范围选择块数不超过像素宽度的一级，
+    每块输出最小、最大两个点：绘制点数约为 2 倍像素宽度，与缓冲区长度无关，且不丢失尖峰。
+
+    数据按绝对序号与共用的 x 轴 RingBuffer 对齐（见 RingBuffer.total）。
+    """
+    def __init__(self, capacity, start=0, factor=LOD_FACTOR):
+        """
+        :param capacity: 保留的原始数据个数
+        :param start: 第一个数据的绝对序号，即创建时 x 轴缓冲区的 total
+        :param factor: 相邻两级之间的合并倍数
+        """
+        self.factor = factor
+        self.raw = RingBuffer(capacity, start=start)
+        self.levels = []  # [(最小值 RingBuffer, 最大值 RingBuffer)]，第 i 项为第 i+1 级
+        size = factor
+        while size < capacity:
+            level_capacity = -(-capacity // size) + 1
+            self.levels.append((RingBuffer(level_capacity, start=start // size),
+                                RingBuffer(level_capacity, start=start // size)))
+            size *= factor
+
+    def __len__(self):
+        return len(self.raw)
+
+    @property
+    def total(self):
+        return self.raw.total
+
+    @property
+    def last(self):
+        return self.raw.last
+
+    def append(self, value):
+        self.raw.append(value)
+        if self.raw.total % self.factor == 0:
+            self._update_levels()
+
+    def extend(self, values):
+        self.raw.extend(values)
+        self._update_levels()
+
+    def _update_levels(self):
+        src = (self.raw, self.raw)
+        for level in self.levels:
+            # 本级没有新块时更高级也不会有
+            if not _reduce(*src, *level, self.factor):
+                break
+            src = level
+
+    def view(self, n=None):
+        """最近 n 个原始数据的视图"""
+        return self.raw.view(n)
+
+    def render(self, x_buffer, x0=-math.inf, x1=math.inf, pixels=1000):
+        """
+        生成 [x0, x1] 范围内用于绘制的数据
+
+        :param x_buffer: 共用的 x 轴 RingBuffer（x 单调递增）
+        :param pixels: 绘图区宽度（像素）
+        :return: (x, y)；范围内点数不超过 pixels 时为原始数据视图，否则为最小/最大值交替的包络
+        """
+        lo = max(self.raw.total - len(self.raw), x_buffer.total - len(x_buffer))
+        hi = min(self.raw.total, x_buffer.total)
+        if hi <= lo:
+            return np.empty(0), np.empty(0)
+        xv = x_buffer.since(lo)[:hi - lo]
+        # 范围两端各多取一个点，使曲线延伸到绘图区边缘
+        i0 = lo + max(int(np.searchsorted(xv, x0, side="left")) - 1, 0)
+        i1 = lo + min(int(np.searchsorted(xv, x1, side="right")) + 1, hi - lo)
+        n = i1 - i0
+
+        k = 0
+        size = 1
+        while n > pixels * size and k < len(self.levels):
+            k += 1
+            size *= self.factor
+        if k == 0:
+            return xv[i0 - lo:i1 - lo], self.raw.since(i0)[:n]
+
+        level_min, level_max = self.levels[k - 1]
+        complete = level_min.total
+        b0 = max(i0 // size, -(-lo // size), complete - len(level_min))
+        b1 = min(-(-i1 // size), complete)
+        count = max(b1 - b0, 0)
+
+        # 首尾不完整（或该级已不保存）的部分直接由原始数据计算
+        head_end = min(b0 * size, i1)
+        head = head_end > i0
+        tail_start = max(b1 * size, head_end, i0)
+        tail = i1 > tail_start
+        first = 1 if head else 0
+        m = first + count + (1 if tail else 0)
+        xs = np.empty(m)
+        mins = np.empty(m)
+        maxs = np.empty(m)
+        xs[first:first + count] = xv[b0 * size - lo:b1 * size - lo:size][:count]
+        mins[first:first + count] = level_min.since(b0)[:count]
+        maxs[first:first + count] = level_max.since(b0)[:count]
+        if head:
+            part = self.raw.since(i0)[:head_end - i0]
+            xs[0], mins[0], maxs[0] = xv[i0 - lo], np.fmin.reduce(part), np.fmax.reduce(part)
+        if tail:
+            part = self.raw.since(tail_start)[:i1 - tail_start]
+            xs[-1], mins[-1], maxs[-1] = xv[tail_start - lo], np.fmin.reduce(part), np.fmax.reduce(part)
+
+        x = np.repeat(xs, 2)
+        y = np.empty(2 * m)
+        y[0::2] = mins
+        y[1::2] = maxs
+        return x, y
+
+    def clear(self):
+        self.raw.clear()
+        for level_min, level_max in self.levels:
+            level_min.clear()
+            level_max.clear()
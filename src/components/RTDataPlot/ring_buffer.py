@@ -0,0 +1,74 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    定长数据缓冲区（numpy 预分配）
+
+    存储区为 2 倍容量的连续数组，新数据依次写入尾部，写满时把最近 capacity 个数据搬回开头，
+    搬移的开销均摊到每次写入上为 O(1)。view() 返回最近数据的连续视图，可直接交给 setData，无需拷贝。
+    视图在下一次写入前有效。
+
+    total 为累计写入个数，即最新数据之后的绝对序号；缓冲区中保存的是绝对序号 [total - len, total) 的数据。
+    """
+    def __init__(self, capacity, dtype=np.float64, start=0):
+        """
+        :param start: 第一个数据的绝对序号，用于与先创建的缓冲区（如共用的 x 轴）按序号对齐
+        """
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._end = 0   # 最新数据之后的位置
+        self._size = 0  # 有效数据个数（不超过 capacity）
+        self.total = start
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, n):
+        """保证尾部还能写入 n 个数据（n <= capacity）"""
+        if self._end + n > len(self._data):
+            keep = min(self._size, self.capacity - n)
+            self._data[:keep] = self._data[self._end - keep:self._end]
+            self._end = keep
+            self._size = keep
+
+    def append(self, value):
+        self._reserve(1)
+        self._data[self._end] = value
+        self._end += 1
+        self._size = min(self._size + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, values):
+        values = np.asarray(values)
+        n = len(values)
+        if n == 0:
+            return
+        self.total += n
+        if n >= self.capacity:
+            values = values[-self.capacity:]
+            n = self.capacity
+            self._end = self._size = 0
+        self._reserve(n)
+        self._data[self._end:self._end + n] = values
+        self._end += n
+        self._size = min(self._size + n, self.capacity)
+
+    def view(self, n=None):
+        """最近 n 个数据（默认全部）的只读视图"""
+        n = self._size if n is None else max(0, min(n, self._size))
+        view = self._data[self._end - n:self._end]
+        view.flags.writeable = False
+        return view
+
+    def since(self, index):
+        """绝对序号 index 起到最新的数据视图（index 早于缓冲区中最旧的数据时从最旧的开始）"""
+        return self.view(self.total - index)
+
+    @property
+    def last(self):
+        return self._data[self._end - 1] if self._size else None
+
+    def clear(self):
+        self._end = self._size = 0
+        self.total = 0